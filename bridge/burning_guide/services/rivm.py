@@ -12,7 +12,7 @@ from bridge.burning_guide.utils import (
 )
 from bridge.utils import load_postal_area_shapes
 from core.exceptions import BaseApiException
-from core.utils.caching_utils import cache_function
+from core.utils.caching_utils import stale_while_revalidate
 
 logger = logging.getLogger(__name__)
 
@@ -23,7 +23,7 @@ class UnknownPostalcodeError(BaseApiException):
     default_code = "RIVM_UNKNOWN_POSTAL_CODE"
 
 
-@cache_function(timeout=60 * 60 * 24)  # Cache for 24 hours
+@stale_while_revalidate(soft_timeout=60 * 60 * 24, hard_timeout=60 * 60 * 24 * 7)
 def load_postal_data():
     """
     Function to load the postal data:
@@ -27,7 +27,7 @@ class NotificationData(NamedTuple):
 
 
 @override_settings(FIREBASE_CREDENTIALS="foobar")
-@override_settings(MAX_FIREBASE_WORKERS=10)
+@override_settings(MAX_FIREBASE_BATCHES_IN_FLIGHT=2)
 @freezegun.freeze_time(timezone.now())
 class TestMijnAmsterdamNotificationProcessor(ResponsesActivatedAPITestCase):
     def setUp(self):
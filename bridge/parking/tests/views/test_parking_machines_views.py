@@ -1,3 +1,6 @@
+import os
+from unittest.mock import patch
+
 import responses
 from django.urls import reverse
 
@@ -25,5 +28,12 @@ class TestParkingVisitorTimeBalanceView(BaseSSPTestCase):
         )  # Only Amsterdam machines are returned. Data contains 3 other machines
 
     @responses.activate
+    @patch.dict(os.environ, {"CACHE_FUNCTION_ENABLED_PYTEST": "true"})
     def test_cache(self):
-        self.assert_caching(self.url, rsp_get=self.rsp_get)
+        for _ in range(2):
+            response = self.client.get(self.url, headers=self.api_headers)
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(len(response.json()), 43)
+
+        # The upstream should not be called a second time
+        self.assertEqual(self.rsp_get.call_count, 1)
@@ -3,8 +3,6 @@ import io
 import logging
 
 import requests
-from django.utils.decorators import method_decorator
-from django.views.decorators.cache import cache_page
 from rest_framework import generics, status
 from rest_framework.response import Response
 
@@ -14,11 +12,37 @@ from bridge.parking.serializers.parking_machine_serializers import (
 )
 from bridge.parking.services.ssp import SSPEndpointExternal
 from bridge.parking.views.base_ssp_view import ssp_openapi_decorator
+from core.utils.caching_utils import stale_while_revalidate
 
 logger = logging.getLogger(__name__)
 
 
-@method_decorator(cache_page(60 * 60), name="get")
+@stale_while_revalidate(soft_timeout=60 * 60, hard_timeout=60 * 60 * 24)
+def load_parking_machines() -> list[dict]:
+    response = requests.get(SSPEndpointExternal.PARKING_MACHINES_LIST.value, timeout=10)
+    response.raise_for_status()
+
+    f = io.StringIO(response.text)
+    reader = csv.DictReader(f, delimiter=";")
+    payload = []
+    for row in reader:
+        if row["GEB_DOMEIN"] == "363":  # 363 corresponds to Amsterdam
+            payload.append(
+                {
+                    "id": row.get("VERKOOPPUNT"),
+                    "name": row.get("VKP_OMS"),
+                    "lat": float(row.get("LAT")),
+                    "lon": float(row.get("LON")),
+                    "payment_area": row.get("GEBIED"),
+                    "start_date": row.get("VKP_BEGIN"),
+                }
+            )
+
+    serializer = ParkingMachineListResponseSerializer(data=payload, many=True)
+    serializer.is_valid(raise_exception=True)
+    return serializer.data
+
+
 class ParkingMachineListView(generics.GenericAPIView):
     serializer_class = ParkingMachineListRequestSerializer
     response_serializer = ParkingMachineListResponseSerializer
@@ -29,28 +53,4 @@ class ParkingMachineListView(generics.GenericAPIView):
         serializer_as_params=serializer_class,
     )
     def get(self, request, *args, **kwargs):
-        response = requests.get(
-            SSPEndpointExternal.PARKING_MACHINES_LIST.value, timeout=10
-        )
-        response.raise_for_status()
-
-        f = io.StringIO(response.text)
-        reader = csv.DictReader(f, delimiter=";")
-        payload = []
-        for row in reader:
-            if row["GEB_DOMEIN"] == "363":  # 363 corresponds to Amsterdam
-                payload.append(
-                    {
-                        "id": row.get("VERKOOPPUNT"),
-                        "name": row.get("VKP_OMS"),
-                        "lat": float(row.get("LAT")),
-                        "lon": float(row.get("LON")),
-                        "payment_area": row.get("GEBIED"),
-                        "start_date": row.get("VKP_BEGIN"),
-                    }
-                )
-
-        serializer = self.response_serializer(data=payload, many=True)
-        serializer.is_valid(raise_exception=True)
-
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        return Response(load_parking_machines(), status=status.HTTP_200_OK)
@@ -1,10 +1,11 @@
 import requests
 from django.conf import settings
 
-from core.utils.caching_utils import cache_function
+from core.utils.caching_utils import stale_while_revalidate
 
 
-@cache_function(timeout=60 * 60 * 24)  # Cache for 24 hours
+# Refreshed daily, served stale for a week when the maps service is unavailable
+@stale_while_revalidate(soft_timeout=60 * 60 * 24, hard_timeout=60 * 60 * 24 * 7)
 def load_postal_area_shapes():
     """
     Function to load the postal data:
@@ -8,6 +8,7 @@ class ConstructionWorkConfig(AppConfig):
 
     def ready(self):
         from construction_work import authentication
+        from construction_work.services import project_ranking  # noqa: F401
 
         if settings.MOCK_ENTRA_AUTH:
             authentication.EntraIDAuthentication = (
@@ -4,7 +4,8 @@ See README.md for more info regarding the IPROX API
 
 from logging import getLogger
 
-from django.db import transaction
+from django.db import connections, router, transaction
+from django.db.models import Q
 from django.utils import timezone
 from requests import HTTPError
 
@@ -22,6 +23,7 @@ from construction_work.models.project_models import (
     ProjectSectionUrl,
     ProjectTimelineItem,
 )
+from construction_work.services.project_ranking import deferred_refresh
 from core.services.image_set import ImageSetService
 
 logger = getLogger(__name__)
@@ -48,7 +50,10 @@ def projects(project_data):
         ],
     )
 
-    project_objects = Project.objects.all()
+    # Child rows are replaced for the loaded projects only
+    project_objects = Project.objects.filter(
+        foreign_id__in=[data.get("id") for data in project_data]
+    )
     projects_dict = {project.foreign_id: project for project in project_objects}
     contacts, images, image_sources, timelines, sections, section_urls = (
         [],
@@ -79,17 +84,23 @@ def projects(project_data):
         sections += new_sections
         section_urls += new_section_urls
 
+    # Contacts and images have the ids of IPROX, which can move to another project
     with transaction.atomic():
-        ProjectContact.objects.all().delete()
+        ProjectContact.objects.filter(
+            Q(project__in=project_objects) | Q(id__in=[c.id for c in contacts])
+        ).delete()
         ProjectContact.objects.bulk_create(contacts)
 
     with transaction.atomic():
-        ProjectImage.objects.all().delete()
+        ProjectImage.objects.filter(
+            Q(parent__in=project_objects) | Q(id__in=[i.id for i in images])
+        ).delete()
         ProjectImage.objects.bulk_create(images)
         ProjectImageSource.objects.bulk_create(image_sources)
 
     with transaction.atomic():
-        ProjectTimelineItem.objects.all().delete()
+        # Nested items have no project, they are deleted with their parent
+        ProjectTimelineItem.objects.filter(project__in=project_objects).delete()
         parent_ids = {}
         for tl in timelines:
             parent_ids[tl.id] = tl.parent_id
@@ -102,7 +113,7 @@ def projects(project_data):
         ProjectTimelineItem.objects.bulk_update(timelines, ["parent_id"])
 
     with transaction.atomic():
-        ProjectSection.objects.all().delete()
+        ProjectSection.objects.filter(project__in=project_objects).delete()
         ProjectSection.objects.bulk_create(sections)
         ProjectSectionUrl.objects.bulk_create(section_urls)
 
@@ -199,6 +210,7 @@ def articles(article_data):
     for item in article_data:
         foreign_project_ids = list(item.pop("projectIds"))
         article_object = get_article_object(item)
+        article_object.project_foreign_ids = foreign_project_ids
         articles.append(article_object)
 
         projects = []
@@ -230,6 +242,9 @@ def articles(article_data):
             "modification_date",
             "publication_date",
             "expiration_date",
+            "last_seen",
+            "active",
+            "project_foreign_ids",
         ],
     )
 
@@ -237,10 +252,12 @@ def articles(article_data):
     articles_saved = Article.objects.filter(
         foreign_id__in=[article for article in article_project_mapping.keys()]
     )
-    with transaction.atomic():
+    # Publication dates of existing articles may have changed as well, so all projects are refreshed
+    with deferred_refresh(), transaction.atomic():
         for article in articles_saved:
             projects = article_project_mapping.get(article.foreign_id)
             article.projects.set(projects)
+        link_missing_article_projects()
 
     articles_dict = {article.foreign_id: article for article in articles_saved}
     images, image_sources = [], []
@@ -256,11 +273,37 @@ def articles(article_data):
         image_sources += new_image_sources
 
     with transaction.atomic():
-        ArticleImage.objects.all().delete()
+        ArticleImage.objects.filter(
+            Q(parent__in=articles_saved) | Q(id__in=[i.id for i in images])
+        ).delete()
         ArticleImage.objects.bulk_create(images)
         ArticleImageSource.objects.bulk_create(image_sources)
 
 
+def link_missing_article_projects():
+    """
+    Link all articles to the projects they reference that were missing when the article was loaded,
+    or that were removed and loaded again since. Unchanged articles are not loaded again.
+    """
+    through = Article.projects.through
+    db_connection = connections[router.db_for_write(through)]
+    quote_name = db_connection.ops.quote_name
+    with db_connection.cursor() as cursor:
+        cursor.execute(
+            f"""
+            INSERT INTO {quote_name(through._meta.db_table)} (article_id, project_id)
+            SELECT article.id, project.id
+            FROM {quote_name(Article._meta.db_table)} article
+            JOIN {quote_name(Project._meta.db_table)} project
+                ON project.foreign_id = ANY(article.project_foreign_ids)
+            ON CONFLICT (article_id, project_id) DO NOTHING
+            """
+        )
+        linked_count = cursor.rowcount
+    if linked_count:
+        logger.info(f"Linked {linked_count} articles to projects that were missing")
+
+
 def get_article_object(data):
     article = Article(
         foreign_id=data.get("id"),
@@ -275,6 +318,9 @@ def get_article_object(data):
         # because of that we will use the created date as publication date
         publication_date=data.get("created"),
         expiration_date=data.get("expirationDate"),
+        last_seen=timezone.now(),
+        # an article that reappears in Iprox is activated again
+        active=True,
     )
     return article
 
@@ -5,7 +5,7 @@ Fetch data from the IPROX API and ingest it into Construction-Work database
 
 from logging import getLogger
 
-from django.db import transaction
+from django.db.models import Count, Q
 from django.utils import timezone
 
 from construction_work.etl.extract_data import get_all_iprox_items, get_iprox_items_data
@@ -15,18 +15,22 @@ from construction_work.models.project_models import Project
 logger = getLogger(__name__)
 
 
-def extract_transform_load(*, iprox_url, transform_func, load_func):
+def extract_transform_load(*, iprox_url, transform_func, load_func, model):
     """
     Main function call for Fetch and Ingest from Iprox to Construction-Work
+    Only new and modified items are fetched and loaded, model is the model they are stored in.
+    Returns the ids of all items in IPROX.
     """
     ### EXTRACT DATA
     logger.info("Extracting data from IPROX")
 
     # Collect all items in iprox
     all_iprox_items = get_all_iprox_items(iprox_url)
-    extracted_data = get_iprox_items_data(
-        url=iprox_url, item_ids=[item["id"] for item in all_iprox_items]
+    changed_item_ids = get_changed_item_ids(all_iprox_items, model)
+    logger.info(
+        f"{len(changed_item_ids)} of {len(all_iprox_items)} items are new or modified"
     )
+    extracted_data = get_iprox_items_data(url=iprox_url, item_ids=changed_item_ids)
 
     ### TRANSFORM DATA
     logger.info("Transforming data for Construction-Work")
@@ -40,47 +44,70 @@ def extract_transform_load(*, iprox_url, transform_func, load_func):
     return [item["id"] for item in all_iprox_items]
 
 
-def garbage_collector(found_projects, found_articles):
-    initial_projects_count = Project.objects.all().count()
+def get_changed_item_ids(iprox_items, model) -> list:
+    """
+    Ids of the items that are new or modified since they were stored.
+    Inactive items are reloaded as well, so they are activated again when they reappear.
+    The last_seen of unchanged items is updated in a single query.
+    """
+    stored_modification_dates = dict(
+        model.objects.filter(active=True).values_list("foreign_id", "modification_date")
+    )
+    changed_item_ids, unchanged_item_ids = [], []
+    for item in iprox_items:
+        modification_date = stored_modification_dates.get(item["id"])
+        if modification_date is None or modification_date != item.get("modified"):
+            changed_item_ids.append(item["id"])
+        else:
+            unchanged_item_ids.append(item["id"])
+
+    model.objects.filter(foreign_id__in=unchanged_item_ids).update(
+        last_seen=timezone.now()
+    )
+    return changed_item_ids
+
 
+def garbage_collector(found_projects, found_articles):
     _deactivate_unseen_projects(found_projects)
-    _cleanup_inactive_projects()
+    deleted_projects_count = _cleanup_inactive_projects()
     _deactivate_unseen_articles(found_articles)
 
     garbage_collector_status = {
         "projects": {
-            "active": Project.objects.filter(active=True).count(),
-            "inactive": Project.objects.filter(active=False).count(),
-            "deleted": initial_projects_count - Project.objects.all().count(),
-            "count": Project.objects.all().count(),
-        },
-        "articles": {
-            "active": Article.objects.filter(active=True).count(),
-            "inactive": Article.objects.filter(active=False).count(),
-            "count": Article.objects.all().count(),
+            **_count_by_status(Project),
+            "deleted": deleted_projects_count,
         },
+        "articles": _count_by_status(Article),
     }
     logger.info(garbage_collector_status)
 
 
-def _deactivate_unseen_projects(found_projects):
-    unseen_projects = Project.objects.exclude(foreign_id__in=found_projects).filter(
-        hidden=False
+def _count_by_status(model) -> dict:
+    """Number of active, inactive and all rows of a model in a single query"""
+    return model.objects.aggregate(
+        active=Count("id", filter=Q(active=True)),
+        inactive=Count("id", filter=Q(active=False)),
+        count=Count("id"),
     )
-    with transaction.atomic():
-        for project in unseen_projects:
-            project.deactivate()
 
 
-def _cleanup_inactive_projects():
+def _deactivate_unseen_projects(found_projects):
+    Project.objects.exclude(foreign_id__in=found_projects).filter(
+        hidden=False, active=True
+    ).update(active=False)
+
+
+def _cleanup_inactive_projects() -> int:
+    """Delete projects that are inactive for five days, returns the number of deleted projects"""
     five_days_ago = timezone.now() - timezone.timedelta(days=5)
-    Project.objects.filter(
+    _, deleted_per_model = Project.objects.filter(
         last_seen__lt=five_days_ago, active=False, hidden=False
     ).delete()
+    return deleted_per_model.get(Project._meta.label, 0)
 
 
 def _deactivate_unseen_articles(found_articles):
-    unseen_articles = Article.objects.exclude(foreign_id__in=found_articles)
-    with transaction.atomic():
-        for article in unseen_articles:
-            article.deactivate()
+    # update() skips auto_now, so last_seen is set explicitly, as saving in Article.deactivate() would
+    Article.objects.exclude(foreign_id__in=found_articles).filter(active=True).update(
+        active=False, last_seen=timezone.now()
+    )
@@ -8,6 +8,9 @@ import construction_work.etl.transform_data as transform
 from construction_work.etl.send_notifications import send_article_notifications
 from construction_work.etl.update_data import extract_transform_load, garbage_collector
 from construction_work.models.article_models import Article
+from construction_work.models.project_models import Project
+from core.enums import Module
+from core.utils.caching_utils import bump_dataset_version
 
 IPROX_URL = urljoin(settings.IPROX_SERVER, "appidt/construction-work/")
 IPROX_PROJECTS_URL = urljoin(IPROX_URL, "projects/")
@@ -20,16 +23,25 @@ class Command(BaseCommand):
     help = "Upsert construction work projects and articles"
 
     def handle(self, *args, **kwargs):
+        try:
+            self.run_etl()
+        finally:
+            # A failed run can have loaded part of the data already, cached responses are outdated
+            bump_dataset_version(Module.CONSTRUCTION_WORK.value)
+
+    def run_etl(self):
         current_article_ids = set(Article.objects.values_list("foreign_id", flat=True))
         found_projects = extract_transform_load(
             iprox_url=IPROX_PROJECTS_URL,
             transform_func=transform.projects,
             load_func=load.projects,
+            model=Project,
         )
         found_articles = extract_transform_load(
             iprox_url=IPROX_ARTICLES_URL,
             transform_func=transform.articles,
             load_func=load.articles,
+            model=Article,
         )
         send_article_notifications(current_article_ids, found_articles)
         garbage_collector(found_projects, found_articles)
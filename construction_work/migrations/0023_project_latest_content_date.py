@@ -0,0 +1,39 @@
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+from django.db.models.functions import Greatest
+
+
+def fill_latest_content_date(apps, schema_editor):
+    Project = apps.get_model("construction_work", "Project")
+    Article = apps.get_model("construction_work", "Article")
+    WarningMessage = apps.get_model("construction_work", "WarningMessage")
+    latest_article_date = (
+        Article.objects.filter(projects=OuterRef("pk"))
+        .order_by("-publication_date")
+        .values("publication_date")[:1]
+    )
+    latest_warning_date = (
+        WarningMessage.objects.filter(project=OuterRef("pk"))
+        .order_by("-publication_date")
+        .values("publication_date")[:1]
+    )
+    Project.objects.update(
+        latest_content_date=Greatest(
+            Subquery(latest_article_date), Subquery(latest_warning_date)
+        )
+    )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("construction_work", "0022_projectcontact_extra"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="project",
+            name="latest_content_date",
+            field=models.DateTimeField(default=None, null=True),
+        ),
+        migrations.RunPython(fill_latest_content_date, migrations.RunPython.noop),
+    ]
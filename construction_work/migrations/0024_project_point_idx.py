@@ -0,0 +1,24 @@
+import django.contrib.postgres.indexes
+from django.db import migrations, models
+
+import construction_work.utils.distance_utils
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("construction_work", "0023_project_latest_content_date"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="project",
+            index=django.contrib.postgres.indexes.GistIndex(
+                construction_work.utils.distance_utils.PlanePoint(
+                    models.F("coordinates_lon") * 68,
+                    models.F("coordinates_lat") * 111,
+                ),
+                condition=models.Q(("active", True), ("hidden", False)),
+                name="project_point_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,35 @@
+import django.contrib.postgres.fields
+from django.contrib.postgres.aggregates import ArrayAgg
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+
+def fill_project_foreign_ids(apps, schema_editor):
+    Article = apps.get_model("construction_work", "Article")
+    Through = Article.projects.through
+    project_foreign_ids = (
+        Through.objects.filter(article=OuterRef("pk"))
+        .values("article")
+        .annotate(foreign_ids=ArrayAgg("project__foreign_id"))
+        .values("foreign_ids")
+    )
+    Article.objects.filter(pk__in=Through.objects.values("article")).update(
+        project_foreign_ids=Subquery(project_foreign_ids)
+    )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("construction_work", "0024_project_point_idx"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="article",
+            name="project_foreign_ids",
+            field=django.contrib.postgres.fields.ArrayField(
+                base_field=models.BigIntegerField(), default=list, size=None
+            ),
+        ),
+        migrations.RunPython(fill_project_foreign_ids, migrations.RunPython.noop),
+    ]
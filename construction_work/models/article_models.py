@@ -1,3 +1,4 @@
+from django.contrib.postgres.fields import ArrayField
 from django.db import models
 from django.utils import timezone
 
@@ -16,6 +17,8 @@ class Article(models.Model):
     body = models.TextField(blank=True, null=True, default=None)
     type = models.CharField(max_length=30, blank=True, null=True, default=None)
     projects = models.ManyToManyField(Project)
+    # Foreign ids of the projects in IPROX, projects that are loaded later are linked on a later run
+    project_foreign_ids = ArrayField(models.BigIntegerField(), default=list)
     url = models.URLField(max_length=2048)
     creation_date = models.DateTimeField(
         default=timezone.now
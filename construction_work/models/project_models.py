@@ -1,8 +1,11 @@
 import uuid
 
+from django.contrib.postgres.indexes import GistIndex
 from django.db import models
 from django.utils import timezone
 
+from construction_work.utils.distance_utils import get_project_point
+
 
 class Project(models.Model):
     """Projects db model"""
@@ -26,9 +29,20 @@ class Project(models.Model):
     )  # If no date is provided use the current date
     publication_date = models.DateTimeField(default=None, null=True)
     expiration_date = models.DateTimeField(default=None, null=True)
+    # Latest publication date of the articles and warnings, NULL without content.
+    # Maintained by construction_work.services.project_ranking
+    latest_content_date = models.DateTimeField(default=None, null=True)
 
     class Meta:
         ordering = ["title"]
+        indexes = [
+            # Lets the project list order by distance with a nearest neighbour scan
+            GistIndex(
+                get_project_point(),
+                name="project_point_idx",
+                condition=models.Q(active=True, hidden=False),
+            ),
+        ]
 
     def save(self, update_active=True, *args, **kwargs):
         if update_active:
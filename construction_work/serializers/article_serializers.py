@@ -38,7 +38,7 @@ class ArticleSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Article
-        exclude = ["type"]
+        exclude = ["type", "project_foreign_ids"]
 
     @extend_schema_field(MetaIdSerializer)
     def get_meta_id(self, obj: Article) -> dict:
@@ -1,16 +1,30 @@
+import hashlib
 import logging
 import re
 from typing import Optional, Tuple
 
 import requests
 from django.conf import settings
+from django.core.cache import cache
+
+from core.utils.caching_utils import should_bypass_cache
 
 logger = logging.getLogger(__name__)
 
 
+def normalize_address(address: str) -> str:
+    return " ".join(address.lower().split())
+
+
+def get_geocoding_key(address: str) -> str:
+    address_hash = hashlib.sha256(normalize_address(address).encode()).hexdigest()
+    return f"construction_work:geocode:{address_hash}"
+
+
 def geocode_address(address: str) -> Tuple[Optional[float], Optional[float]]:
     """
-    Convert an address to latitude and longitude using the geocoding API.
+    Convert an address to latitude and longitude, cached by normalized address.
+    Addresses without results are cached shorter, failed requests are not cached.
 
     Args:
         address (str): The address to geocode.
@@ -19,6 +33,46 @@ def geocode_address(address: str) -> Tuple[Optional[float], Optional[float]]:
         Tuple[Optional[float], Optional[float]]: A tuple containing latitude and longitude,
         or (None, None) if the geocoding fails.
     """
+    if should_bypass_cache():
+        coordinates, _ = _request_coordinates(address)
+        return coordinates
+
+    key = get_geocoding_key(address)
+    try:
+        cached_coordinates = cache.get(key)
+    except Exception:
+        logger.warning("Failed to get geocoded address from cache", exc_info=True)
+        cached_coordinates = None
+    if cached_coordinates is not None:
+        return cached_coordinates
+
+    coordinates, is_cacheable = _request_coordinates(address)
+    if is_cacheable:
+        timeout = (
+            settings.GEOCODING_CACHE_TIMEOUT
+            if coordinates[0] is not None
+            else settings.GEOCODING_NOT_FOUND_CACHE_TIMEOUT
+        )
+        try:
+            cache.set(key, coordinates, timeout=timeout)
+        except Exception:
+            logger.warning("Failed to store geocoded address in cache", exc_info=True)
+    return coordinates
+
+
+def _request_coordinates(
+    address: str,
+) -> Tuple[Tuple[Optional[float], Optional[float]], bool]:
+    """
+    Convert an address to latitude and longitude using the geocoding API.
+
+    Args:
+        address (str): The address to geocode.
+
+    Returns:
+        Tuple: latitude and longitude, or (None, None) if the geocoding fails,
+        and whether the result may be cached
+    """
 
     try:
         response = requests.get(
@@ -35,16 +89,16 @@ def geocode_address(address: str) -> Tuple[Optional[float], Optional[float]]:
         response.raise_for_status()
     except requests.RequestException as e:
         logging.error(f"Error while geocoding address '{address}': {e}")
-        return None, None
+        return (None, None), False
 
     data = response.json()
     results = data.get("response", {}).get("docs", [])
     if not results:
         logger.warning(f"No results found for address: {address}")
-        return None, None
+        return (None, None), True
 
     coordinates = results[0].get("centroide_ll", "")
     m = re.match(r"POINT\(\s*([-0-9.]+)\s+([-0-9.]+)\s*\)", coordinates)
     lon, lat = m.groups()
 
-    return float(lat), float(lon)
+    return (float(lat), float(lon)), True
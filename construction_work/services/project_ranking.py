@@ -0,0 +1,93 @@
+"""
+Keep Project.latest_content_date in sync with the articles and warnings of a project,
+so the project list can be ordered without aggregating over all content.
+"""
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.db.models import OuterRef, Subquery
+from django.db.models.functions import Greatest
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from construction_work.models.article_models import Article
+from construction_work.models.manage_models import WarningMessage
+from construction_work.models.project_models import Project
+
+_refresh_deferred = ContextVar("refresh_deferred", default=False)
+
+
+def get_latest_content_date_expression():
+    """Latest publication date of the articles and warnings of the outer project"""
+    latest_article_date = (
+        Article.objects.filter(projects=OuterRef("pk"))
+        .order_by("-publication_date")
+        .values("publication_date")[:1]
+    )
+    latest_warning_date = (
+        WarningMessage.objects.filter(project=OuterRef("pk"))
+        .order_by("-publication_date")
+        .values("publication_date")[:1]
+    )
+    # Greatest ignores NULL on PostgreSQL, so it is only NULL for projects without content
+    return Greatest(Subquery(latest_article_date), Subquery(latest_warning_date))
+
+
+def refresh_latest_content_dates(project_ids=None) -> int:
+    """
+    Recompute the latest content date of the given projects, or of all projects when None.
+
+    Returns:
+        int: number of updated projects
+    """
+    projects = Project.objects.all()
+    if project_ids is not None:
+        if not project_ids:
+            return 0
+        projects = projects.filter(id__in=project_ids)
+    return projects.update(latest_content_date=get_latest_content_date_expression())
+
+
+@contextmanager
+def deferred_refresh():
+    """
+    Skip the refresh per change while bulk loading content.
+    All projects are refreshed once when the block exits.
+    """
+    token = _refresh_deferred.set(True)
+    try:
+        yield
+    finally:
+        _refresh_deferred.reset(token)
+    refresh_latest_content_dates()
+
+
+@receiver(post_save, sender=WarningMessage)
+def refresh_for_created_warning(sender, instance, created, **kwargs):
+    # The publication date of a warning is only set on creation
+    if created:
+        refresh_latest_content_dates([instance.project_id])
+
+
+@receiver(post_delete, sender=WarningMessage)
+def refresh_for_deleted_warning(sender, instance, **kwargs):
+    refresh_latest_content_dates([instance.project_id])
+
+
+@receiver(m2m_changed, sender=Article.projects.through)
+def refresh_for_article_projects(sender, instance, action, reverse, pk_set, **kwargs):
+    if _refresh_deferred.get():
+        return
+    if reverse:
+        # The instance is a project, pk_set contains article ids
+        if action in ("post_add", "post_remove", "post_clear"):
+            refresh_latest_content_dates([instance.pk])
+    elif action in ("post_add", "post_remove"):
+        refresh_latest_content_dates(list(pk_set))
+    elif action == "pre_clear":
+        instance._cleared_project_ids = list(
+            instance.projects.values_list("id", flat=True)
+        )
+    elif action == "post_clear":
+        refresh_latest_content_dates(instance._cleared_project_ids)
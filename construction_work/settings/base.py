@@ -23,6 +23,10 @@ ADDRESS_SEARCH_URL = os.getenv(
     "ADDRESS_SEARCH_URL", "https://api.pdok.nl/bzk/locatieserver/search/v3_1/free"
 )
 
+# Addresses rarely move, addresses without results may be added to the BAG later
+GEOCODING_CACHE_TIMEOUT = 60 * 60 * 24 * 30
+GEOCODING_NOT_FOUND_CACHE_TIMEOUT = 60 * 60 * 24
+
 MIN_SEARCH_QUERY_LENGTH = 3
 
 IPROX_SERVER = os.getenv("IPROX_SERVER", "https://www.amsterdam.nl/")
@@ -1,3 +1,4 @@
+from datetime import timedelta
 from unittest.mock import patch
 
 from django.test import TestCase
@@ -15,8 +16,11 @@ from construction_work.etl.load_data import (
 from construction_work.models.article_models import Article
 from construction_work.models.project_models import (
     Project,
+    ProjectContact,
     ProjectImage,
     ProjectImageSource,
+    ProjectSection,
+    ProjectTimelineItem,
 )
 
 
@@ -388,6 +392,38 @@ class LoadDataTestCase(TestCase):
         self.assertEqual(updated_project.coordinates_lat, 10.0)
         self.assertEqual(updated_project.coordinates_lon, 20.0)
 
+    def test_projects_keeps_children_of_other_projects(self):
+        """Test that child rows are only replaced for the loaded projects"""
+        other_project = baker.make(Project, foreign_id=2)
+        baker.make(ProjectContact, id=2, project=other_project)
+        baker.make(ProjectSection, project=other_project)
+        baker.make(ProjectTimelineItem, project=other_project)
+        project_data = [
+            {
+                "id": 1,
+                "title": "Project 1",
+                "url": "http://example.com/project/1",
+                "sections": {
+                    "where": [{"body": "De Gaasperplas", "links": [], "title": "Waar"}]
+                },
+                "contacts": [{"id": 1, "name": "Jan"}],
+                "timeline": {"items": [{"title": "2008", "items": []}]},
+                "created": timezone.now(),
+                "modified": timezone.now(),
+            }
+        ]
+
+        projects(project_data)
+        projects(project_data)
+
+        project = Project.objects.get(foreign_id=1)
+        self.assertEqual(project.contacts.count(), 1)
+        self.assertEqual(project.sections.count(), 1)
+        self.assertEqual(project.timeline_items.count(), 1)
+        self.assertEqual(other_project.contacts.count(), 1)
+        self.assertEqual(other_project.sections.count(), 1)
+        self.assertEqual(other_project.timeline_items.count(), 1)
+
     def test_get_project_object(self):
         """Test that get_project_object creates a Project instance with correct attributes."""
         data = {
@@ -555,6 +591,63 @@ class LoadDataTestCase(TestCase):
         self.assertEqual(updated_article.type, "announcement")
         self.assertEqual(set(updated_article.projects.all()), {project1})
 
+    def test_articles_loaded_before_project(self):
+        """Test that an article is linked to its project once the project is loaded."""
+        article_data = [
+            {
+                "id": 400,
+                "title": "Article before Project",
+                "intro": "Intro",
+                "body": "Body",
+                "type": "news",
+                "url": "http://example.com/article/400",
+                "created": timezone.now(),
+                "modified": timezone.now(),
+                "publicationDate": timezone.now(),
+                "expirationDate": None,
+                "projectIds": [5],
+            },
+        ]
+        with self.assertLogs("construction_work.etl.load_data", level="ERROR"):
+            articles(article_data)
+        article = Article.objects.get(foreign_id=400)
+        self.assertEqual(article.projects.count(), 0)
+
+        # The next run only loads the project, the article is unchanged
+        project = baker.make(Project, foreign_id=5)
+        articles([])
+
+        self.assertEqual(list(article.projects.all()), [project])
+        project.refresh_from_db()
+        self.assertEqual(project.latest_content_date, article.publication_date)
+
+    def test_articles_reactivates_inactive_article(self):
+        """Test that articles function activates an article that reappears."""
+        last_seen = timezone.now() - timedelta(days=1)
+        baker.make(Article, foreign_id=300, active=False)
+        Article.objects.filter(foreign_id=300).update(last_seen=last_seen)
+        article_data = [
+            {
+                "id": 300,
+                "title": "Reappeared Article",
+                "intro": "Intro",
+                "body": "Body",
+                "type": "news",
+                "url": "http://example.com/article/300",
+                "created": timezone.now(),
+                "modified": timezone.now(),
+                "publicationDate": timezone.now(),
+                "expirationDate": None,
+                "projectIds": [],
+            },
+        ]
+
+        articles(article_data)
+
+        article = Article.objects.get(foreign_id=300)
+        self.assertTrue(article.active)
+        self.assertGreater(article.last_seen, last_seen)
+
     def test_articles_missing_project(self):
         """Test that articles function logs an error when a referenced project does not exist."""
         article_data = [
@@ -610,6 +703,7 @@ class LoadDataTestCase(TestCase):
         self.assertEqual(article.modification_date, data["modified"])
         self.assertEqual(article.publication_date, data["created"])
         self.assertEqual(article.expiration_date, data["expirationDate"])
+        self.assertTrue(article.active)
 
     @patch("construction_work.etl.load_data.ImageSetService")
     def test_store_image_expected_source_data(self, mock_image_set_service):
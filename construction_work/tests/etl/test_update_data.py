@@ -10,6 +10,7 @@ from construction_work.etl.update_data import (
     _deactivate_unseen_projects,
     extract_transform_load,
     garbage_collector,
+    get_changed_item_ids,
 )
 from construction_work.models.article_models import Article
 from construction_work.models.project_models import Project
@@ -52,6 +53,7 @@ class ExtractTransformLoadTestCase(TestCase):
             iprox_url=iprox_url,
             transform_func=mock_transform_func,
             load_func=mock_load_func,
+            model=Project,
         )
 
         mock_get_all_items.assert_called_once_with(iprox_url)
@@ -77,11 +79,72 @@ class ExtractTransformLoadTestCase(TestCase):
                 iprox_url=iprox_url,
                 transform_func=mock_transform_func,
                 load_func=mock_load_func,
+                model=Project,
             )
 
         self.assertEqual(str(context.exception), "API Error")
 
 
+class GetChangedItemIdsTestCase(TestCase):
+    def setUp(self):
+        self.modified = timezone.now() - timezone.timedelta(days=1)
+        self.last_seen = timezone.now() - timezone.timedelta(days=2)
+        Project.objects.bulk_create(
+            [
+                Project(
+                    foreign_id=foreign_id,
+                    active=active,
+                    modification_date=self.modified,
+                    last_seen=self.last_seen,
+                )
+                for foreign_id, active in [(1, True), (2, True), (3, False)]
+            ]
+        )
+
+    def test_changed_item_ids(self):
+        iprox_items = [
+            {"id": 1, "modified": self.modified},
+            {"id": 2, "modified": timezone.now()},
+            {"id": 3, "modified": self.modified},
+            {"id": 4, "modified": self.modified},
+        ]
+
+        changed_item_ids = get_changed_item_ids(iprox_items, Project)
+
+        # Modified, inactive and new items
+        self.assertEqual(changed_item_ids, [2, 3, 4])
+
+    def test_unchanged_items_last_seen(self):
+        get_changed_item_ids([{"id": 1, "modified": self.modified}], Project)
+
+        self.assertGreater(Project.objects.get(foreign_id=1).last_seen, self.last_seen)
+        self.assertEqual(Project.objects.get(foreign_id=2).last_seen, self.last_seen)
+
+    @mock.patch(
+        "construction_work.etl.update_data.get_iprox_items_data", return_value=[]
+    )
+    @mock.patch("construction_work.etl.update_data.get_all_iprox_items")
+    def test_extract_transform_load_fetches_changed_items(
+        self, mock_get_all_items, mock_get_items_data
+    ):
+        mock_get_all_items.return_value = [
+            {"id": 1, "modified": self.modified},
+            {"id": 5, "modified": self.modified},
+        ]
+
+        result = extract_transform_load(
+            iprox_url="http://example.com/api",
+            transform_func=mock_transform_func,
+            load_func=mock_load_func,
+            model=Project,
+        )
+
+        mock_get_items_data.assert_called_once_with(
+            url="http://example.com/api", item_ids=[5]
+        )
+        self.assertEqual(result, [1, 5])
+
+
 class GarbageCollectorTestCase(TestCase):
     def setUp(self):
         # Create some test projects and articles
@@ -179,11 +242,25 @@ class GarbageCollectorTestCase(TestCase):
         self.assertTrue(any("projects" in log for log in logs))
         self.assertTrue(any("articles" in log for log in logs))
 
-    def test_deactivate_unseen_projects_transaction(self):
+    def test_deactivate_unseen_projects_single_query(self):
         found_projects = [self.project1.foreign_id]
 
-        with mock.patch(
-            "construction_work.etl.update_data.transaction.atomic"
-        ) as mock_atomic:
+        with self.assertNumQueries(1):
             _deactivate_unseen_projects(found_projects)
-            mock_atomic.assert_called_once()
+
+    def test_garbage_collector_status(self):
+        found_projects = [self.project1.foreign_id]
+        found_articles = [1]
+        self.project2.last_seen = timezone.now() - timezone.timedelta(days=6)
+        self.project2.save(update_active=False)
+
+        with self.assertLogs("construction_work.etl.update_data", level="INFO") as cm:
+            garbage_collector(found_projects, found_articles)
+
+        self.assertIn(
+            "'projects': {'active': 2, 'inactive': 0, 'count': 2, 'deleted': 1}",
+            cm.output[0],
+        )
+        self.assertIn(
+            "'articles': {'active': 1, 'inactive': 1, 'count': 2}", cm.output[0]
+        )
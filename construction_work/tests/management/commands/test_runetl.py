@@ -0,0 +1,31 @@
+from unittest.mock import patch
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from core.enums import Module
+
+
+@patch("construction_work.management.commands.runetl.bump_dataset_version")
+@patch("construction_work.management.commands.runetl.garbage_collector")
+@patch("construction_work.management.commands.runetl.send_article_notifications")
+@patch("construction_work.management.commands.runetl.extract_transform_load")
+class RunEtlTest(TestCase):
+    def test_dataset_version_bumped(
+        self, mock_etl, mock_send_notifications, mock_garbage_collector, mock_bump
+    ):
+        call_command("runetl")
+
+        mock_garbage_collector.assert_called_once()
+        mock_bump.assert_called_once_with(Module.CONSTRUCTION_WORK.value)
+
+    def test_dataset_version_bumped_after_failed_load(
+        self, mock_etl, mock_send_notifications, mock_garbage_collector, mock_bump
+    ):
+        mock_etl.side_effect = [["project"], Exception("Failed to load articles")]
+
+        with self.assertRaises(Exception):
+            call_command("runetl")
+
+        mock_garbage_collector.assert_not_called()
+        mock_bump.assert_called_once_with(Module.CONSTRUCTION_WORK.value)
@@ -1,6 +1,8 @@
+import os
 from unittest.mock import patch
 
 import requests
+from django.core.cache import cache
 from django.test import TestCase
 
 from construction_work.services.geocoding import geocode_address
@@ -37,3 +39,39 @@ class TestGeocodeAddress(TestCase):
 
         assert lat is None
         assert lon is None
+
+
+@patch.dict(os.environ, {"CACHE_FUNCTION_ENABLED_PYTEST": "true"})
+class TestGeocodeAddressCache(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    @patch("requests.get")
+    def test_result_cached_by_normalized_address(self, mock_get):
+        mock_get.return_value.json.return_value = address_search.MOCK_DATA_SINGLE
+
+        first_result = geocode_address("Dam 1")
+        second_result = geocode_address("  dam   1 ")
+
+        assert first_result == second_result == (52.37329259, 4.8937175)
+        mock_get.assert_called_once()
+
+    @patch("requests.get")
+    def test_no_results_cached(self, mock_get):
+        mock_get.return_value.json.return_value = address_search.MOCK_DATA_NONE
+
+        geocode_address("Niet Bestaande Straat 123")
+        lat, lon = geocode_address("Niet Bestaande Straat 123")
+
+        assert lat is None
+        assert lon is None
+        mock_get.assert_called_once()
+
+    @patch("requests.get")
+    def test_request_exception_not_cached(self, mock_get):
+        mock_get.side_effect = requests.RequestException("Connection error")
+
+        geocode_address("Damrak 1")
+        geocode_address("Damrak 1")
+
+        assert mock_get.call_count == 2
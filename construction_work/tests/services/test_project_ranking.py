@@ -0,0 +1,94 @@
+import datetime
+
+from django.test import TestCase
+from django.utils import timezone
+from model_bakery import baker
+
+from construction_work.models.article_models import Article
+from construction_work.models.manage_models import WarningMessage
+from construction_work.models.project_models import Project
+from construction_work.services.project_ranking import (
+    deferred_refresh,
+    refresh_latest_content_dates,
+)
+
+
+class TestProjectRanking(TestCase):
+    def setUp(self):
+        self.project = baker.make(Project)
+        self.publication_date = timezone.now() - datetime.timedelta(days=2)
+
+    def get_latest_content_date(self):
+        self.project.refresh_from_db()
+        return self.project.latest_content_date
+
+    def test_project_without_content(self):
+        refresh_latest_content_dates()
+        self.assertIsNone(self.get_latest_content_date())
+
+    def test_article_added_and_removed(self):
+        article = baker.make(Article, publication_date=self.publication_date)
+
+        article.projects.add(self.project)
+        self.assertEqual(self.get_latest_content_date(), self.publication_date)
+
+        article.projects.remove(self.project)
+        self.assertIsNone(self.get_latest_content_date())
+
+    def test_article_projects_cleared(self):
+        article = baker.make(Article, publication_date=self.publication_date)
+        article.projects.add(self.project)
+
+        article.projects.clear()
+        self.assertIsNone(self.get_latest_content_date())
+
+    def test_article_added_to_project(self):
+        article = baker.make(Article, publication_date=self.publication_date)
+
+        self.project.article_set.add(article)
+        self.assertEqual(self.get_latest_content_date(), self.publication_date)
+
+    def test_warning_created_and_deleted(self):
+        warning = baker.make(WarningMessage, project=self.project)
+        self.assertEqual(self.get_latest_content_date(), warning.publication_date)
+
+        warning.delete()
+        self.assertIsNone(self.get_latest_content_date())
+
+    def test_latest_of_articles_and_warnings(self):
+        article = baker.make(Article, publication_date=self.publication_date)
+        article.projects.add(self.project)
+        warning = baker.make(WarningMessage, project=self.project)
+
+        self.assertEqual(self.get_latest_content_date(), warning.publication_date)
+
+    def test_refresh_after_publication_date_changed(self):
+        article = baker.make(Article, publication_date=self.publication_date)
+        article.projects.add(self.project)
+        new_publication_date = timezone.now() - datetime.timedelta(days=1)
+        Article.objects.filter(pk=article.pk).update(
+            publication_date=new_publication_date
+        )
+
+        updated_count = refresh_latest_content_dates()
+
+        self.assertEqual(updated_count, 1)
+        self.assertEqual(self.get_latest_content_date(), new_publication_date)
+
+    def test_refresh_selected_projects(self):
+        other_project = baker.make(Project)
+        Project.objects.update(latest_content_date=self.publication_date)
+
+        refresh_latest_content_dates([other_project.pk])
+
+        self.assertIsNone(Project.objects.get(pk=other_project.pk).latest_content_date)
+        self.assertEqual(self.get_latest_content_date(), self.publication_date)
+
+    def test_deferred_refresh(self):
+        article = baker.make(Article, publication_date=self.publication_date)
+
+        with deferred_refresh():
+            article.projects.add(self.project)
+            self.assertIsNone(self.get_latest_content_date())
+
+        self.assertEqual(self.get_latest_content_date(), self.publication_date)
@@ -513,6 +513,24 @@ class TestProjectListView(BaseTestProjectView):
         actual_order = [x["id"] for x in response.json()["result"]]
         self.assertEqual(actual_order, expected_order)
 
+    def test_project_distance_in_meters(self):
+        """Test that the distance is calculated on a flat plane around Amsterdam"""
+        project_data = projects.MOCK_DATA[0].copy()
+        project_data["coordinates_lat"] = self.base_location[0] + 0.03
+        project_data["coordinates_lon"] = self.base_location[1] + 0.04
+        Project.objects.create(**project_data)
+
+        device = Device.objects.create(**devices.MOCK_DATA[0].copy())
+        self.api_headers[settings.HEADER_DEVICE_ID] = device.device_id
+        response = self.client.get(
+            self.api_url,
+            {"lat": self.base_location[0], "lon": self.base_location[1]},
+            headers=self.api_headers,
+        )
+
+        # sqrt((0.03 * 111) ** 2 + (0.04 * 68) ** 2) km
+        self.assertAlmostEqual(response.json()["result"][0]["meter"], 4299, delta=1)
+
     def test_projects_with_null_coordinates(self):
         """Test that projects with NULL coordinates appear last when sorting by distance"""
         # Create projects with valid coordinates
@@ -0,0 +1,42 @@
+from django.db.models import F, Field, FloatField, Func, Value
+
+# Constants for Amsterdam (rough approximation)
+KM_PER_LAT_DEGREE = 111  # km per 1° of latitude
+KM_PER_LON_DEGREE = 68  # km per 1° of longitude at ~52°N
+
+
+class PlanePoint(Func):
+    """PostgreSQL point with coordinates in kilometers on a flat plane"""
+
+    function = "point"
+    output_field = Field()
+
+
+class PointDistance(Func):
+    """Distance between two points, the <-> operator can be ordered by a GiST index"""
+
+    arg_joiner = " <-> "
+    template = "(%(expressions)s)"
+    output_field = FloatField()
+
+
+def get_project_point() -> PlanePoint:
+    """Point of a project, must match the GiST index of Project"""
+    return PlanePoint(
+        F("coordinates_lon") * KM_PER_LON_DEGREE,
+        F("coordinates_lat") * KM_PER_LAT_DEGREE,
+    )
+
+
+def get_distance_to_project(lat: float, lon: float) -> PointDistance:
+    """
+    Distance in kilometers from the given coordinates to a project.
+
+    Treats the Earth as a flat plane, compared to the Haversine formula the difference
+    within Amsterdam is ~11 meters on average and ~46 meters at most.
+    """
+    point = PlanePoint(
+        Value(lon * KM_PER_LON_DEGREE, output_field=FloatField()),
+        Value(lat * KM_PER_LAT_DEGREE, output_field=FloatField()),
+    )
+    return PointDistance(get_project_point(), point)
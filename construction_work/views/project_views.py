@@ -3,18 +3,16 @@ import datetime
 from django.conf import settings
 from django.contrib.postgres.search import TrigramSimilarity
 from django.db.models import (
-    BooleanField,
     Case,
     DateTimeField,
     F,
-    FloatField,
-    Max,
     Prefetch,
     Value,
     When,
 )
-from django.db.models.functions import Cast, Coalesce, Greatest, Power, Sqrt
+from django.db.models.functions import Greatest
 from django.utils import timezone
+from django.utils.decorators import method_decorator
 from drf_spectacular.types import OpenApiTypes
 from drf_spectacular.utils import OpenApiExample, OpenApiParameter
 from rest_framework import generics, status
@@ -36,9 +34,16 @@ from construction_work.serializers.project_serializers import (
     WarningMessageWithImagesSerializer,
 )
 from construction_work.services.geocoding import geocode_address
+from construction_work.utils.distance_utils import get_distance_to_project
 from construction_work.utils.url_utils import get_media_url
+from core.enums import Module
 from core.exceptions import MissingDeviceIdHeader
 from core.pagination import CustomPagination
+from core.utils.caching_utils import (
+    conditional_get,
+    dataset_etag,
+    versioned_cache_page,
+)
 from core.utils.openapi_utils import (
     extend_schema_for_api_key,
     extend_schema_for_device_id,
@@ -122,7 +127,6 @@ class ProjectListView(DeviceIdMixin, generics.ListAPIView):
         - 2: followed without content
         - 3: non-followed (default value)
         """
-        queryset = self._annotate_with_latest_content_date(queryset)
         if self.device_location_present:
             queryset = self._annotate_distance(queryset, float(lat), float(lon))
 
@@ -135,8 +139,13 @@ class ProjectListView(DeviceIdMixin, generics.ListAPIView):
             followed_projects_ids = []
         queryset = queryset.annotate(
             ordering_group=Case(
-                When(id__in=followed_projects_ids, has_content=True, then=Value(1)),
-                When(id__in=followed_projects_ids, has_content=False, then=Value(2)),
+                # latest_content_date is kept up to date by services.project_ranking
+                When(
+                    id__in=followed_projects_ids,
+                    latest_content_date__isnull=False,
+                    then=Value(1),
+                ),
+                When(id__in=followed_projects_ids, then=Value(2)),
                 default=Value(3),
             )
         )
@@ -145,15 +154,19 @@ class ProjectListView(DeviceIdMixin, generics.ListAPIView):
         return queryset
 
     def order_queryset(self, queryset):
-        order_fields = ["ordering_group"]
-        # Always order by content date for group 1 (followed projects with content)
-        order_fields.append(
-            Case(
-                When(ordering_group=1, then=F("latest_content_date")),
-                default=self.default_date,
-                output_field=DateTimeField(),
-            ).desc()
-        )
+        order_fields = []
+        # Without followed projects every project is in group 3. Leaving the groups out
+        # lets the database order by distance with the GiST index of Project.
+        if self.followed_projects_ids:
+            order_fields.append("ordering_group")
+            # Always order by content date for group 1 (followed projects with content)
+            order_fields.append(
+                Case(
+                    When(ordering_group=1, then=F("latest_content_date")),
+                    default=self.default_date,
+                    output_field=DateTimeField(),
+                ).desc()
+            )
         if self.device_location_present:
             order_fields.append("distance")
         order_fields.append("-publication_date")
@@ -163,64 +176,12 @@ class ProjectListView(DeviceIdMixin, generics.ListAPIView):
         queryset = queryset.order_by(*order_fields)
         return queryset
 
-    def _annotate_with_latest_content_date(self, queryset):
-        """
-        Annotate queryset with:
-        - Latest publication date of related content (articles and warnings)
-        - Boolean flag indicating if project has content
-        """
-        return queryset.annotate(
-            latest_article_pub_date=Coalesce(
-                Max("article__publication_date"),
-                Value(self.default_date, output_field=DateTimeField()),
-                output_field=DateTimeField(),
-            ),
-            latest_warning_pub_date=Coalesce(
-                Max("warningmessage__publication_date"),
-                Value(self.default_date, output_field=DateTimeField()),
-                output_field=DateTimeField(),
-            ),
-            latest_content_date=Greatest(
-                "latest_article_pub_date",
-                "latest_warning_pub_date",
-                output_field=DateTimeField(),
-            ),
-            has_content=Case(
-                When(latest_content_date__gt=self.default_date, then=Value(True)),
-                default=Value(False),
-                output_field=BooleanField(),
-            ),
-        )
-
     def _annotate_distance(self, queryset, lat, lon):
         """
-        Annotate queryset with distance from given coordinates using Euclidean formula.
-        Uses simplified distance calculation that treats Earth as flat plane.
-
-        More accurate calculation is the Haversine formula, but this is more complex
-        and requires more computational power.
-        With an average of ~11 meters difference between the two calculations,
-        within Amsterdam and a maximum of ~46 meters difference,
-        this is good enough for our use case.
-
-        The calculation gives a distance in kilometers.
+        Annotate queryset with distance in kilometers from given coordinates,
+        see get_distance_to_project.
         """
-        # Constants for Amsterdam (rough approximation)
-        km_per_lat_degree = 111  # km per 1° of latitude
-        km_per_lon_degree = 68  # km per 1° of longitude at ~52°N
-
-        # Convert lat/lon degrees to kilometer deltas
-        lat_dist = (Cast(F("coordinates_lat"), FloatField()) - lat) * Value(
-            km_per_lat_degree, output_field=FloatField()
-        )
-        lon_dist = (Cast(F("coordinates_lon"), FloatField()) - lon) * Value(
-            km_per_lon_degree, output_field=FloatField()
-        )
-
-        # distance = sqrt(lat_dist^2 + lon_dist^2)
-        distance = Sqrt(Power(lat_dist, 2) + Power(lon_dist, 2))
-
-        return queryset.annotate(distance=distance)
+        return queryset.annotate(distance=get_distance_to_project(lat, lon))
 
     def get_serializer_context(self):
         context = super().get_serializer_context()
@@ -454,6 +415,14 @@ class FollowProjectView(DeviceIdMixin, generics.GenericAPIView):
         return Response(data="Subscription removed", status=status.HTTP_200_OK)
 
 
+# Articles only change with the ETL, which bumps the dataset version
+@method_decorator(
+    conditional_get(etag_func=dataset_etag(Module.CONSTRUCTION_WORK.value)),
+    name="get",
+)
+@method_decorator(
+    versioned_cache_page(Module.CONSTRUCTION_WORK.value, 60 * 60 * 24), name="get"
+)
 class ArticleDetailView(generics.RetrieveAPIView):
     serializer_class = ArticleSerializer
     queryset = Article.objects.filter(active=True)
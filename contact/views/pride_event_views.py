@@ -3,24 +3,37 @@ from datetime import datetime
 
 import requests
 from django.conf import settings
-from django.utils.decorators import method_decorator
-from django.views.decorators.cache import cache_page
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
 from contact.serializers.pride_event_serializers import PrideEventResponseSerializer
 from contact.services.pride_map import PrideMapService
+from core.utils.caching_utils import stale_while_revalidate
 from core.utils.openapi_utils import extend_schema_for_api_key
 
 logger = logging.getLogger(__name__)
 
 
-@method_decorator(cache_page(60 * 10), name="dispatch")  # Cache 10 mins
+@stale_while_revalidate(soft_timeout=60 * 10, hard_timeout=60 * 60)  # Refresh 10 mins
+def load_pride_events() -> list[dict]:
+    return PrideEventsView().get_sorted_events()
+
+
 class PrideEventsView(APIView, PrideMapService):
     @extend_schema_for_api_key(
         success_response=PrideEventResponseSerializer(many=True),
     )
     def get(self, request):
+        sorted_data = load_pride_events()
+        filtered_data = [
+            d
+            for d in sorted_data
+            if d["date_end"]
+            or datetime(year=3000, month=1, day=1).date() > datetime.today().date()
+        ]
+        return Response(filtered_data)
+
+    def get_sorted_events(self) -> list[dict]:
         response = requests.get(settings.PRIDE_EVENT_URL, timeout=5)
         response.raise_for_status()
         data = response.json()
@@ -30,18 +43,10 @@ class PrideEventsView(APIView, PrideMapService):
         serializer.is_valid(raise_exception=True)
         validated_data = serializer.validated_data
 
-        # Sort and filter data
-        sorted_data = sorted(
+        return sorted(
             validated_data,
             key=lambda x: x["date_start"] or datetime(year=3000, month=1, day=1).date(),
         )
-        filtered_data = [
-            d
-            for d in sorted_data
-            if d["date_end"]
-            or datetime(year=3000, month=1, day=1).date() > datetime.today().date()
-        ]
-        return Response(filtered_data)
 
     def _format_data(self, feature):
         coordinates = feature["geometry"]["coordinates"]
@@ -15,11 +15,13 @@ from contact.serializers.service_serializers import (
     ServiceMapsResponseSerializer,
     build_map_response_serializer,
 )
+from core.utils.caching_utils import conditional_get, stale_while_revalidate
 from core.utils.openapi_utils import extend_schema_for_api_key
 
 logger = logging.getLogger(__name__)
 
 
+@method_decorator(conditional_get(max_age=5 * 60), name="get")
 @method_decorator(cache_page(30 * 60), name="get")
 class ServiceMapsView(APIView):
     @extend_schema_for_api_key(
@@ -41,7 +43,27 @@ class ServiceMapsView(APIView):
         return Response(response_serializer.data)
 
 
-@method_decorator(cache_page(10 * 60), name="get")
+@stale_while_revalidate(soft_timeout=10 * 60, hard_timeout=60 * 60)
+def load_service_map(service_id: int) -> dict:
+    """Map data of a service, served stale while a single worker refreshes it"""
+    data_service = Services.get_service_by_id(service_id).dataservice()
+    response_payload = data_service.get_full_data()
+
+    DynamicMapSerializer = build_map_response_serializer(
+        properties=response_payload.get("properties_to_include", []),
+        silent_properties=response_payload.get("silent_properties", []),
+        filters=response_payload.get("filters", []),
+        layers=response_payload.get("layers", []),
+        list_property=response_payload.get("list_property", {}),
+        include_icons=response_payload.get("icons_to_include", None) is not None,
+    )
+
+    response_serializer = DynamicMapSerializer(data=response_payload)
+    response_serializer.is_valid(raise_exception=True)
+    return response_serializer.data
+
+
+@method_decorator(conditional_get(max_age=5 * 60), name="get")
 class ServiceMapView(APIView):
     response_serializer_class = ServiceMapResponseSerializer
 
@@ -69,19 +91,4 @@ class ServiceMapView(APIView):
                 {"detail": "No data service available for this service."},
                 status=status.HTTP_404_NOT_FOUND,
             )
-        data_service = data_service_class.dataservice()
-        response_payload = data_service.get_full_data()
-
-        DynamicMapSerializer = build_map_response_serializer(
-            properties=response_payload.get("properties_to_include", []),
-            silent_properties=response_payload.get("silent_properties", []),
-            filters=response_payload.get("filters", []),
-            layers=response_payload.get("layers", []),
-            list_property=response_payload.get("list_property", {}),
-            include_icons=response_payload.get("icons_to_include", None) is not None,
-        )
-
-        response_serializer = DynamicMapSerializer(data=response_payload)
-        response_serializer.is_valid(raise_exception=True)
-
-        return Response(response_serializer.data)
+        return Response(load_service_map(service_id))
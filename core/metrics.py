@@ -11,3 +11,28 @@ successful_requests_counter = meter.create_counter(
     name="successful_requests",
     description="Number of successful requests in all services",
 )
+
+firebase_tokens_removed_counter = meter.create_counter(
+    name="firebase_tokens_removed",
+    description="Number of invalid Firebase tokens removed from devices",
+)
+
+scheduled_notification_devices_added_counter = meter.create_counter(
+    name="scheduled_notification_devices_added",
+    description="Number of devices linked to a scheduled notification on an upsert",
+)
+
+scheduled_notification_devices_removed_counter = meter.create_counter(
+    name="scheduled_notification_devices_removed",
+    description="Number of stale devices unlinked from a scheduled notification on an upsert",
+)
+
+cache_function_hits_counter = meter.create_counter(
+    name="cache_function_hits",
+    description="Number of cache_function results served from the local or Redis cache",
+)
+
+cache_function_misses_counter = meter.create_counter(
+    name="cache_function_misses",
+    description="Number of cache_function calls that computed the result",
+)
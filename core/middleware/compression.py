@@ -0,0 +1,157 @@
+import hashlib
+import logging
+import re
+import zlib
+
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.cache import patch_vary_headers
+from django.utils.decorators import sync_and_async_middleware
+
+from core.utils.caching_utils import should_bypass_cache
+
+try:
+    import brotli
+except ImportError:
+    # Brotli is optional, responses are compressed with gzip when it is not installed
+    brotli = None
+
+logger = logging.getLogger(__name__)
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+# Only compress JSON, HTML pages contain CSRF tokens which compression would expose (BREACH)
+COMPRESSIBLE_CONTENT_TYPE = re.compile(r"^application/([\w.+-]+\+)?json\b")
+ACCEPTS_GZIP = re.compile(r"\bgzip\b")
+ACCEPTS_BROTLI = re.compile(r"\bbr\b")
+
+
+class _GzipCompressor:
+    def __init__(self):
+        # wbits 31 writes a gzip header and trailer
+        self._compressor = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 31)
+
+    def process(self, data: bytes) -> bytes:
+        return self._compressor.compress(data)
+
+    def flush(self) -> bytes:
+        return self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        return self._compressor.flush()
+
+
+def _get_compressor(encoding: str):
+    if encoding == "br":
+        return brotli.Compressor(quality=BROTLI_QUALITY)
+    return _GzipCompressor()
+
+
+def _get_encoding(request) -> str | None:
+    accept_encoding = request.headers.get("Accept-Encoding", "")
+    if brotli is not None and ACCEPTS_BROTLI.search(accept_encoding):
+        return "br"
+    if ACCEPTS_GZIP.search(accept_encoding):
+        return "gzip"
+    return None
+
+
+def compress(content: bytes, encoding: str) -> bytes:
+    compressor = _get_compressor(encoding)
+    return compressor.process(content) + compressor.finish()
+
+
+def _get_compressed_content(content: bytes, encoding: str) -> bytes:
+    """
+    Compressed content, large payloads are compressed once and then read from the cache.
+    They are mostly cached responses themselves, so the same content is compressed on every hit otherwise.
+    """
+    if len(content) < settings.COMPRESSION_CACHE_MIN_SIZE or should_bypass_cache():
+        return compress(content, encoding)
+
+    key = f"aapp:compressed:{encoding}:{hashlib.sha256(content).hexdigest()}"
+    try:
+        compressed_content = cache.get(key)
+    except Exception:
+        logger.warning("Failed to get compressed content from cache", exc_info=True)
+        return compress(content, encoding)
+
+    if compressed_content is None:
+        compressed_content = compress(content, encoding)
+        try:
+            cache.set(
+                key, compressed_content, timeout=settings.COMPRESSION_CACHE_TIMEOUT
+            )
+        except Exception:
+            logger.warning("Failed to store compressed content in cache", exc_info=True)
+    return compressed_content
+
+
+def _compress_stream(streaming_content, encoding: str):
+    compressor = _get_compressor(encoding)
+    for chunk in streaming_content:
+        # Flush every chunk, so clients receive the data as it is produced
+        yield compressor.process(chunk) + compressor.flush()
+    yield compressor.finish()
+
+
+async def _compress_async_stream(streaming_content, encoding: str):
+    compressor = _get_compressor(encoding)
+    async for chunk in streaming_content:
+        yield compressor.process(chunk) + compressor.flush()
+    yield compressor.finish()
+
+
+def _compress_response(request, response):
+    if (
+        response.has_header("Content-Encoding")
+        or not COMPRESSIBLE_CONTENT_TYPE.match(response.get("Content-Type", ""))
+        or (
+            not response.streaming
+            and len(response.content) < settings.COMPRESSION_MIN_SIZE
+        )
+    ):
+        return response
+
+    patch_vary_headers(response, ("Accept-Encoding",))
+    encoding = _get_encoding(request)
+    if encoding is None:
+        return response
+
+    if response.streaming:
+        if response.is_async:
+            response.streaming_content = _compress_async_stream(
+                response.streaming_content, encoding
+            )
+        else:
+            response.streaming_content = _compress_stream(
+                response.streaming_content, encoding
+            )
+        response.headers.pop("Content-Length", None)
+    else:
+        compressed_content = _get_compressed_content(response.content, encoding)
+        if len(compressed_content) >= len(response.content):
+            return response
+        response.content = compressed_content
+        response["Content-Length"] = str(len(compressed_content))
+
+    # A strong ETag identifies the exact bytes, which differ per encoding
+    etag = response.get("ETag")
+    if etag and etag.startswith('"'):
+        response["ETag"] = "W/" + etag
+    response["Content-Encoding"] = encoding
+    return response
+
+
+@sync_and_async_middleware
+def compression_middleware(get_response):
+    async def _async(request):
+        response = await get_response(request)
+        # Compression and the cache lookup block, keep them off the event loop
+        return await sync_to_async(_compress_response)(request, response)
+
+    def _sync(request):
+        response = get_response(request)
+        return _compress_response(request, response)
+
+    return _async if iscoroutinefunction(get_response) else _sync
@@ -1,14 +1,22 @@
 from asgiref.sync import iscoroutinefunction
+from django.utils.cache import get_conditional_response, set_response_etag
 from django.utils.decorators import sync_and_async_middleware
 
+from core.utils.caching_utils import CONDITIONAL_MAX_AGE_ATTRIBUTE
+
 
 def _apply_default_headers(request, response):
     if request.path.endswith(".ics"):
         return response
 
-    response["Cache-Control"] = "no-cache, no-store, must-revalidate"
-    response["Pragma"] = "no-cache"
-    response["Expires"] = "0"
+    max_age = getattr(response, CONDITIONAL_MAX_AGE_ATTRIBUTE, None)
+    if max_age is None:
+        response["Cache-Control"] = "no-cache, no-store, must-revalidate"
+        response["Pragma"] = "no-cache"
+        response["Expires"] = "0"
+    else:
+        response = _apply_conditional_headers(request, response, max_age)
+
     if response.get("Content-Type"):
         if "charset" not in response["Content-Type"]:
             response["Content-Type"] += "; charset=UTF-8"
@@ -18,6 +26,23 @@ def _apply_default_headers(request, response):
     return response
 
 
+def _apply_conditional_headers(request, response, max_age: int):
+    """Headers of a view decorated with conditional_get, may replace the response with a 304"""
+    response["Cache-Control"] = f"private, max-age={max_age}, must-revalidate"
+    response.headers.pop("Expires", None)
+    if response.status_code != 200 or request.method not in ("GET", "HEAD"):
+        return response
+
+    if not response.has_header("ETag") and not response.streaming:
+        set_response_etag(response)
+    return get_conditional_response(
+        request,
+        etag=response.get("ETag"),
+        last_modified=None,
+        response=response,
+    )
+
+
 @sync_and_async_middleware
 def default_headers_middleware(get_response):
     async def _async(request):
@@ -1,6 +1,12 @@
+import base64
+import binascii
+import uuid
 from urllib.parse import urlencode
 
-from rest_framework.pagination import PageNumberPagination
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, PageNumberPagination
 from rest_framework.response import Response
 
 
@@ -140,3 +146,132 @@ class CustomPagination(PageNumberPagination):
                 },
             },
         }
+
+
+class KeysetPagination(BasePagination):
+    """
+    Cursor pagination on (created_at, id), newest first, without a count query.
+
+    The client opts in by sending the page_size or cursor query parameter,
+    otherwise the response is not paginated. The view orders its queryset by
+    ("-created_at", "-id") and applies get_keyset_filter() before slicing.
+    This also works for combined (UNION) querysets, where the filter has to be
+    applied to every part.
+    """
+
+    cursor_query_param = "cursor"
+    page_size_query_param = "page_size"
+    page_size = 10
+    max_page_size = 100
+    invalid_cursor_message = "Invalid cursor"
+
+    def is_requested(self, request) -> bool:
+        return (
+            self.cursor_query_param in request.query_params
+            or self.page_size_query_param in request.query_params
+        )
+
+    def get_page_size(self, request) -> int:
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+        except KeyError, ValueError:
+            return self.page_size
+        return min(max(page_size, 1), self.max_page_size)
+
+    def get_keyset_filter(self, request) -> Q | None:
+        """Filter for the rows after the cursor, None for the first page"""
+        cursor = request.query_params.get(self.cursor_query_param)
+        if not cursor:
+            return None
+        created_at, pk = self.decode_cursor(cursor)
+        return Q(created_at__lt=created_at) | Q(created_at=created_at, id__lt=pk)
+
+    def decode_cursor(self, cursor: str) -> tuple:
+        try:
+            created_at, pk = (
+                base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+            )
+            created_at = parse_datetime(created_at)
+            pk = uuid.UUID(pk)
+        except binascii.Error, UnicodeDecodeError, ValueError:
+            raise NotFound(self.invalid_cursor_message)
+        if created_at is None:
+            raise NotFound(self.invalid_cursor_message)
+        return created_at, pk
+
+    def encode_cursor(self, item) -> str:
+        created_at = self._get_value(item, "created_at")
+        pk = self._get_value(item, "id")
+        position = f"{created_at.isoformat()}|{pk}"
+        return base64.urlsafe_b64encode(position.encode()).decode()
+
+    @staticmethod
+    def _get_value(item, name: str):
+        return item[name] if isinstance(item, dict) else getattr(item, name)
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if not self.is_requested(request):
+            return None
+
+        self.request = request
+        page_size = self.get_page_size(request)
+        # Fetch a single extra row to know if there is a next page
+        items = list(queryset[: page_size + 1])
+        self.has_next = len(items) > page_size
+        self.page = items[:page_size]
+        self.page_size_used = page_size
+        return self.page
+
+    def get_next_link(self) -> str | None:
+        if not self.has_next:
+            return None
+        query_params = self.request.query_params.copy()
+        query_params[self.cursor_query_param] = self.encode_cursor(self.page[-1])
+        query_params[self.page_size_query_param] = self.page_size_used
+        base_uri = self.request.build_absolute_uri(self.request.path)
+        return f"{base_uri}?{urlencode(query_params, doseq=True)}"
+
+    def get_paginated_response(self, data):
+        links = {"self": {"href": self.request.build_absolute_uri()}}
+        next_href = self.get_next_link()
+        if next_href:
+            links["next"] = {"href": next_href}
+
+        return Response(
+            {
+                "result": data,
+                "page": {"size": self.page_size_used},
+                "_links": links,
+            }
+        )
+
+    def get_paginated_response_schema(self, schema):
+        link_schema = {
+            "type": "object",
+            "properties": {
+                "href": {
+                    "type": "string",
+                    "format": "uri",
+                    "example": "http://api.example.com/notifications?cursor=MjAyNC0xMC0zMVQxNjozMDowMCswMDowMHwx&page_size=10",
+                }
+            },
+        }
+        return {
+            "type": "object",
+            "properties": {
+                "result": schema,
+                "page": {
+                    "type": "object",
+                    "properties": {
+                        "size": {"type": "integer", "example": 10},
+                    },
+                },
+                "_links": {
+                    "type": "object",
+                    "properties": {
+                        "self": link_schema,
+                        "next": link_schema,
+                    },
+                },
+            },
+        }
@@ -0,0 +1,78 @@
+import logging
+from typing import Iterable
+
+from django.db import connections, router
+from more_itertools import chunked
+
+from notification.models.notification_models import Device
+
+logger = logging.getLogger(__name__)
+# Mappings are not cached in-process: a device deleted by another process would keep resolving
+# to its deleted id, and the statement below already resolves a batch in a single round trip.
+RESOLVE_BATCH_SIZE = 5000
+
+# Existing devices are selected in the same statement, because RETURNING only returns inserted rows.
+# Both parts use the snapshot from the start of the statement, so they never return the same device.
+INSERT_OR_SELECT_SQL = """
+WITH requested AS (
+    SELECT unnest(%(external_ids)s::varchar[]) AS external_id
+),
+inserted AS (
+    INSERT INTO {table} (external_id, os, last_seen)
+    SELECT external_id, '', now() FROM requested ORDER BY external_id
+    ON CONFLICT (external_id) DO NOTHING
+    RETURNING external_id, id
+)
+SELECT external_id, id, true FROM inserted
+UNION ALL
+SELECT device.external_id, device.id, false
+FROM {table} device JOIN requested USING (external_id)
+"""
+
+
+def resolve_device_ids(external_ids: Iterable[str]) -> dict[str, int]:
+    """
+    Map external device ids to internal device ids, missing devices are created.
+
+    External ids are resolved with one statement per RESOLVE_BATCH_SIZE ids.
+
+    Returns:
+        dict: external id mapped to internal id, in the order of external_ids
+    """
+    external_ids = list(dict.fromkeys(external_ids))
+    device_ids = {}
+    created_count = 0
+    for batch in chunked(external_ids, RESOLVE_BATCH_SIZE):
+        resolved_ids, batch_created_count = _insert_or_select(batch)
+        device_ids.update(resolved_ids)
+        created_count += batch_created_count
+
+    if created_count:
+        logger.info("Created %s missing devices.", created_count)
+    return {external_id: device_ids[external_id] for external_id in external_ids}
+
+
+def _insert_or_select(external_ids: list[str]) -> tuple[dict[str, int], int]:
+    """
+    Returns:
+        tuple: external id mapped to internal id, number of created devices
+    """
+    db_connection = connections[router.db_for_write(Device)]
+    table = db_connection.ops.quote_name(Device._meta.db_table)
+    with db_connection.cursor() as cursor:
+        cursor.execute(
+            INSERT_OR_SELECT_SQL.format(table=table), {"external_ids": external_ids}
+        )
+        rows = cursor.fetchall()
+    device_ids = {external_id: device_id for external_id, device_id, _ in rows}
+    created_count = sum(created for _, _, created in rows)
+
+    # A device inserted by a concurrent transaction is not in the snapshot of the statement
+    concurrently_created_ids = set(external_ids) - device_ids.keys()
+    if concurrently_created_ids:
+        device_ids.update(
+            Device.objects.filter(external_id__in=concurrently_created_ids).values_list(
+                "external_id", "id"
+            )
+        )
+    return device_ids, created_count
@@ -1,12 +1,20 @@
 import logging
+from typing import Iterable
 
 import requests
 from django.conf import settings
 from django.core.cache import cache
 
 from core.services.internal_http_client import InternalServiceSession
+from core.utils.caching_utils import LocalCache, should_bypass_cache
 
 logger = logging.getLogger(__name__)
+CACHE_TIMEOUT = 60 * 60 * 24
+local_image_sets = LocalCache(maxsize=1000, timeout=60 * 60)
+
+
+def get_image_set_cache_key(image_set_id) -> str:
+    return f"{__name__}.get_from_id.{image_set_id}"
 
 
 class ImageSetService:
@@ -15,18 +23,23 @@ class ImageSetService:
         self.client = InternalServiceSession()
 
     def get(self, image_set_id):
-        cache_key = f"{__name__}.get_from_id.{image_set_id}"
-        cached_data = cache.get(cache_key)
+        cached_data = cache.get(get_image_set_cache_key(image_set_id))
         if cached_data:
             self.data = cached_data
             return self.data
 
+        return self.fetch(image_set_id)
+
+    def fetch(self, image_set_id):
+        """Get the image set from the image service and store it in the cache"""
         base_url = settings.IMAGE_ENDPOINTS["DETAIL"]
         url = f"{base_url}/{image_set_id}"
         response = self.client.get(url)
         response.raise_for_status()
         self.data = response.json()
-        cache.set(cache_key, self.data, timeout=60 * 60 * 24)
+        cache.set(
+            get_image_set_cache_key(image_set_id), self.data, timeout=CACHE_TIMEOUT
+        )
         return self.data
 
     def exists(self, image_set_id):
@@ -71,7 +84,7 @@ class ImageSetService:
         response = self.client.post(image_upload_url, data=data)
         response.raise_for_status()
         self.data = response.json()
-        cache.set(cache_key, self.data, timeout=60 * 60 * 24)
+        cache.set(cache_key, self.data, timeout=CACHE_TIMEOUT)
         return self.data
 
     @property
@@ -88,3 +101,56 @@ class ImageSetService:
 
     def json(self):
         return self.data
+
+
+class ImageSetResolver:
+    """
+    Resolves image sets for the duration of a single run or request.
+
+    Every distinct image set id is resolved once: first from the in-process LRU,
+    then in bulk from Redis and only the remaining ids from the image service.
+    Use prefetch() with all ids up front, so get() does not need any lookups.
+    """
+
+    def __init__(self):
+        self._image_sets = {}
+        self._image_set_service = None
+
+    def prefetch(self, image_set_ids: Iterable[int | None]):
+        missing_ids = {
+            image_set_id
+            for image_set_id in image_set_ids
+            if image_set_id is not None and image_set_id not in self._image_sets
+        }
+        if not missing_ids:
+            return
+
+        use_local_cache = not should_bypass_cache()
+        if use_local_cache:
+            for image_set_id in list(missing_ids):
+                data = local_image_sets.get(image_set_id)
+                if data is not None:
+                    self._image_sets[image_set_id] = data
+                    missing_ids.discard(image_set_id)
+
+        cache_keys = {
+            get_image_set_cache_key(image_set_id): image_set_id
+            for image_set_id in missing_ids
+        }
+        for cache_key, data in cache.get_many(cache_keys).items():
+            if data:
+                self._image_sets[cache_keys[cache_key]] = data
+
+        for image_set_id in missing_ids - self._image_sets.keys():
+            if self._image_set_service is None:
+                self._image_set_service = ImageSetService()
+            self._image_sets[image_set_id] = self._image_set_service.fetch(image_set_id)
+
+        if use_local_cache:
+            for image_set_id in missing_ids:
+                local_image_sets.set(image_set_id, self._image_sets[image_set_id])
+
+    def get(self, image_set_id: int) -> dict:
+        if image_set_id not in self._image_sets:
+            self.prefetch([image_set_id])
+        return self._image_sets[image_set_id]
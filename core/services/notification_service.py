@@ -3,11 +3,16 @@ import uuid
 from datetime import datetime
 from typing import Any, Iterable, NamedTuple
 
-from django.db import transaction
+from django.db import connections, router, transaction
 from django.db.models import QuerySet
 from django.utils import timezone
 from more_itertools import chunked
 
+from core.metrics import (
+    scheduled_notification_devices_added_counter,
+    scheduled_notification_devices_removed_counter,
+)
+from core.services.device_resolution import resolve_device_ids
 from core.services.image_set import ImageSetService
 from core.utils.device_utils import create_missing_device_ids
 from notification.models.notification_models import (
@@ -18,6 +23,35 @@ from notification.models.notification_models import (
 
 logger = logging.getLogger(__name__)
 BATCH_SIZE = 5000
+SCHEDULED_NOTIFICATION_READY_CHANNEL = "scheduled_notification_ready"
+# Devices that should stay linked while synchronizing a scheduled notification,
+# the table is reused for every notification that is synchronized in the same transaction
+CREATE_SYNCED_DEVICES_SQL = """
+CREATE TEMPORARY TABLE IF NOT EXISTS synced_device (device_id bigint PRIMARY KEY) ON COMMIT DROP
+"""
+INSERT_SYNCED_DEVICES_SQL = """
+INSERT INTO synced_device SELECT unnest(%s::bigint[]) ON CONFLICT DO NOTHING
+"""
+DELETE_STALE_DEVICES_SQL = """
+DELETE FROM {table} link
+WHERE link.schedulednotification_id = %s
+AND NOT EXISTS (SELECT FROM synced_device WHERE synced_device.device_id = link.device_id)
+"""
+# Keeps the number of query parameters of a single upsert well below the PostgreSQL limit
+UPSERT_BATCH_SIZE = 1000
+# Only the content and timing of an existing scheduled notification are updated
+UPSERT_SQL = """
+INSERT INTO {table} ({columns})
+VALUES {rows}
+ON CONFLICT (identifier) DO UPDATE SET
+    title = EXCLUDED.title,
+    body = EXCLUDED.body,
+    scheduled_for = EXCLUDED.scheduled_for,
+    expires_at = EXCLUDED.expires_at,
+    image = COALESCE(EXCLUDED.image, {table}.image),
+    is_ready = EXCLUDED.is_ready
+RETURNING *, (xmax = 0) AS is_created
+"""
 
 
 class NotificationServiceError(Exception):
@@ -42,6 +76,20 @@ class NotificationData(NamedTuple):
     deeplink: str | None = None
 
 
+class ScheduledNotificationData(NamedTuple):
+    """Arguments of AbstractNotificationService.upsert(), to upsert many notifications at once"""
+
+    notification: NotificationData
+    identifier: str | None = None
+    context: dict | None = None
+    scheduled_for: datetime | None = None
+    expires_at: datetime | None = None
+    expiry_minutes: int = 15
+    send_all_devices: bool = False
+    broadcast: bool = False
+    remove_stale_devices: bool = False
+
+
 class AbstractNotificationService:
     """Unified service that supports both:
 
@@ -85,10 +133,84 @@ class AbstractNotificationService:
         expires_at: datetime | None = None,
         expiry_minutes: int = 15,
         send_all_devices: bool = False,
+        broadcast: bool = False,
+        remove_stale_devices: bool = False,
+    ) -> ScheduledNotification:
+        """
+        Create or update a scheduled notification.
+
+        With broadcast, a notification for all devices is stored once instead of once per device.
+        The devices are not linked to the scheduled notification, so broadcast requires send_all_devices.
+        With remove_stale_devices, devices that were linked by a previous upsert but are not in
+        notification.device_ids anymore are unlinked. By default devices are only added.
+        """
+        return self.upsert_many(
+            [
+                ScheduledNotificationData(
+                    notification=notification,
+                    identifier=identifier,
+                    context=context,
+                    scheduled_for=scheduled_for,
+                    expires_at=expires_at,
+                    expiry_minutes=expiry_minutes,
+                    send_all_devices=send_all_devices,
+                    broadcast=broadcast,
+                    remove_stale_devices=remove_stale_devices,
+                )
+            ]
+        )[0]
+
+    def upsert_many(
+        self, scheduled_notifications: list[ScheduledNotificationData]
+    ) -> list[ScheduledNotification]:
+        """
+        Create or update scheduled notifications with a single INSERT ... ON CONFLICT statement.
+
+        Everything is validated before writing, so either all or none of the notifications are stored.
+        Note: notification type, module slug, context, make_push and is_broadcast are not updatable.
+        On updates only the difference with the previously linked devices is written.
+
+        Returns:
+            list: the stored scheduled notifications, in the order of scheduled_notifications
+        """
+        instances = [
+            self._build_scheduled_notification(data) for data in scheduled_notifications
+        ]
+        identifiers = [instance.identifier for instance in instances]
+        if len(set(identifiers)) != len(identifiers):
+            raise NotificationServiceError("Identifiers must be unique")
+
+        internal_device_ids = self._get_internal_device_ids_many(
+            scheduled_notifications
+        )
+        with transaction.atomic(using=router.db_for_write(ScheduledNotification)):
+            instances = self._upsert_scheduled_notifications(instances)
+            for instance, data, device_ids in zip(
+                instances, scheduled_notifications, internal_device_ids, strict=True
+            ):
+                self._sync_devices(
+                    instance,
+                    device_ids,
+                    remove_stale=data.remove_stale_devices
+                    and not instance.is_created
+                    and not data.send_all_devices,
+                )
+                self._notify_ready(instance)
+        return instances
+
+    def _build_scheduled_notification(
+        self, data: ScheduledNotificationData
     ) -> ScheduledNotification:
+        """Unsaved scheduled notification, validated without querying the database"""
+        notification = data.notification
+        if data.broadcast and not data.send_all_devices:
+            raise NotificationServiceError("Broadcast requires send_all_devices")
+
+        identifier = data.identifier
         if identifier is None:
             identifier = f"{self.module_slug}_{uuid.uuid4()}"
 
+        context = data.context
         if context is None:
             context = self.build_context(
                 module_slug=self.module_slug,
@@ -98,13 +220,15 @@ class AbstractNotificationService:
                 deeplink=notification.deeplink,
             )
 
+        scheduled_for = data.scheduled_for
         if scheduled_for is None:
             scheduled_for = timezone.now() + timezone.timedelta(seconds=5)
 
+        expires_at = data.expires_at
         if expires_at is None:
-            expires_at = scheduled_for + timezone.timedelta(minutes=expiry_minutes)
+            expires_at = scheduled_for + timezone.timedelta(minutes=data.expiry_minutes)
 
-        if expires_at and expires_at <= scheduled_for:
+        if expires_at <= scheduled_for:
             raise NotificationServiceError(
                 "Expires_at must be later than scheduled_for"
             )
@@ -122,44 +246,91 @@ class AbstractNotificationService:
                     f"Image with id {notification.image_set_id} does not exist"
                 )
 
-        internal_device_ids = self.get_internal_device_ids(
-            notification, send_all_devices
+        instance = ScheduledNotification(
+            title=notification.title,
+            body=notification.message,
+            scheduled_for=scheduled_for,
+            identifier=identifier,
+            context=context,
+            notification_type=self.notification_type,
+            module_slug=self.module_slug,
+            image=notification.image_set_id,
+            created_at=timezone.now(),
+            expires_at=expires_at,
+            make_push=notification.make_push,
+            is_ready=True,
+            is_broadcast=data.broadcast,
         )
-        instance = self._get_scheduled_notification_instance(identifier)
-        if not instance:
-            instance = ScheduledNotification(
-                title=notification.title,
-                body=notification.message,
-                scheduled_for=scheduled_for,
-                identifier=identifier,
-                context=context,
-                notification_type=self.notification_type,
-                module_slug=self.module_slug,
-                image=notification.image_set_id,
-                created_at=timezone.now(),
-                expires_at=expires_at or "3000-01-01",
-                make_push=notification.make_push,
+        instance.set_default_context()
+        # The unique identifier is handled by the upsert and expires_at is checked above
+        instance.full_clean(validate_unique=False, validate_constraints=False)
+        return instance
+
+    def _upsert_scheduled_notifications(
+        self, instances: list[ScheduledNotification]
+    ) -> list[ScheduledNotification]:
+        """Insert or update the scheduled notifications by identifier in one round trip"""
+        db_alias = router.db_for_write(ScheduledNotification)
+        db_connection = connections[db_alias]
+        quote_name = db_connection.ops.quote_name
+        table = quote_name(ScheduledNotification._meta.db_table)
+        fields = ScheduledNotification._meta.concrete_fields
+        columns = ", ".join(quote_name(field.column) for field in fields)
+        row_placeholder = f"({', '.join(['%s'] * len(fields))})"
+
+        stored_instances = {}
+        for batch in chunked(instances, UPSERT_BATCH_SIZE):
+            params = [
+                field.get_db_prep_save(getattr(instance, field.attname), db_connection)
+                for instance in batch
+                for field in fields
+            ]
+            sql = UPSERT_SQL.format(
+                table=table,
+                columns=columns,
+                rows=", ".join([row_placeholder] * len(batch)),
             )
-            with transaction.atomic():
-                self._save_scheduled_notification(
-                    internal_device_ids, instance=instance
+            stored_instances.update(
+                (instance.identifier, instance)
+                for instance in ScheduledNotification.objects.db_manager(db_alias).raw(
+                    sql, params
                 )
-            return instance
-
-        # Perform UPDATE if object exists
-        # Note: notification type, module slug, context and make_push are not updatable
-        instance.title = notification.title
-        instance.body = notification.message
-        instance.scheduled_for = scheduled_for
-
-        if notification.image_set_id is not None:
-            instance.image = notification.image_set_id
-        if expires_at is not None:
-            instance.expires_at = expires_at
-        with transaction.atomic():
-            self._save_scheduled_notification(internal_device_ids, instance=instance)
-
-        return instance
+            )
+        return [stored_instances[instance.identifier] for instance in instances]
+
+    def _get_internal_device_ids_many(
+        self, scheduled_notifications: list[ScheduledNotificationData]
+    ) -> list[Iterable[int]]:
+        """Internal device ids per scheduled notification, lists of external ids are resolved together"""
+        external_ids = [
+            external_id
+            for data in scheduled_notifications
+            if not data.send_all_devices
+            and isinstance(data.notification.device_ids, list)
+            for external_id in data.notification.device_ids
+        ]
+        resolved_device_ids = resolve_device_ids(external_ids) if external_ids else {}
+
+        internal_device_ids = []
+        for data in scheduled_notifications:
+            if data.broadcast:
+                internal_device_ids.append([])
+            elif not data.send_all_devices and isinstance(
+                data.notification.device_ids, list
+            ):
+                internal_device_ids.append(
+                    [
+                        resolved_device_ids[external_id]
+                        for external_id in dict.fromkeys(data.notification.device_ids)
+                    ]
+                )
+            else:
+                internal_device_ids.append(
+                    self.get_internal_device_ids(
+                        data.notification, data.send_all_devices
+                    )
+                )
+        return internal_device_ids
 
     def get_internal_device_ids(
         self, notification: NotificationData, send_all_devices: bool
@@ -194,26 +365,88 @@ class AbstractNotificationService:
                 raise NotificationServiceError("Unknown device ids type")
         return internal_device_ids
 
-    def _save_scheduled_notification(
-        self, internal_device_ids: Iterable[int], instance: ScheduledNotification
+    def _sync_devices(
+        self,
+        instance: ScheduledNotification,
+        internal_device_ids: Iterable[int],
+        remove_stale: bool,
     ):
+        """
+        Link the devices to the scheduled notification, writing only the difference in batches.
+
+        Args:
+            instance (ScheduledNotification): upserted notification, annotated with is_created
+            internal_device_ids (Iterable): devices that should be linked
+            remove_stale (bool): unlink previously linked devices that are not in internal_device_ids
+        """
         # Inserting into the Through table is much less memory-intensive than instance.devices.set(devices)
-        # Note: previously added devices will not be removed on updates!
         Through = ScheduledNotification.devices.through
-        instance.save()
-        for batch in chunked(internal_device_ids, BATCH_SIZE):
-            rows = (
-                Through(
-                    schedulednotification_id=instance.id,
-                    device_id=device_id,
+        links = Through.objects.filter(schedulednotification_id=instance.id)
+        db_connection = connections[router.db_for_write(Through)]
+        added_count = 0
+        removed_count = 0
+        # The linked devices are collected in a temporary table, so stale links are found in the database
+        with (
+            transaction.atomic(using=db_connection.alias),
+            db_connection.cursor() as cursor,
+        ):
+            if remove_stale:
+                cursor.execute(CREATE_SYNCED_DEVICES_SQL)
+                cursor.execute("TRUNCATE synced_device")
+            for batch in chunked(internal_device_ids, BATCH_SIZE):
+                if remove_stale:
+                    cursor.execute(INSERT_SYNCED_DEVICES_SQL, [batch])
+                linked_device_ids = (
+                    set()
+                    if instance.is_created
+                    else set(
+                        links.filter(device_id__in=batch).values_list(
+                            "device_id", flat=True
+                        )
+                    )
                 )
-                for device_id in batch
-            )
-            Through.objects.bulk_create(
-                rows, batch_size=BATCH_SIZE, ignore_conflicts=True
+                rows = [
+                    Through(schedulednotification_id=instance.id, device_id=device_id)
+                    for device_id in dict.fromkeys(batch)
+                    if device_id not in linked_device_ids
+                ]
+                Through.objects.bulk_create(
+                    rows, batch_size=BATCH_SIZE, ignore_conflicts=True
+                )
+                added_count += len(rows)
+
+            if remove_stale:
+                cursor.execute(
+                    DELETE_STALE_DEVICES_SQL.format(
+                        table=db_connection.ops.quote_name(Through._meta.db_table)
+                    ),
+                    [instance.id],
+                )
+                removed_count = cursor.rowcount
+
+        scheduled_notification_devices_added_counter.add(
+            added_count, {"module_slug": instance.module_slug}
+        )
+        scheduled_notification_devices_removed_counter.add(
+            removed_count, {"module_slug": instance.module_slug}
+        )
+        logger.info(
+            "Synchronized scheduled notification devices",
+            extra={
+                "identifier": instance.identifier,
+                "added_count": added_count,
+                "removed_count": removed_count,
+            },
+        )
+
+    def _notify_ready(self, instance: ScheduledNotification):
+        """Wake up the pushschedulednotifications workers that are waiting with LISTEN"""
+        db_connection = connections[router.db_for_write(ScheduledNotification)]
+        with db_connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT pg_notify(%s, %s)",
+                [SCHEDULED_NOTIFICATION_READY_CHANNEL, instance.identifier],
             )
-        instance.is_ready = True
-        instance.save()
 
     def build_context(
         self,
@@ -237,11 +470,6 @@ class AbstractNotificationService:
 
         return context
 
-    def _get_scheduled_notification_instance(
-        self, identifier: str
-    ) -> ScheduledNotification | None:
-        return ScheduledNotification.objects.filter(identifier=identifier).first()
-
     def get_notifications(self, device_id: str) -> list[Notification]:
         return (
             Notification.objects.select_related("device")
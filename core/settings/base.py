@@ -91,6 +91,7 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     "core.middleware.db_retry_on_timeout.database_retry_middleware",
+    "core.middleware.compression.compression_middleware",
     "debug_toolbar.middleware.DebugToolbarMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
@@ -381,6 +382,12 @@ CACHES = {
     }
 }
 
+# Responses smaller than this are not worth the compression overhead
+COMPRESSION_MIN_SIZE = 1024
+# Compressed responses of at least this size are cached, these are the shared GeoJSON and list payloads
+COMPRESSION_CACHE_MIN_SIZE = 64 * 1024
+COMPRESSION_CACHE_TIMEOUT = 60 * 60
+
 ADMIN_ROLES = []
 MOCK_FIREBASE = False
 FIREBASE_CREDENTIALS = os.getenv("FIREBASE_JSON")
@@ -0,0 +1,96 @@
+import gzip
+import os
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.http import HttpResponse, StreamingHttpResponse
+from django.test import RequestFactory, TestCase, override_settings
+
+from core.middleware import compression
+from core.middleware.compression import compression_middleware
+
+CONTENT = b'{"features": [' + b'{"type": "Feature"},' * 200 + b"{}]}"
+
+
+@override_settings(COMPRESSION_MIN_SIZE=1024, COMPRESSION_CACHE_MIN_SIZE=2048)
+class TestCompressionMiddleware(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.factory = RequestFactory()
+
+    def get_request(self, accept_encoding="gzip"):
+        return self.factory.get("/", headers={"Accept-Encoding": accept_encoding})
+
+    def get_response(self, content=CONTENT, content_type="application/json"):
+        return HttpResponse(content, content_type=content_type)
+
+    def test_compresses_large_json(self):
+        middleware = compression_middleware(lambda r: self.get_response())
+        response = middleware(self.get_request())
+
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        self.assertEqual(response["Vary"], "Accept-Encoding")
+        self.assertEqual(response["Content-Length"], str(len(response.content)))
+        self.assertEqual(gzip.decompress(response.content), CONTENT)
+
+    def test_skips_small_response(self):
+        middleware = compression_middleware(lambda r: self.get_response(b"{}"))
+        response = middleware(self.get_request())
+
+        self.assertFalse(response.has_header("Content-Encoding"))
+        self.assertEqual(response.content, b"{}")
+
+    def test_skips_html(self):
+        middleware = compression_middleware(
+            lambda r: self.get_response(content_type="text/html")
+        )
+        response = middleware(self.get_request())
+
+        self.assertFalse(response.has_header("Content-Encoding"))
+
+    def test_skips_client_without_gzip(self):
+        middleware = compression_middleware(lambda r: self.get_response())
+        response = middleware(self.get_request(accept_encoding="identity"))
+
+        self.assertFalse(response.has_header("Content-Encoding"))
+        self.assertEqual(response["Vary"], "Accept-Encoding")
+        self.assertEqual(response.content, CONTENT)
+
+    def test_weakens_etag(self):
+        def get_response(request):
+            response = self.get_response()
+            response["ETag"] = '"etag"'
+            return response
+
+        response = compression_middleware(get_response)(self.get_request())
+
+        self.assertEqual(response["ETag"], 'W/"etag"')
+
+    @patch.object(compression, "brotli", None)
+    def test_falls_back_to_gzip_without_brotli(self):
+        middleware = compression_middleware(lambda r: self.get_response())
+        response = middleware(self.get_request(accept_encoding="br, gzip"))
+
+        self.assertEqual(response["Content-Encoding"], "gzip")
+
+    def test_compresses_stream(self):
+        middleware = compression_middleware(
+            lambda r: StreamingHttpResponse(
+                [CONTENT[:100], CONTENT[100:]], content_type="application/json"
+            )
+        )
+        response = middleware(self.get_request())
+
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        self.assertEqual(gzip.decompress(b"".join(response.streaming_content)), CONTENT)
+
+    @patch.dict(os.environ, {"CACHE_FUNCTION_ENABLED_PYTEST": "true"})
+    @patch.object(compression, "compress", wraps=compression.compress)
+    def test_caches_compressed_content(self, mock_compress):
+        middleware = compression_middleware(lambda r: self.get_response())
+        first_response = middleware(self.get_request())
+        second_response = middleware(self.get_request())
+
+        mock_compress.assert_called_once()
+        self.assertEqual(first_response.content, second_response.content)
+        self.assertEqual(gzip.decompress(second_response.content), CONTENT)
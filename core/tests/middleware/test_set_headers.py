@@ -2,6 +2,7 @@ from django.http import HttpResponse
 from django.test import RequestFactory, TestCase
 
 from core.middleware.set_headers import default_headers_middleware
+from core.utils.caching_utils import conditional_get
 
 
 class TestDefaultHeadersMiddleware(TestCase):
@@ -49,3 +50,51 @@ class TestDefaultHeadersMiddleware(TestCase):
             processed_response["Content-Type"],
             "application/json; charset=UTF-8",
         )
+
+    def test_disables_caching_by_default(self):
+        request = self.factory.get("/")
+
+        middleware = default_headers_middleware(self.get_response)
+        processed_response = middleware(request)
+
+        self.assertEqual(
+            processed_response["Cache-Control"], "no-cache, no-store, must-revalidate"
+        )
+        self.assertFalse(processed_response.has_header("ETag"))
+
+    def test_conditional_view_gets_content_etag(self):
+        view = conditional_get(max_age=60)(lambda r: HttpResponse(b"content"))
+
+        middleware = default_headers_middleware(view)
+        processed_response = middleware(self.factory.get("/"))
+
+        self.assertEqual(processed_response.status_code, 200)
+        self.assertEqual(
+            processed_response["Cache-Control"], "private, max-age=60, must-revalidate"
+        )
+        self.assertFalse(processed_response.has_header("Pragma"))
+        self.assertTrue(processed_response.has_header("ETag"))
+
+    def test_conditional_view_not_modified(self):
+        view = conditional_get()(lambda r: HttpResponse(b"content"))
+        middleware = default_headers_middleware(view)
+        etag = middleware(self.factory.get("/"))["ETag"]
+
+        processed_response = middleware(
+            self.factory.get("/", headers={"If-None-Match": etag})
+        )
+
+        self.assertEqual(processed_response.status_code, 304)
+        self.assertEqual(processed_response.content, b"")
+        self.assertEqual(processed_response["ETag"], etag)
+
+    def test_conditional_view_modified(self):
+        view = conditional_get()(lambda r: HttpResponse(b"content"))
+        middleware = default_headers_middleware(view)
+
+        processed_response = middleware(
+            self.factory.get("/", headers={"If-None-Match": '"outdated"'})
+        )
+
+        self.assertEqual(processed_response.status_code, 200)
+        self.assertEqual(processed_response.content, b"content")
@@ -0,0 +1,44 @@
+from unittest.mock import patch
+
+from django.conf import settings
+from django.test import TestCase
+from model_bakery import baker
+
+from core.services.device_resolution import resolve_device_ids
+from notification.models.notification_models import Device
+
+
+class TestResolveDeviceIds(TestCase):
+    databases = set(d for d in settings.DATABASES.keys())
+
+    def test_resolve_existing_and_missing(self):
+        existing_device = baker.make(Device, external_id="device_1")
+
+        device_ids = resolve_device_ids(["device_2", "device_1", "device_2"])
+
+        created_device = Device.objects.get(external_id="device_2")
+        self.assertEqual(
+            device_ids,
+            {"device_2": created_device.id, "device_1": existing_device.id},
+        )
+        self.assertEqual(list(device_ids), ["device_2", "device_1"])
+        self.assertEqual(created_device.os, "")
+        self.assertIsNotNone(created_device.last_seen)
+
+    @patch("core.services.device_resolution.RESOLVE_BATCH_SIZE", 2)
+    def test_resolve_in_batches(self):
+        external_ids = [f"device_{i}" for i in range(5)]
+        with self.assertNumQueries(3):
+            device_ids = resolve_device_ids(external_ids)
+
+        self.assertEqual(list(device_ids), external_ids)
+        self.assertEqual(Device.objects.count(), 5)
+
+    def test_deleted_device_is_created_again(self):
+        device_id = resolve_device_ids(["device_1"])["device_1"]
+        Device.objects.filter(id=device_id).delete()
+
+        new_device_id = resolve_device_ids(["device_1"])["device_1"]
+
+        self.assertNotEqual(new_device_id, device_id)
+        self.assertTrue(Device.objects.filter(id=new_device_id).exists())
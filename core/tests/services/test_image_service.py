@@ -1,8 +1,16 @@
+import os
+from unittest.mock import patch
+
 import responses
 from django.conf import settings
 from django.core.cache import cache
 
-from core.services.image_set import ImageSetService
+from core.services.image_set import (
+    ImageSetResolver,
+    ImageSetService,
+    get_image_set_cache_key,
+    local_image_sets,
+)
 from core.tests.test_authentication import ResponsesActivatedAPITestCase
 
 EXAMPLE_RESPONSE = {
@@ -110,3 +118,52 @@ class TestImageService(ResponsesActivatedAPITestCase):
         image_service.get_or_upload_from_url("https://example.com/image.jpg")
 
         self.assertEqual(self.rsp_post_from_url.call_count, 1)
+
+
+class TestImageSetResolver(ResponsesActivatedAPITestCase):
+    def setUp(self):
+        super().setUp()
+        local_image_sets.clear()
+        self.rsp_get_1 = responses.get(
+            f"{settings.IMAGE_ENDPOINTS['DETAIL']}/1", json=EXAMPLE_RESPONSE
+        )
+        self.rsp_get_2 = responses.get(
+            f"{settings.IMAGE_ENDPOINTS['DETAIL']}/2",
+            json={**EXAMPLE_RESPONSE, "id": 2},
+        )
+
+    def test_prefetch_distinct_ids(self):
+        resolver = ImageSetResolver()
+        resolver.prefetch([1, 2, 1, None, 2])
+
+        self.assertEqual(resolver.get(1), EXAMPLE_RESPONSE)
+        self.assertEqual(resolver.get(2)["id"], 2)
+        self.assertEqual(self.rsp_get_1.call_count, 1)
+        self.assertEqual(self.rsp_get_2.call_count, 1)
+
+    def test_prefetch_from_redis(self):
+        cache.set(get_image_set_cache_key(1), EXAMPLE_RESPONSE)
+
+        resolver = ImageSetResolver()
+        resolver.prefetch([1, 2])
+
+        self.assertEqual(resolver.get(1), EXAMPLE_RESPONSE)
+        self.assertEqual(self.rsp_get_1.call_count, 0)
+        self.assertEqual(self.rsp_get_2.call_count, 1)
+
+    def test_get_without_prefetch(self):
+        resolver = ImageSetResolver()
+
+        self.assertEqual(resolver.get(1), EXAMPLE_RESPONSE)
+        self.assertEqual(resolver.get(1), EXAMPLE_RESPONSE)
+        self.assertEqual(self.rsp_get_1.call_count, 1)
+
+    @patch.dict(os.environ, {"CACHE_FUNCTION_ENABLED_PYTEST": "true"})
+    def test_local_cache_shared_between_resolvers(self):
+        ImageSetResolver().prefetch([1])
+        cache.clear()
+
+        with patch("core.services.image_set.cache.get_many") as mock_get_many:
+            self.assertEqual(ImageSetResolver().get(1), EXAMPLE_RESPONSE)
+            mock_get_many.assert_not_called()
+        self.assertEqual(self.rsp_get_1.call_count, 1)
@@ -1,5 +1,6 @@
-from unittest.mock import Mock
+from unittest.mock import Mock, patch
 
+from django.core.exceptions import ValidationError
 from django.utils import timezone
 from freezegun import freeze_time
 from model_bakery import baker
@@ -8,6 +9,7 @@ from core.services.notification_service import (
     AbstractNotificationService,
     NotificationData,
     NotificationServiceError,
+    ScheduledNotificationData,
 )
 from core.tests.test_authentication import ResponsesActivatedAPITestCase
 from notification.models.notification_models import (
@@ -159,6 +161,18 @@ class TestNotificationServiceScheduled(ResponsesActivatedAPITestCase):
         self.assertEqual(new_notification.devices.count(), 2)
         self.assertEqual(Device.objects.count(), 2)
 
+    def test_upsert_notifies_ready(self):
+        notification = NotificationData(
+            title="Hello",
+            message="Is it me you're looking for?",
+            device_ids=[self.device_1.external_id],
+        )
+        with patch.object(self.service, "_notify_ready") as mock_notify_ready:
+            instance = self.service.upsert(notification=notification)
+
+        mock_notify_ready.assert_called_once_with(instance)
+        self.assertTrue(instance.is_ready)
+
     def test_upsert_update(self):
         notification = NotificationData(
             title="Updated Notification",
@@ -262,6 +276,54 @@ class TestNotificationServiceScheduled(ResponsesActivatedAPITestCase):
         self.assertEqual(notification.devices.count(), 3)
         self.assertEqual(Device.objects.count(), 3)
 
+    @patch(
+        "core.services.notification_service.scheduled_notification_devices_removed_counter"
+    )
+    @patch(
+        "core.services.notification_service.scheduled_notification_devices_added_counter"
+    )
+    def test_upsert_remove_stale_devices(
+        self, mock_added_counter, mock_removed_counter
+    ):
+        self.service.upsert(
+            notification=NotificationData(
+                title="Updated", message="Updated body", device_ids=["device_2"]
+            ),
+            identifier=f"{self.service.module_slug}:notif_2",
+            remove_stale_devices=True,
+        )
+
+        notification = self.service.get_scheduled_notification(
+            f"{self.service.module_slug}:notif_2"
+        )
+        self.assertEqual(
+            list(notification.devices.values_list("external_id", flat=True)),
+            ["device_2"],
+        )
+        mock_added_counter.add.assert_called_once_with(
+            1, {"module_slug": self.service.module_slug}
+        )
+        mock_removed_counter.add.assert_called_once_with(
+            1, {"module_slug": self.service.module_slug}
+        )
+
+    @patch("core.services.notification_service.BATCH_SIZE", 2)
+    def test_upsert_remove_stale_devices_in_batches(self):
+        devices = baker.make(Device, _quantity=5)
+        self.notification_1.devices.add(*devices)
+
+        self.service.upsert(
+            notification=NotificationData(
+                title="Updated",
+                message="Updated body",
+                device_ids=[device.external_id for device in devices[:3]],
+            ),
+            identifier=self.notification_1.identifier,
+            remove_stale_devices=True,
+        )
+
+        self.assertEqual(set(self.notification_1.devices.all()), set(devices[:3]))
+
     def test_upsert_no_devices(self):
         notification = NotificationData(
             title="No Devices Notification",
@@ -297,6 +359,119 @@ class TestNotificationServiceScheduled(ResponsesActivatedAPITestCase):
         )
         self.assertEqual(instance.devices.count(), 2)
 
+    def test_upsert_broadcast(self):
+        notification = NotificationData(
+            title="Broadcast Notification",
+            message="This notification is stored once for all devices.",
+            link_source_id="abc",
+        )
+        instance = self.service.upsert(
+            notification=notification,
+            scheduled_for=timezone.now(),
+            identifier=f"{self.service.module_slug}:broadcast",
+            send_all_devices=True,
+            broadcast=True,
+        )
+        self.assertTrue(instance.is_broadcast)
+        self.assertTrue(instance.is_ready)
+        self.assertEqual(instance.devices.count(), 0)
+
+    def test_upsert_broadcast_requires_all_devices(self):
+        notification = NotificationData(
+            title="Broadcast Notification",
+            message="This notification is stored once for all devices.",
+            device_ids=["device_1"],
+        )
+        with self.assertRaises(NotificationServiceError):
+            self.service.upsert(
+                notification=notification,
+                identifier=f"{self.service.module_slug}:broadcast",
+                broadcast=True,
+            )
+
+    def test_upsert_update_keeps_fixed_fields(self):
+        self.notification_1.image = 1
+        self.notification_1.save()
+        original_context = self.notification_1.context
+
+        instance = self.service.upsert(
+            notification=NotificationData(title="Updated", message="Updated body"),
+            identifier=self.notification_1.identifier,
+            context={"type": "other", "module_slug": self.service.module_slug},
+            send_all_devices=True,
+        )
+
+        self.assertEqual(instance.title, "Updated")
+        self.assertEqual(instance.image, 1)
+        self.assertEqual(instance.context, original_context)
+        self.assertEqual(instance.created_at, self.notification_1.created_at)
+
+    def test_upsert_many(self):
+        instances = self.service.upsert_many(
+            [
+                ScheduledNotificationData(
+                    notification=NotificationData(
+                        title="New", message="New body", device_ids=["device_3"]
+                    ),
+                    identifier=f"{self.service.module_slug}:notif_3",
+                ),
+                ScheduledNotificationData(
+                    notification=NotificationData(
+                        title="Updated",
+                        message="Updated body",
+                        device_ids=["device_2"],
+                    ),
+                    identifier=f"{self.service.module_slug}:notif_2",
+                ),
+            ]
+        )
+
+        self.assertEqual(
+            [instance.identifier for instance in instances],
+            [
+                f"{self.service.module_slug}:notif_3",
+                f"{self.service.module_slug}:notif_2",
+            ],
+        )
+        self.assertEqual(instances[1].pk, self.notification_2.pk)
+        self.assertEqual(instances[1].title, "Updated")
+        self.assertTrue(all(instance.is_ready for instance in instances))
+        self.assertEqual(
+            list(instances[0].devices.values_list("external_id", flat=True)),
+            ["device_3"],
+        )
+        self.assertEqual(instances[1].devices.count(), 2)
+        self.assertEqual(ScheduledNotification.objects.count(), 3)
+
+    def test_upsert_many_duplicate_identifiers(self):
+        data = ScheduledNotificationData(
+            notification=NotificationData(
+                title="New", message="New body", device_ids=["device_1"]
+            ),
+            identifier=f"{self.service.module_slug}:notif_3",
+        )
+        with self.assertRaises(NotificationServiceError):
+            self.service.upsert_many([data, data])
+        self.assertEqual(ScheduledNotification.objects.count(), 2)
+
+    def test_upsert_many_validates_before_writing(self):
+        with self.assertRaises(ValidationError):
+            self.service.upsert_many(
+                [
+                    ScheduledNotificationData(
+                        notification=NotificationData(
+                            title="Valid", message="Body", device_ids=["device_1"]
+                        ),
+                    ),
+                    ScheduledNotificationData(
+                        notification=NotificationData(
+                            title="x" * 1001, message="Body", device_ids=["device_1"]
+                        ),
+                    ),
+                ]
+            )
+        self.assertEqual(ScheduledNotification.objects.count(), 2)
+
     def test_upsert_image_doesnt_exist(self):
         patched_image_service = Mock()
         patched_image_service.exists.return_value = False
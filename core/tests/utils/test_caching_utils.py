@@ -1,11 +1,21 @@
 import asyncio
 import os
-from unittest.mock import patch
+from unittest.mock import Mock, patch
 
 from django.core.cache import cache
-from django.test import TestCase
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase
 
-from core.utils.caching_utils import cache_function
+from core.utils.caching_utils import (
+    LocalCache,
+    bump_dataset_version,
+    cache_function,
+    conditional_get,
+    dataset_etag,
+    get_dataset_version,
+    get_or_refresh,
+    stale_while_revalidate,
+)
 
 
 class TestCacheFunction(TestCase):
@@ -61,3 +71,243 @@ class TestCacheFunction(TestCase):
             self.assertEqual(call_counter["calls"], 1)
 
         asyncio.run(run_test())
+
+
+class TestCacheFunctionLocalCache(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.call_counter = {"calls": 0}
+
+        @cache_function(timeout=60, local_timeout=60)
+        def compute(value):
+            self.call_counter["calls"] += 1
+            return [value]
+
+        self.compute = compute
+
+    @patch.dict(os.environ, {"CACHE_FUNCTION_ENABLED_PYTEST": "true"})
+    def test_local_cache_hit_skips_redis(self):
+        first = self.compute(123)
+        with patch("core.utils.caching_utils.cache") as mock_cache:
+            second = self.compute(123)
+
+        mock_cache.get.assert_not_called()
+        self.assertIs(first, second)
+        self.assertEqual(self.call_counter["calls"], 1)
+
+    @patch.dict(os.environ, {"CACHE_FUNCTION_ENABLED_PYTEST": "true"})
+    def test_redis_hit_fills_local_cache(self):
+        self.compute(123)
+        self.compute.local_cache.clear()
+
+        self.assertEqual(self.compute(123), [123])
+        self.assertEqual(len(self.compute.local_cache), 1)
+        self.assertEqual(self.call_counter["calls"], 1)
+
+    @patch.dict(os.environ, {"CACHE_FUNCTION_ENABLED_PYTEST": "true"})
+    def test_unhashable_arguments_use_redis(self):
+        self.compute([1, 2])
+        self.compute([1, 2])
+
+        self.assertEqual(len(self.compute.local_cache), 0)
+        self.assertEqual(self.call_counter["calls"], 1)
+
+    @patch.dict(os.environ, {"CACHE_FUNCTION_ENABLED_PYTEST": "true"})
+    @patch("core.utils.caching_utils.cache_function_misses_counter")
+    @patch("core.utils.caching_utils.cache_function_hits_counter")
+    def test_hit_and_miss_counters(self, mock_hits_counter, mock_misses_counter):
+        self.compute(123)
+        self.compute(123)
+        self.compute.local_cache.clear()
+        self.compute(123)
+
+        function_name = self.compute.__module__ + "." + self.compute.__qualname__
+        mock_misses_counter.add.assert_called_once_with(1, {"function": function_name})
+        self.assertEqual(
+            [call.args[1]["tier"] for call in mock_hits_counter.add.call_args_list],
+            ["local", "redis"],
+        )
+
+
+class TestLocalCache(TestCase):
+    def test_get_set(self):
+        local_cache = LocalCache(maxsize=10, timeout=60)
+        local_cache.set("key", "value")
+
+        self.assertEqual(local_cache.get("key"), "value")
+        self.assertIsNone(local_cache.get("missing"))
+        self.assertEqual(local_cache.get("missing", "default"), "default")
+
+    def test_evicts_least_recently_used(self):
+        local_cache = LocalCache(maxsize=2, timeout=60)
+        local_cache.set("a", 1)
+        local_cache.set("b", 2)
+        local_cache.get("a")
+        local_cache.set("c", 3)
+
+        self.assertEqual(len(local_cache), 2)
+        self.assertEqual(local_cache.get("a"), 1)
+        self.assertIsNone(local_cache.get("b"))
+        self.assertEqual(local_cache.get("c"), 3)
+
+    def test_delete(self):
+        local_cache = LocalCache(maxsize=10, timeout=60)
+        local_cache.set("key", "value")
+        local_cache.delete("key")
+        local_cache.delete("missing")
+
+        self.assertIsNone(local_cache.get("key"))
+
+    @patch("core.utils.caching_utils.time.monotonic")
+    def test_expires_after_timeout(self, mock_monotonic):
+        mock_monotonic.return_value = 100
+        local_cache = LocalCache(maxsize=10, timeout=60)
+        local_cache.set("key", "value")
+
+        mock_monotonic.return_value = 159
+        self.assertEqual(local_cache.get("key"), "value")
+        mock_monotonic.return_value = 160
+        self.assertIsNone(local_cache.get("key"))
+        self.assertEqual(len(local_cache), 0)
+
+
+@patch("core.utils.caching_utils.time.time")
+class TestGetOrRefresh(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.call_counter = {"calls": 0}
+
+    def compute(self):
+        self.call_counter["calls"] += 1
+        return self.call_counter["calls"]
+
+    def get(self, beta=0):
+        return get_or_refresh(
+            "key", self.compute, soft_timeout=60, hard_timeout=600, beta=beta
+        )
+
+    def test_fresh_entry(self, mock_time):
+        mock_time.return_value = 1000
+        self.assertEqual(self.get(), 1)
+        mock_time.return_value = 1059
+        self.assertEqual(self.get(), 1)
+        self.assertEqual(self.call_counter["calls"], 1)
+
+    def test_stale_entry_is_refreshed(self, mock_time):
+        mock_time.return_value = 1000
+        self.get()
+        mock_time.return_value = 1060
+        self.assertEqual(self.get(), 2)
+        self.assertIsNone(cache.get("key:lock"))
+
+    def test_stale_entry_is_served_while_refreshing(self, mock_time):
+        mock_time.return_value = 1000
+        self.get()
+        cache.add("key:lock", "other-worker")
+        mock_time.return_value = 1060
+        self.assertEqual(self.get(), 1)
+        self.assertEqual(self.call_counter["calls"], 1)
+
+    def test_stale_entry_is_served_when_refresh_fails(self, mock_time):
+        mock_time.return_value = 1000
+        self.get()
+        mock_time.return_value = 1060
+        with self.assertLogs("core.utils.caching_utils", level="WARNING"):
+            value = get_or_refresh(
+                "key", Mock(side_effect=ValueError), soft_timeout=60, hard_timeout=600
+            )
+        self.assertEqual(value, 1)
+        self.assertIsNone(cache.get("key:lock"))
+
+    @patch("core.utils.caching_utils.REFRESH_WAIT_TIMEOUT", 0)
+    def test_missing_entry_is_computed_when_lock_is_held(self, mock_time):
+        mock_time.return_value = 1000
+        cache.add("key:lock", "other-worker")
+        self.assertEqual(self.get(), 1)
+
+    @patch("core.utils.caching_utils.random.random")
+    def test_early_refresh(self, mock_random, mock_time):
+        mock_time.return_value = 1000
+        self.get()
+        cache.set("key", {**cache.get("key"), "compute_duration": 10})
+
+        # -log(1 - 0.5) * 10 = 6.9 seconds early
+        mock_random.return_value = 0.5
+        mock_time.return_value = 1052
+        self.assertEqual(self.get(beta=1), 1)
+        mock_time.return_value = 1054
+        self.assertEqual(self.get(beta=1), 2)
+
+
+class TestStaleWhileRevalidate(TestCase):
+    @patch.dict(os.environ, {"CACHE_FUNCTION_ENABLED_PYTEST": "true"})
+    def test_cached_per_arguments(self):
+        cache.clear()
+        call_counter = {"calls": 0}
+
+        @stale_while_revalidate(soft_timeout=60, hard_timeout=600)
+        def compute(value):
+            call_counter["calls"] += 1
+            return value * 2
+
+        self.assertEqual(compute(1), 2)
+        self.assertEqual(compute(1), 2)
+        self.assertEqual(compute(2), 4)
+        self.assertEqual(call_counter["calls"], 2)
+
+
+class TestDatasetVersion(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_version_is_stable_until_bumped(self):
+        version = get_dataset_version("dataset")
+        self.assertEqual(get_dataset_version("dataset"), version)
+
+        bump_dataset_version("dataset")
+        self.assertNotEqual(get_dataset_version("dataset"), version)
+
+    def test_datasets_are_independent(self):
+        other_version = get_dataset_version("other")
+        bump_dataset_version("dataset")
+        self.assertEqual(get_dataset_version("other"), other_version)
+
+
+class TestConditionalGet(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.factory = RequestFactory()
+        self.view = Mock(side_effect=lambda request: HttpResponse(b"content"))
+        self.conditional_view = conditional_get(etag_func=dataset_etag("dataset"))(
+            self.view
+        )
+
+    def test_etag_from_dataset_version(self):
+        response = self.conditional_view(self.factory.get("/"))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            response["ETag"], f'"dataset-{get_dataset_version("dataset")}"'
+        )
+
+    def test_not_modified_skips_view(self):
+        etag = self.conditional_view(self.factory.get("/"))["ETag"]
+        self.view.reset_mock()
+
+        response = self.conditional_view(
+            self.factory.get("/", headers={"If-None-Match": etag})
+        )
+
+        self.assertEqual(response.status_code, 304)
+        self.view.assert_not_called()
+
+    def test_modified_after_bump(self):
+        etag = self.conditional_view(self.factory.get("/"))["ETag"]
+        bump_dataset_version("dataset")
+
+        response = self.conditional_view(
+            self.factory.get("/", headers={"If-None-Match": etag})
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
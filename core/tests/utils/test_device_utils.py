@@ -26,3 +26,10 @@ class TestDeviceUtils(TestCase):
         baker.make(Device, external_id="foobar")
         create_missing_device_ids(["foobar"])
         self.assertEqual(Device.objects.count(), 1)
+
+    def test_returns_internal_ids_in_order(self):
+        device = baker.make(Device, external_id="foobar")
+        device_ids = create_missing_device_ids(["new_device", "foobar"])
+        self.assertEqual(
+            device_ids, [Device.objects.get(external_id="new_device").id, device.id]
+        )
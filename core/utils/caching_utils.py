@@ -1,13 +1,100 @@
 import functools
 import hashlib
 import inspect
+import logging
+import math
 import os
+import random
 import sys
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Callable
 
 from django.core.cache import cache
+from django.views.decorators.cache import cache_page
+from django.views.decorators.http import condition
 
+from core.metrics import cache_function_hits_counter, cache_function_misses_counter
 
-def cache_function(timeout: int, ignore_first_arg: bool = False):
+logger = logging.getLogger(__name__)
+_MISSING = object()
+# Time a worker may take to refresh an entry before another worker may try
+REFRESH_LOCK_TIMEOUT = 30
+# Time a request waits for another worker to compute a missing entry before computing it itself
+REFRESH_WAIT_TIMEOUT = 5
+REFRESH_POLL_INTERVAL = 0.1
+# Set on responses of views decorated with conditional_get, read by the default headers middleware
+CONDITIONAL_MAX_AGE_ATTRIBUTE = "conditional_max_age"
+
+
+def should_bypass_cache() -> bool:
+    # Pytest runs against a persistent Redis cache in this repo's docker setup.
+    # That means cache entries can leak between tests and make DB-driven code
+    # behave non-deterministically. To keep tests reliable, bypass caching.
+    pytest_running = "pytest" in sys.modules or os.getenv("PYTEST_CURRENT_TEST")
+    cache_flag = (
+        os.getenv("CACHE_FUNCTION_ENABLED_PYTEST", default="").lower() == "true"
+    )
+    bypass_flag = pytest_running and not cache_flag
+    return bypass_flag
+
+
+class LocalCache:
+    """
+    Thread-safe in-process LRU cache with a timeout per entry.
+
+    Entries are only visible within the current process and are not invalidated
+    by other processes, so only use it for values that may be stale for `timeout` seconds.
+
+    Args:
+        maxsize (int): Maximum number of entries, the least recently used entry is evicted first
+        timeout (int): Time to live of an entry in seconds
+    """
+
+    def __init__(self, maxsize: int, timeout: int):
+        self.maxsize = maxsize
+        self.timeout = timeout
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            expires_at, value = self._data.get(key, (None, _MISSING))
+            if value is _MISSING:
+                return default
+            if expires_at <= time.monotonic():
+                del self._data[key]
+                return default
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.timeout, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+def cache_function(
+    timeout: int,
+    ignore_first_arg: bool = False,
+    local_timeout: int | None = None,
+    local_maxsize: int = 1024,
+):
     """
     Decorator to cache function results for timeout seconds. Cache key is based on function name and arguments.
 
@@ -15,26 +102,69 @@ def cache_function(timeout: int, ignore_first_arg: bool = False):
         timeout (int): Cache timeout in seconds
         ignore_first_arg (bool): Whether to ignore the first argument when generating the cache key.
             This is useful for instance methods where the first argument is 'self' and should not be part of the cache key.
+        local_timeout (int): When set, results are also kept in a per-process LocalCache for local_timeout seconds,
+            in front of Redis. The same object is returned to every caller, so the result must not be mutated.
+        local_maxsize (int): Maximum number of results in the per-process cache
     """
 
     def decorator(func):
-        def should_bypass_cache() -> bool:
-            # Pytest runs against a persistent Redis cache in this repo's docker setup.
-            # That means cache entries can leak between tests and make DB-driven code
-            # behave non-deterministically. To keep tests reliable, bypass caching.
-            pytest_running = "pytest" in sys.modules or os.getenv("PYTEST_CURRENT_TEST")
-            cache_flag = (
-                os.getenv("CACHE_FUNCTION_ENABLED_PYTEST", default="").lower() == "true"
-            )
-            bypass_flag = pytest_running and not cache_flag
-            return bypass_flag
+        function_name = f"{func.__module__}.{func.__qualname__}"
+        local_cache = (
+            LocalCache(maxsize=local_maxsize, timeout=local_timeout)
+            if local_timeout is not None
+            else None
+        )
+
+        def get_local_key(args, kwargs):
+            args_for_key = args[1:] if ignore_first_arg and args else args
+            local_key = (args_for_key, tuple(kwargs.items()))
+            try:
+                hash(local_key)
+            except TypeError:
+                # Unhashable arguments are only cached in Redis
+                return None
+            return local_key
 
         def get_cache_key(args, kwargs) -> str:
             # Stable cache key based on function + arguments
             args_for_key = args[1:] if ignore_first_arg and args else args
-            raw_key = f"{func.__module__}.{func.__qualname__}:{args_for_key}:{kwargs}"
+            raw_key = f"{function_name}:{args_for_key}:{kwargs}"
             return f"aapp:{hashlib.sha256(raw_key.encode()).hexdigest()}"
 
+        def get_cached(args, kwargs) -> tuple[object, str | None, object]:
+            """
+            Returns:
+                tuple: cached result or _MISSING, Redis key and local key for storing a computed result
+            """
+            local_key = None
+            if local_cache is not None:
+                local_key = get_local_key(args, kwargs)
+                if local_key is not None:
+                    cached_data = local_cache.get(local_key, _MISSING)
+                    if cached_data is not _MISSING:
+                        cache_function_hits_counter.add(
+                            1, {"function": function_name, "tier": "local"}
+                        )
+                        return cached_data, None, None
+
+            cache_key = get_cache_key(args, kwargs)
+            cached_data = cache.get(cache_key)
+            if cached_data is not None:
+                cache_function_hits_counter.add(
+                    1, {"function": function_name, "tier": "redis"}
+                )
+                if local_key is not None:
+                    local_cache.set(local_key, cached_data)
+                return cached_data, None, None
+
+            cache_function_misses_counter.add(1, {"function": function_name})
+            return _MISSING, cache_key, local_key
+
+        def set_cached(result, cache_key: str, local_key):
+            cache.set(cache_key, result, timeout=timeout)
+            if local_key is not None and result is not None:
+                local_cache.set(local_key, result)
+
         if inspect.iscoroutinefunction(func):
 
             @functools.wraps(func)
@@ -42,13 +172,12 @@ def cache_function(timeout: int, ignore_first_arg: bool = False):
                 if should_bypass_cache():
                     return await func(*args, **kwargs)
 
-                cache_key = get_cache_key(args, kwargs)
-                cached_data = cache.get(cache_key)
-                if cached_data is not None:
+                cached_data, cache_key, local_key = get_cached(args, kwargs)
+                if cached_data is not _MISSING:
                     return cached_data
 
                 result = await func(*args, **kwargs)
-                cache.set(cache_key, result, timeout=timeout)
+                set_cached(result, cache_key, local_key)
                 return result
 
         else:
@@ -58,15 +187,216 @@ def cache_function(timeout: int, ignore_first_arg: bool = False):
                 if should_bypass_cache():
                     return func(*args, **kwargs)
 
-                cache_key = get_cache_key(args, kwargs)
-                cached_data = cache.get(cache_key)
-                if cached_data is not None:
+                cached_data, cache_key, local_key = get_cached(args, kwargs)
+                if cached_data is not _MISSING:
                     return cached_data
 
                 result = func(*args, **kwargs)
-                cache.set(cache_key, result, timeout=timeout)
+                set_cached(result, cache_key, local_key)
                 return result
 
+        wrapper.local_cache = local_cache
         return wrapper
 
     return decorator
+
+
+def get_or_refresh(
+    key: str,
+    compute: Callable[[], object],
+    soft_timeout: int,
+    hard_timeout: int,
+    beta: float = 1.0,
+):
+    """
+    Get a cached value, recomputing it by a single worker when it is (about to be) stale.
+
+    An entry is fresh for soft_timeout seconds and is served stale until hard_timeout while one worker,
+    holding a Redis lock, recomputes it. Entries are refreshed early with a probability that increases
+    towards soft_timeout and with the compute duration, so a hot entry is usually refreshed before it is stale.
+    When the refresh fails the stale value is served.
+
+    Args:
+        key (str): cache key
+        compute (Callable): returns the value to cache, None is not cached
+        soft_timeout (int): seconds until the entry is refreshed
+        hard_timeout (int): seconds until the entry is removed, and concurrent requests wait for a refresh
+        beta (float): larger values refresh earlier, 0 disables early refreshes
+    """
+    entry = cache.get(key)
+    if entry is not None and not _should_refresh(entry, beta):
+        return entry["value"]
+
+    lock_key = f"{key}:lock"
+    lock_token = str(uuid.uuid4())
+    if not cache.add(lock_key, lock_token, timeout=REFRESH_LOCK_TIMEOUT):
+        if entry is not None:
+            # Another worker is refreshing the entry
+            return entry["value"]
+        entry = _wait_for_entry(key)
+        if entry is not None:
+            return entry["value"]
+        return _compute_and_set(key, compute, soft_timeout, hard_timeout)
+
+    try:
+        return _compute_and_set(key, compute, soft_timeout, hard_timeout)
+    except Exception:
+        if entry is None:
+            raise
+        logger.warning(
+            "Failed to refresh cache entry, serving stale value", exc_info=True
+        )
+        return entry["value"]
+    finally:
+        if cache.get(lock_key) == lock_token:
+            cache.delete(lock_key)
+
+
+def _should_refresh(entry: dict, beta: float) -> bool:
+    # Probabilistic early expiration, see "Optimal Probabilistic Cache Stampede Prevention"
+    early = entry["compute_duration"] * beta * -math.log(1 - random.random())
+    return time.time() + early >= entry["refresh_at"]
+
+
+def _wait_for_entry(key: str) -> dict | None:
+    deadline = time.monotonic() + REFRESH_WAIT_TIMEOUT
+    while time.monotonic() < deadline:
+        time.sleep(REFRESH_POLL_INTERVAL)
+        entry = cache.get(key)
+        if entry is not None:
+            return entry
+    return None
+
+
+def _compute_and_set(key: str, compute: Callable, soft_timeout: int, hard_timeout: int):
+    started_at = time.time()
+    value = compute()
+    finished_at = time.time()
+    if value is not None:
+        entry = {
+            "value": value,
+            "refresh_at": finished_at + soft_timeout,
+            "compute_duration": finished_at - started_at,
+        }
+        cache.set(key, entry, timeout=hard_timeout)
+    return value
+
+
+def stale_while_revalidate(soft_timeout: int, hard_timeout: int):
+    """
+    Decorator to cache function results with get_or_refresh(). Cache key is based on function name and arguments.
+
+    Args:
+        soft_timeout (int): seconds until the result is refreshed by a single worker
+        hard_timeout (int): seconds until the result is removed from the cache
+    """
+
+    def decorator(func):
+        function_name = f"{func.__module__}.{func.__qualname__}"
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if should_bypass_cache():
+                return func(*args, **kwargs)
+
+            raw_key = f"{function_name}:{args}:{kwargs}"
+            cache_key = f"aapp:swr:{hashlib.sha256(raw_key.encode()).hexdigest()}"
+            return get_or_refresh(
+                cache_key,
+                lambda: func(*args, **kwargs),
+                soft_timeout=soft_timeout,
+                hard_timeout=hard_timeout,
+            )
+
+        return wrapper
+
+    return decorator
+
+
+def get_dataset_version_key(dataset: str) -> str:
+    return f"aapp:dataset_version:{dataset}"
+
+
+def get_dataset_version(dataset: str) -> int:
+    """Current version of a dataset, part of the cache keys of everything derived from it"""
+    key = get_dataset_version_key(dataset)
+    version = cache.get(key)
+    if version is None:
+        # A timestamp never reuses a version of an evicted key
+        cache.add(key, time.time_ns(), timeout=None)
+        version = cache.get(key)
+    return version
+
+
+def bump_dataset_version(dataset: str):
+    """Invalidate all caches of a dataset, call this after the data of the dataset changed"""
+    cache.set(get_dataset_version_key(dataset), time.time_ns(), timeout=None)
+    logger.info("Bumped dataset cache version", extra={"dataset": dataset})
+
+
+def versioned_cache_page(dataset: str, timeout: int):
+    """
+    Decorator like cache_page, with the dataset version in the cache key.
+    Responses are cached until timeout or until bump_dataset_version(dataset) is called.
+
+    Args:
+        dataset (str): name of the dataset the response is derived from
+        timeout (int): Cache timeout in seconds
+    """
+
+    def decorator(view_func):
+        cached_views = {}
+
+        @functools.wraps(view_func)
+        def wrapper(request, *args, **kwargs):
+            version = get_dataset_version(dataset)
+            cached_view = cached_views.get(version)
+            if cached_view is None:
+                cached_views.clear()
+                cached_view = cache_page(timeout, key_prefix=f"{dataset}:{version}")(
+                    view_func
+                )
+                cached_views[version] = cached_view
+            return cached_view(request, *args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def conditional_get(max_age: int = 0, etag_func: Callable | None = None):
+    """
+    Decorator that lets clients revalidate a view with If-None-Match instead of downloading it again.
+    With an etag_func a matching request is answered with a 304 before the view runs,
+    otherwise the default headers middleware derives the ETag from the response content.
+
+    Args:
+        max_age (int): Seconds a client may use the response without revalidating
+        etag_func (Callable): Returns the ETag from the request and the view arguments
+    """
+
+    def decorator(view_func):
+        conditional_view = (
+            view_func
+            if etag_func is None
+            else condition(etag_func=etag_func)(view_func)
+        )
+
+        @functools.wraps(view_func)
+        def wrapper(request, *args, **kwargs):
+            response = conditional_view(request, *args, **kwargs)
+            setattr(response, CONDITIONAL_MAX_AGE_ATTRIBUTE, max_age)
+            return response
+
+        return wrapper
+
+    return decorator
+
+
+def dataset_etag(dataset: str) -> Callable:
+    """ETag function for conditional_get, only for views that change with the dataset version alone"""
+
+    def etag_func(request, *args, **kwargs):
+        return f'"{dataset}-{get_dataset_version(dataset)}"'
+
+    return etag_func
@@ -1,25 +1,6 @@
-import logging
+from core.services.device_resolution import resolve_device_ids
 
-from django.db.models import QuerySet
 
-from notification.models.notification_models import Device
-
-logger = logging.getLogger(__name__)
-
-
-def create_missing_device_ids(device_ids: list[str]) -> QuerySet:
-    existing_external_ids = set(
-        Device.objects.filter(external_id__in=device_ids).values_list(
-            "external_id", flat=True
-        )
-    )
-    missing_device_ids = set(device_ids) - existing_external_ids
-    if missing_device_ids:
-        Device.objects.bulk_create(
-            (Device(external_id=device_id) for device_id in missing_device_ids),
-            ignore_conflicts=True,
-        )
-        logger.info("Created %s missing devices.", len(missing_device_ids))
-    return Device.objects.filter(external_id__in=device_ids).values_list(
-        "id", flat=True
-    )
+def create_missing_device_ids(device_ids: list[str]) -> list[int]:
+    """Internal ids of the devices in the order of device_ids, missing devices are created"""
+    return list(resolve_device_ids(device_ids).values())
@@ -8,6 +8,7 @@ from rest_framework.generics import ListAPIView
 from rest_framework.response import Response
 
 from core.authentication import InternalAPIKeyAuthentication
+from core.utils.caching_utils import conditional_get
 from core.utils.openapi_utils import custom_extend_schema, extend_schema_for_api_key
 from modules.exceptions import ReleaseNotFoundException
 from modules.models import AppRelease, ReleaseModuleStatus
@@ -83,6 +84,7 @@ class ReleaseDetailView(generics.RetrieveUpdateAPIView):
         ),
         default_exceptions=[ReleaseNotFoundException],
     )
+    @method_decorator(conditional_get(max_age=60))
     @method_decorator(cache_page(60))
     def get(self, request, *args, **kwargs):
         release = self.get_object()
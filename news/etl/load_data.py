@@ -6,7 +6,9 @@ from django.db import transaction
 from django.utils import timezone
 from requests.exceptions import HTTPError, RequestException
 
+from core.enums import Module
 from core.services.image_set import ImageSetService
+from core.utils.caching_utils import bump_dataset_version
 from news.models import (
     LiveBlogItem,
     LiveblogNotification,
@@ -61,6 +63,7 @@ class NewsArticleLoader:
                     exc_info=e,
                 )
 
+        bump_dataset_version(Module.NEWS.value)
         return created_articles
 
     def _get_news_article_object(self, data: dict) -> NewsArticle:
@@ -266,7 +269,10 @@ class NewsArticleLoader:
 
 def garbage_collect_unseen_articles(*, threshold_seconds: int) -> int:
     stale_before = timezone.now() - timedelta(seconds=threshold_seconds)
-    return NewsArticle.objects.filter(
+    deleted_count = NewsArticle.objects.filter(
         deleted=False,
         last_seen__lt=stale_before,
     ).update(deleted=True)
+    if deleted_count:
+        bump_dataset_version(Module.NEWS.value)
+    return deleted_count
@@ -4,7 +4,9 @@ from unittest.mock import patch
 from django.urls import reverse
 from model_bakery import baker
 
+from core.enums import Module
 from core.tests.test_authentication import BasicAPITestCase
+from core.utils.caching_utils import bump_dataset_version
 from news.models import LiveBlogItem, NewsArticle, NewsArticleImage
 from news.views.article_views import ArticleDetailView, ArticleListView
 
@@ -241,6 +243,38 @@ class TestArticleListView(BasicAPITestCase):
             self.assertEqual(response.data["result"][0]["id"], self.article_4.id)
             self.assertEqual(get_queryset.call_count, 5)
 
+    def test_article_list_cache_invalidated_by_dataset_version(self):
+        params = {"type": "highlight", "page": 1, "page_size": 1}
+        response = self.client.get(self.url, data=params, headers=self.api_headers)
+        self.assertEqual(response.data["result"][0]["id"], self.article_3.id)
+
+        new_highlight = baker.make(
+            NewsArticle,
+            publication_datetime=datetime(2024, 10, 13, 8, 0, 0).isoformat(),
+            is_highlight=True,
+        )
+        response = self.client.get(self.url, data=params, headers=self.api_headers)
+        self.assertEqual(response.data["result"][0]["id"], self.article_3.id)
+
+        bump_dataset_version(Module.NEWS.value)
+        response = self.client.get(self.url, data=params, headers=self.api_headers)
+        self.assertEqual(response.data["result"][0]["id"], new_highlight.id)
+
+    def test_article_list_not_modified(self):
+        response = self.client.get(self.url, headers=self.api_headers)
+        etag = response["ETag"]
+
+        response = self.client.get(
+            self.url, headers={**self.api_headers, "If-None-Match": etag}
+        )
+        self.assertEqual(response.status_code, 304)
+
+        bump_dataset_version(Module.NEWS.value)
+        response = self.client.get(
+            self.url, headers={**self.api_headers, "If-None-Match": etag}
+        )
+        self.assertEqual(response.status_code, 200)
+
 
 class TestArticleDetailView(BasicAPITestCase):
     def setUp(self):
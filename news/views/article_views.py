@@ -1,8 +1,13 @@
 from django.utils.decorators import method_decorator
-from django.views.decorators.cache import cache_page
 from rest_framework.generics import ListAPIView, RetrieveAPIView
 
+from core.enums import Module
 from core.pagination import CustomPagination
+from core.utils.caching_utils import (
+    conditional_get,
+    dataset_etag,
+    versioned_cache_page,
+)
 from core.utils.openapi_utils import extend_schema_for_api_key
 from news.models import NewsArticle
 from news.serializers.article_serializers import (
@@ -11,11 +16,17 @@ from news.serializers.article_serializers import (
     NewsArticleRequestSerializer,
 )
 
-ARTICLE_LIST_CACHE_TTL_SECONDS = 10
-ARTICLE_DETAIL_CACHE_TTL_SECONDS = 10
+# The news ETL bumps the dataset version, so responses are cached until the next load
+ARTICLE_LIST_CACHE_TTL_SECONDS = 60 * 60 * 24
+ARTICLE_DETAIL_CACHE_TTL_SECONDS = 60 * 60 * 24
 
 
-@method_decorator(cache_page(ARTICLE_LIST_CACHE_TTL_SECONDS), name="get")
+@method_decorator(
+    conditional_get(etag_func=dataset_etag(Module.NEWS.value)), name="get"
+)
+@method_decorator(
+    versioned_cache_page(Module.NEWS.value, ARTICLE_LIST_CACHE_TTL_SECONDS), name="get"
+)
 class ArticleListView(ListAPIView):
     pagination_class = CustomPagination
     serializer_class = NewsArticleListResponseSerializer
@@ -49,7 +60,13 @@ class ArticleListView(ListAPIView):
         return super().get(*args, **kwargs)
 
 
-@method_decorator(cache_page(ARTICLE_DETAIL_CACHE_TTL_SECONDS), name="get")
+@method_decorator(
+    conditional_get(etag_func=dataset_etag(Module.NEWS.value)), name="get"
+)
+@method_decorator(
+    versioned_cache_page(Module.NEWS.value, ARTICLE_DETAIL_CACHE_TTL_SECONDS),
+    name="get",
+)
 class ArticleDetailView(RetrieveAPIView):
     def get_queryset(self):
         return NewsArticle.visible_objects.prefetch_related("images", "liveblog_items")
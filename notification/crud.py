@@ -1,21 +1,44 @@
 import copy
 import logging
+from typing import Iterable, NamedTuple
 
-from django.db.models import Case, Exists, IntegerField, OuterRef, QuerySet, Value, When
+from django.conf import settings
+from django.db.models import (
+    BooleanField,
+    Exists,
+    ExpressionWrapper,
+    OuterRef,
+    Q,
+    QuerySet,
+)
 from django.utils import timezone
 
 from core.enums import NotificationType
 from notification.models.notification_models import (
-    Device,
+    BroadcastNotification,
     Notification,
     NotificationPushModuleDisabled,
     NotificationPushTypeDisabled,
 )
 from notification.services.push import PushService
+from notification.services.unread_count import increment_unread_counts
+from notification.utils.copy_utils import copy_notifications
 
 logger = logging.getLogger(__name__)
 
 
+class DeviceRow(NamedTuple):
+    """
+    Compact representation of a device that should receive a notification.
+    - push_allowed: device has a token and push is not disabled for the module or type
+    """
+
+    device_id: int
+    external_id: str
+    firebase_token: str | None
+    push_allowed: bool
+
+
 class NotificationCRUD:
     def __init__(
         self,
@@ -39,12 +62,12 @@ class NotificationCRUD:
         self.total_token_count = 0
         self.total_enabled_count = 0
         self.failed_token_count = 0
+        self.removed_token_count = 0
         self.notifications_with_push, self.notifications_without_push = [], []
         self.push_only_notification_types = [
             NotificationType.PARKING_REMINDER.value,
             NotificationType.NEWS_LIVEBLOG_UPDATE.value,
         ]  # These notifications should have the is_visible flag set to False
-        self.devices_for_push = []
         self.push_service = PushService() if push_enabled else None
         self._build_default_context()
 
@@ -60,64 +83,81 @@ class NotificationCRUD:
         Create a new notification for each device in the supplied queryset.
         Push the notification to Firebase if applicable.
 
-        device_ids (list[str]): All devices who want to receive a notification
+        device_qs (QuerySet[Device]): All devices who want to receive a notification
+        """
+        device_rows = self.device_rows_queryset(device_qs)
+        self.create_from_rows(device_rows)
+
+    def create_from_rows(self, device_rows: Iterable[tuple]):
+        """
+        Create a new notification for each device row and push it to Firebase if applicable.
+
+        device_rows (Iterable[tuple]): rows from device_rows_queryset()
         """
-        device_list = self._collect_and_annotate_devices(device_qs)
-        self.total_device_count = len(device_list)
-        notifications_with_push = self._create_notifications(device_list)
+        device_rows = [DeviceRow(*row) for row in device_rows]
+        self._count_devices(device_rows)
+        notifications_with_push = self._create_notifications(device_rows)
 
         if notifications_with_push and self.push_service:
             try:
                 self.failed_token_count = self.push_service.push(
                     notifications=notifications_with_push
                 )
+                self.removed_token_count = self.push_service.removed_token_count
             except Exception as e:
                 logger.error("Failed to push notification", exc_info=True)
                 raise e
         else:
             logger.info("Notification(s) created, but no devices to push to")
 
-    def _collect_and_annotate_devices(self, device_qs: QuerySet) -> list[Device]:
+    def device_rows_queryset(
+        self, queryset: QuerySet, device_prefix: str = ""
+    ) -> QuerySet:
         """
-        This function should execute a single database query, to get all devices
+        Select the DeviceRow fields of every device in the queryset, in a single query.
+        The disabled module and type records are joined in to determine push_allowed.
+
+        Args:
+            queryset (QuerySet): queryset of Device, or of a model with a relation to Device
+            device_prefix (str): lookup from the queryset model to Device, e.g. "device__"
         """
+        device_id = OuterRef(f"{device_prefix}id")
         module_disabled_exists = NotificationPushModuleDisabled.objects.filter(
-            device=OuterRef("pk"), module_slug=self.source_notification.module_slug
+            device=device_id, module_slug=self.source_notification.module_slug
         )
         type_disabled_exists = NotificationPushTypeDisabled.objects.filter(
-            device=OuterRef("pk"),
+            device=device_id,
             notification_type=self.source_notification.notification_type,
         )
-        annotated_devices = device_qs.annotate(
-            has_token=Case(
-                When(firebase_token__isnull=False, then=Value(1)),
-                default=Value(0),
-                output_field=IntegerField(),
-            ),
-            module_disabled=Exists(module_disabled_exists),
-            type_disabled=Exists(type_disabled_exists),
+        return queryset.annotate(
+            push_allowed=ExpressionWrapper(
+                Q(**{f"{device_prefix}firebase_token__isnull": False})
+                & ~Exists(module_disabled_exists)
+                & ~Exists(type_disabled_exists),
+                output_field=BooleanField(),
+            )
+        ).values_list(
+            f"{device_prefix}id",
+            f"{device_prefix}external_id",
+            f"{device_prefix}firebase_token",
+            "push_allowed",
         )
 
-        device_list = list(annotated_devices)  # Database query is executed here
-        devices_for_push = []
+    def _count_devices(self, device_rows: list[DeviceRow]):
+        self.total_device_count = len(device_rows)
         self.total_token_count = 0
-        for device in device_list:
-            if device.has_token:
+        self.total_enabled_count = 0
+        for device_row in device_rows:
+            if device_row.firebase_token is not None:
                 self.total_token_count += 1
-            if (
-                device.has_token
-                and not device.module_disabled
-                and not device.type_disabled
-            ):
-                devices_for_push.append(device)
-
-        self.devices_for_push = devices_for_push
-        self.total_enabled_count = len(devices_for_push)
-        return device_list
-
-    def _create_notifications(self, device_list: list[Device]) -> list[Notification]:
+            if device_row.push_allowed:
+                self.total_enabled_count += 1
+
+    def _create_notifications(self, device_rows: list[DeviceRow]) -> list[Notification]:
         """
         The supplied source_notification will be duplicated for every device.
+        Notifications that should be pushed carry the firebase_token of their device.
+        Large batches are inserted with COPY, see NOTIFICATION_COPY_THRESHOLD.
 
         Returns:
             list[Notification]: newly created notification objects that should be pushed
@@ -130,19 +170,37 @@ class NotificationCRUD:
         )
         if push_only:
             self.source_notification.is_visible = False
-        for c in device_list:
+        use_copy = len(device_rows) >= settings.NOTIFICATION_COPY_THRESHOLD
+        for device_row in device_rows:
             new_notification: Notification = copy.copy(self.source_notification)
-            new_notification.context = copy.deepcopy(self.source_notification.context)
-            new_notification.device = c
-            new_notification.device_external_id = c.external_id
-            if c in self.devices_for_push and self.push_service:
+            if not use_copy:
+                new_notification.context = copy.deepcopy(
+                    self.source_notification.context
+                )
+            new_notification.device_id = device_row.device_id
+            new_notification.device_external_id = device_row.external_id
+            if device_row.push_allowed and self.push_service:
+                new_notification.firebase_token = device_row.firebase_token
                 new_notification.pushed_at = timezone.now()
                 with_push.append(new_notification)
             else:
                 without_push.append(new_notification)
 
-        self.notifications_with_push = Notification.objects.bulk_create(with_push)
-        self.notifications_without_push = Notification.objects.bulk_create(without_push)
+        if use_copy:
+            # COPY serializes the shared context once, instead of once per notification
+            self.notifications_with_push = copy_notifications(
+                self.source_notification, with_push
+            )
+            self.notifications_without_push = copy_notifications(
+                self.source_notification, without_push
+            )
+        else:
+            self.notifications_with_push = Notification.objects.bulk_create(with_push)
+            self.notifications_without_push = Notification.objects.bulk_create(
+                without_push
+            )
+        if self.source_notification.is_visible:
+            increment_unread_counts([row.external_id for row in device_rows])
         return self.notifications_with_push
 
     @property
@@ -152,4 +210,59 @@ class NotificationCRUD:
             total_token_count=self.total_token_count,
             total_enabled_count=self.total_enabled_count,
             failed_token_count=self.failed_token_count,
+            removed_token_count=self.removed_token_count,
         )
+
+
+class BroadcastCRUD(NotificationCRUD):
+    """
+    A notification for all devices is stored once, as a BroadcastNotification.
+    The devices are only used to push the broadcast, no Notification is created per device.
+    """
+
+    def __init__(self, source_notification: Notification, push_enabled: bool = True):
+        super().__init__(source_notification, push_enabled=push_enabled)
+        self.broadcast = None
+
+    def create_broadcast(self) -> BroadcastNotification:
+        self.broadcast = BroadcastNotification.objects.create(
+            title=self.source_notification.title,
+            body=self.source_notification.body,
+            module_slug=self.source_notification.module_slug,
+            context=self.source_notification.context,
+            notification_type=self.source_notification.notification_type,
+            image=self.source_notification.image,
+            created_at=self.source_notification.created_at,
+            pushed_at=timezone.now() if self.push_service else None,
+            is_visible=self.source_notification.notification_type
+            not in self.push_only_notification_types,
+        )
+        return self.broadcast
+
+    def _create_notifications(self, device_rows: list[DeviceRow]) -> list[Notification]:
+        """
+        Only the notifications that should be pushed are created, in memory.
+        They all carry the id of the broadcast.
+
+        Returns:
+            list[Notification]: unsaved notification objects that should be pushed
+        """
+        if self.broadcast is None:
+            self.create_broadcast()
+
+        with_push = []
+        if self.push_service:
+            for device_row in device_rows:
+                if not device_row.push_allowed:
+                    continue
+                new_notification: Notification = copy.copy(self.source_notification)
+                new_notification.id = self.broadcast.id
+                new_notification.device_id = device_row.device_id
+                new_notification.device_external_id = device_row.external_id
+                new_notification.firebase_token = device_row.firebase_token
+                with_push.append(new_notification)
+
+        if self.broadcast.is_visible:
+            increment_unread_counts([row.external_id for row in device_rows])
+        self.notifications_with_push = with_push
+        return with_push
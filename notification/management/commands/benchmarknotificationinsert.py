@@ -0,0 +1,73 @@
+import copy
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import router, transaction
+from django.utils import timezone
+
+from notification.models.notification_models import Device, Notification
+from notification.utils.copy_utils import copy_notifications
+
+DEFAULT_SIZES = [10_000, 100_000, 500_000]
+
+
+class Command(BaseCommand):
+    """Compare bulk_create with COPY for inserting notification history rows"""
+
+    help = "Benchmark bulk_create against COPY for notification rows (rolled back afterwards)"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--sizes",
+            type=int,
+            nargs="+",
+            default=DEFAULT_SIZES,
+            help="Number of notification rows per run",
+        )
+
+    def handle(self, *args, **options):
+        for size in options["sizes"]:
+            bulk_create_duration = self.run(size, self.insert_with_bulk_create)
+            copy_duration = self.run(size, self.insert_with_copy)
+            self.stdout.write(
+                f"{size} rows: bulk_create {bulk_create_duration:.2f}s, "
+                f"COPY {copy_duration:.2f}s "
+                f"({bulk_create_duration / copy_duration:.1f}x)"
+            )
+
+    def run(self, size: int, insert) -> float:
+        """Insert the rows in a transaction that is always rolled back"""
+        with transaction.atomic(using=router.db_for_write(Notification)):
+            device = Device.objects.create(external_id="benchmark-device", os="test")
+            source_notification = Notification(
+                title="Benchmark",
+                body="Benchmark notification",
+                module_slug="benchmark",
+                notification_type="benchmark:insert",
+                context={"type": "benchmark:insert", "module_slug": "benchmark"},
+                created_at=timezone.now(),
+            )
+            start = time.perf_counter()
+            insert(source_notification, device, size)
+            duration = time.perf_counter() - start
+            transaction.set_rollback(True)
+        return duration
+
+    def insert_with_bulk_create(self, source_notification, device, size):
+        notifications = []
+        for _ in range(size):
+            notification = copy.copy(source_notification)
+            notification.context = copy.deepcopy(source_notification.context)
+            notification.device_id = device.id
+            notification.device_external_id = device.external_id
+            notifications.append(notification)
+        Notification.objects.bulk_create(notifications)
+
+    def insert_with_copy(self, source_notification, device, size):
+        notifications = []
+        for _ in range(size):
+            notification = copy.copy(source_notification)
+            notification.device_id = device.id
+            notification.device_external_id = device.external_id
+            notifications.append(notification)
+        copy_notifications(source_notification, notifications)
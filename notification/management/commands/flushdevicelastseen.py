@@ -0,0 +1,31 @@
+import logging
+from itertools import batched
+
+from django.core.management.base import BaseCommand
+
+from notification.models.notification_models import Device
+from notification.services.device_registration import pop_buffered_last_seen
+
+logger = logging.getLogger(__name__)
+BATCH_SIZE = 1000
+
+
+class Command(BaseCommand):
+    help = "Write the buffered last_seen of registered devices to the database"
+
+    def handle(self, *args, **options):
+        buffered_last_seen = pop_buffered_last_seen()
+        updated_count = 0
+        for external_ids in batched(buffered_last_seen, BATCH_SIZE, strict=False):
+            devices = list(
+                Device.objects.filter(external_id__in=external_ids).only(
+                    "id", "external_id"
+                )
+            )
+            for device in devices:
+                device.last_seen = buffered_last_seen[device.external_id]
+            updated_count += Device.objects.bulk_update(devices, ["last_seen"])
+        logger.info(
+            "Flushed buffered device last_seen",
+            extra={"updated_count": updated_count},
+        )
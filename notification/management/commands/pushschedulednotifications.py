@@ -1,16 +1,27 @@
 import logging
+import select
+import threading
+from concurrent.futures import FIRST_EXCEPTION, ThreadPoolExecutor, wait
 from time import sleep
 
 from django.conf import settings
 from django.core.management.base import BaseCommand
-from django.db import OperationalError, transaction
+from django.db import OperationalError, connections, router, transaction
 from django.utils import timezone
 
-from notification.crud import NotificationCRUD
-from notification.models.notification_models import Notification, ScheduledNotification
+from core.services.notification_service import SCHEDULED_NOTIFICATION_READY_CHANNEL
+from notification.crud import BroadcastCRUD, NotificationCRUD
+from notification.models.notification_models import (
+    Device,
+    Notification,
+    ScheduledNotification,
+)
 
 logger = logging.getLogger(__name__)
-BATCH_SIZE = 1  # Don't batch and let the multiple worker pods handle parallelism
+# Every worker claims a single notification, so a large notification only occupies one worker
+BATCH_SIZE = 1
+# Upper limit on waiting, in case a ready notification is not announced via LISTEN/NOTIFY
+MAX_WAIT_SECONDS = 30
 
 
 class Command(BaseCommand):
@@ -18,26 +29,59 @@ class Command(BaseCommand):
 
     def add_arguments(self, parser):
         parser.add_argument("--test-mode", action="store_true")
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=1,
+            help="Number of scheduled notifications that are processed concurrently",
+        )
 
     def handle(self, *args, **options):
-        while True:
+        self.test_mode = options["test_mode"]
+        self.stop_event = threading.Event()
+        self.listening = threading.local()
+
+        if options["workers"] <= 1:
+            self.run_worker()
+            return
+
+        # Every worker runs in its own thread with its own database connection,
+        # so each worker claims, processes and deletes its notification in its own transaction.
+        with ThreadPoolExecutor(max_workers=options["workers"]) as executor:
+            futures = [
+                executor.submit(self.run_thread_worker)
+                for _ in range(options["workers"])
+            ]
+            done, _ = wait(futures, return_when=FIRST_EXCEPTION)
+            self.stop_event.set()
+            for future in done:
+                future.result()
+
+    def run_thread_worker(self):
+        try:
+            self.run_worker()
+        finally:
+            connections.close_all()
+
+    def run_worker(self):
+        while not self.stop_event.is_set():
             try:
                 with transaction.atomic():
-                    # Select all scheduled notifications that have not been pushed yet.
+                    # Select the scheduled notifications that are due, oldest first.
                     # select_for_update() is used to lock the database rows one by one to prevent duplicate pushes.
-                    # If another parallel process is running, it will skip the locked rows and move on to the next ones.
+                    # If another worker or pod is running, it will skip the locked rows and move on to the next ones.
                     timezone_now = timezone.now()
                     notifications_to_process = (
                         ScheduledNotification.objects.select_for_update(
                             skip_locked=True
-                        ).filter(scheduled_for__lte=timezone_now, is_ready=True)[
-                            :BATCH_SIZE
-                        ]
+                        )
+                        .filter(scheduled_for__lte=timezone_now, is_ready=True)
+                        .order_by("scheduled_for")[:BATCH_SIZE]
                     )
                     notifications_to_process = list(notifications_to_process)
 
                     if notifications_to_process:
-                        if options["test_mode"]:
+                        if self.test_mode:
                             for n in notifications_to_process:
                                 n.make_push = False
                         logger.info(
@@ -46,11 +90,10 @@ class Command(BaseCommand):
                         self.process_notifications(notifications_to_process)
 
                 if not notifications_to_process:
-                    if options["test_mode"]:
+                    if self.test_mode:
                         # In test mode, interrupt the loop when no notifications are found
                         break
-                    logger.debug("No scheduled notifications found. Sleeping...")
-                    sleep(5)  # Sleep for 5 seconds before checking again
+                    self.wait_for_ready_notifications()
 
             except OperationalError:
                 logger.warning(
@@ -59,6 +102,63 @@ class Command(BaseCommand):
                 sleep(1)  # Sleep for 1 second before checking again
                 continue
 
+    def wait_for_ready_notifications(self):
+        """
+        Wait until the next scheduled notification is due, or until a notification
+        is marked as ready by the notification service (Postgres NOTIFY).
+        """
+        db_connection = connections[router.db_for_read(ScheduledNotification)]
+        db_connection.ensure_connection()
+        pg_connection = db_connection.connection
+        if getattr(self.listening, "connection", None) is not pg_connection:
+            # LISTEN is bound to the connection, so it is repeated after a reconnect
+            with db_connection.cursor() as cursor:
+                cursor.execute(f"LISTEN {SCHEDULED_NOTIFICATION_READY_CHANNEL}")
+            self.listening.connection = pg_connection
+
+        # Listen before the timeout query, a NOTIFY received during it is handled below
+        timeout = self.get_wait_timeout()
+        pg_connection.poll()
+        if pg_connection.notifies or timeout == 0:
+            pg_connection.notifies.clear()
+            return
+
+        logger.debug(
+            "No scheduled notifications found. Waiting...", extra={"timeout": timeout}
+        )
+        select.select([pg_connection], [], [], timeout)
+        pg_connection.poll()
+        pg_connection.notifies.clear()
+
+    def get_wait_timeout(self) -> float:
+        """
+        Seconds until the next ready notification is due, with a maximum of MAX_WAIT_SECONDS.
+        0 when a due notification is not claimed by another worker yet.
+        """
+        timezone_now = timezone.now()
+        with transaction.atomic():
+            unclaimed_due_ids = list(
+                ScheduledNotification.objects.select_for_update(skip_locked=True)
+                .filter(is_ready=True, scheduled_for__lte=timezone_now)
+                .values_list("id", flat=True)[:1]
+            )
+        if unclaimed_due_ids:
+            return 0
+
+        next_scheduled_for = (
+            ScheduledNotification.objects.filter(
+                is_ready=True, scheduled_for__gt=timezone_now
+            )
+            .order_by("scheduled_for")
+            .values_list("scheduled_for", flat=True)
+            .first()
+        )
+        if next_scheduled_for is None:
+            return MAX_WAIT_SECONDS
+
+        seconds_until_due = (next_scheduled_for - timezone.now()).total_seconds()
+        return min(max(seconds_until_due, 0), MAX_WAIT_SECONDS)
+
     def process_notifications(
         self, notifications_to_process: list[ScheduledNotification]
     ):
@@ -105,30 +205,52 @@ class Command(BaseCommand):
             image=scheduled_notification.image,
             created_at=timezone.now(),
         )
-        notification_crud = NotificationCRUD(
+        crud_class = (
+            BroadcastCRUD if scheduled_notification.is_broadcast else NotificationCRUD
+        )
+        notification_crud = crud_class(
             source_notification=notification_obj,
             push_enabled=scheduled_notification.make_push,
         )
+        if scheduled_notification.is_broadcast:
+            # Also store a broadcast when there are no devices
+            notification_crud.create_broadcast()
         self.process_notifications_in_batches(
             notification_crud, scheduled_notification=scheduled_notification
         )
 
     def process_notifications_in_batches(
-        self, notification_crud, scheduled_notification
+        self, notification_crud: NotificationCRUD, scheduled_notification
     ):
+        """
+        Stream the devices of the scheduled notification with a keyset cursor on device_id.
+        Every batch is a single query on the through table, which also determines push_allowed.
+        A broadcast streams all devices.
+        """
         batch_size = settings.NOTIFICATION_DEVICE_BATCH_SIZE
         last_id = 0
-        base_qs = scheduled_notification.devices.order_by("id")
+        if scheduled_notification.is_broadcast:
+            base_qs = notification_crud.device_rows_queryset(Device.objects.all())
+            device_id_field = "id"
+        else:
+            Through = ScheduledNotification.devices.through
+            base_qs = notification_crud.device_rows_queryset(
+                Through.objects.filter(
+                    schedulednotification_id=scheduled_notification.id
+                ),
+                device_prefix="device__",
+            )
+            device_id_field = "device_id"
+        base_qs = base_qs.order_by(device_id_field)
         while True:
-            batch_ids = list(
-                base_qs.filter(id__gt=last_id).values_list("id", flat=True)[:batch_size]
+            device_rows = list(
+                base_qs.filter(**{f"{device_id_field}__gt": last_id})[:batch_size]
             )
-            if not batch_ids:
+            if not device_rows:
                 break
-            batch_qs = base_qs.filter(id__in=batch_ids).order_by("id")
 
             logger.info("Processing batch of devices", extra={"last_id": last_id})
-            response = notification_crud.create(device_qs=batch_qs)
-            logger.debug(response)
+            notification_crud.create_from_rows(device_rows)
+            logger.debug(notification_crud.response_data)
 
-            last_id = batch_ids[-1]
+            last_id = device_rows[-1][0]
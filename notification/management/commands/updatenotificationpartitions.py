@@ -2,23 +2,177 @@ import datetime
 import logging
 
 from django.core.management.base import BaseCommand
-from django.db import connection
+from django.db import connection, transaction
+from django.utils import timezone
+
+from notification.models.notification_models import BroadcastNotification
 
 logger = logging.getLogger(__name__)
 TABLE_NAME = "notification_notification"
+DEFAULT_PARTITION_NAME = "notification_notification_default"
 DAYS_TO_KEEP = 30
+# Number of daily partitions that are created in advance
+DAYS_AHEAD = 7
+
+
+def start_of_day(day: datetime.date) -> datetime.datetime:
+    return timezone.make_aware(datetime.datetime.combine(day, datetime.time.min))
+
+
+def get_missing_ranges(
+    start: datetime.datetime,
+    end: datetime.datetime,
+    ranges: list[tuple[datetime.datetime | None, datetime.datetime]],
+) -> list[tuple[datetime.datetime, datetime.datetime]]:
+    """Parts of [start, end) that are not covered by the given non-overlapping ranges"""
+    missing_ranges = []
+    current = start
+    for lower, upper in sorted(ranges, key=lambda bounds: bounds[1]):
+        if upper <= current:
+            continue
+        if lower is not None and lower >= end:
+            break
+        if lower is not None and lower > current:
+            missing_ranges.append((current, lower))
+        current = upper
+        if current >= end:
+            break
+    if current < end:
+        missing_ranges.append((current, end))
+    return missing_ranges
 
 
 class Command(BaseCommand):
     help = f"Update partitions of {TABLE_NAME} table"
 
     def handle(self, *args, **options):
-        start_date = datetime.date.today() - datetime.timedelta(days=DAYS_TO_KEEP)
+        today = timezone.localdate()
+
+        self.create_partitions(today)
+        start = start_of_day(today - datetime.timedelta(days=DAYS_TO_KEEP))
+        self.drop_old_partitions(start)
+        self.delete_old_broadcasts(start)
 
-        self.drop_old_notifications(start_date)
+    def get_partition_bounds(
+        self,
+    ) -> dict[str, tuple[datetime.datetime | None, datetime.datetime | None]]:
+        """
+        Returns:
+            dict: partition name mapped to its (inclusive) lower and (exclusive) upper bound,
+            None for MINVALUE and for the bounds of the default partition
+        """
+        with connection.cursor() as cursor:
+            cursor.execute(
+                r"""
+                SELECT
+                    partition.relname,
+                    (regexp_match(
+                        pg_get_expr(partition.relpartbound, partition.oid), 'FROM \(''([^'']+)''\)'
+                    ))[1]::timestamptz,
+                    (regexp_match(
+                        pg_get_expr(partition.relpartbound, partition.oid), 'TO \(''([^'']+)''\)'
+                    ))[1]::timestamptz
+                FROM pg_inherits
+                JOIN pg_class partition ON partition.oid = pg_inherits.inhrelid
+                WHERE pg_inherits.inhparent = %s::regclass
+                """,
+                [TABLE_NAME],
+            )
+            return {name: (lower, upper) for name, lower, upper in cursor.fetchall()}
+
+    def get_partitions(self) -> dict[str, datetime.datetime | None]:
+        """
+        Returns:
+            dict: partition name mapped to its (exclusive) upper bound, None for the default partition
+        """
+        return {name: upper for name, (_, upper) in self.get_partition_bounds().items()}
+
+    def create_partitions(self, today: datetime.date):
+        """
+        Create a partition for every day from today until DAYS_AHEAD that is not covered yet,
+        so days that were skipped or only partly covered are filled as well.
+        """
+        ranges = [
+            (lower, upper)
+            for lower, upper in self.get_partition_bounds().values()
+            if upper is not None
+        ]
+        for offset in range(DAYS_AHEAD + 1):
+            day = today + datetime.timedelta(days=offset)
+            day_start = start_of_day(day)
+            day_end = start_of_day(day + datetime.timedelta(days=1))
+            for start, end in get_missing_ranges(day_start, day_end, ranges):
+                suffix = (
+                    f"{day:%Y%m%d}" if start == day_start else f"{start:%Y%m%d%H%M}"
+                )
+                self.create_partition(f"{TABLE_NAME}_p{suffix}", start, end)
+                ranges.append((start, end))
+
+    def create_partition(
+        self, partition_name: str, start: datetime.datetime, end: datetime.datetime
+    ):
+        """
+        Rows in the default partition that belong to the new partition are moved first,
+        otherwise Postgres refuses to create the partition.
+        """
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute(
+                f"SELECT EXISTS (SELECT 1 FROM {DEFAULT_PARTITION_NAME} "
+                "WHERE created_at >= %s AND created_at < %s)",
+                [start, end],
+            )
+            (rows_in_default,) = cursor.fetchone()
+            if not rows_in_default:
+                cursor.execute(
+                    f"CREATE TABLE {partition_name} PARTITION OF {TABLE_NAME} "
+                    "FOR VALUES FROM (%s) TO (%s)",
+                    [start, end],
+                )
+            else:
+                cursor.execute(
+                    f"CREATE TABLE {partition_name} "
+                    f"(LIKE {TABLE_NAME} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)"
+                )
+                cursor.execute(
+                    f"WITH moved AS (DELETE FROM {DEFAULT_PARTITION_NAME} "
+                    "WHERE created_at >= %s AND created_at < %s RETURNING *) "
+                    f"INSERT INTO {partition_name} SELECT * FROM moved",
+                    [start, end],
+                )
+                cursor.execute(
+                    f"ALTER TABLE {TABLE_NAME} ATTACH PARTITION {partition_name} "
+                    "FOR VALUES FROM (%s) TO (%s)",
+                    [start, end],
+                )
+        logger.info(f"Created partition {partition_name} of {TABLE_NAME}")
+
+    def drop_old_partitions(self, start: datetime.datetime):
+        """
+        Partitions that only contain rows before start are detached and dropped as a whole.
+        Rows before start in the default partition are deleted.
+        """
+        for partition_name, upper_bound in self.get_partitions().items():
+            if upper_bound is None or upper_bound > start:
+                continue
+            with transaction.atomic(), connection.cursor() as cursor:
+                cursor.execute(
+                    f"ALTER TABLE {TABLE_NAME} DETACH PARTITION {partition_name}"
+                )
+                cursor.execute(f"DROP TABLE {partition_name}")
+            logger.info(f"Dropped partition {partition_name} of {TABLE_NAME}")
 
-    def drop_old_notifications(self, start_date):
-        query = f"DELETE FROM {TABLE_NAME} WHERE created_at <= '{start_date}';"
         with connection.cursor() as cursor:
-            cursor.execute(query)
+            cursor.execute(
+                f"DELETE FROM {DEFAULT_PARTITION_NAME} WHERE created_at < %s", [start]
+            )
         logger.info(f"Deleted old records of {TABLE_NAME}")
+
+    def delete_old_broadcasts(self, start: datetime.datetime):
+        """Broadcasts are stored once for all devices, so this is a small delete"""
+        deleted_count, _ = BroadcastNotification.objects.filter(
+            created_at__lt=start
+        ).delete()
+        logger.info(
+            "Deleted old broadcast notifications",
+            extra={"deleted_count": deleted_count},
+        )
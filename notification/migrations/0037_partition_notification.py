@@ -0,0 +1,183 @@
+import datetime
+
+from django.db import migrations
+from django.utils import timezone
+
+TABLE_NAME = "notification_notification"
+LEGACY_TABLE_NAME = "notification_notification_legacy"
+DEFAULT_PARTITION_NAME = "notification_notification_default"
+# Proves the existing rows fit the legacy partition, so attaching it does not scan the table
+LEGACY_CHECK_NAME = "notification_notification_legacy_check"
+
+
+def create_indexes(model, schema_editor):
+    """Indexes created on a partitioned table are created on all its partitions as well"""
+    for index in model._meta.indexes:
+        schema_editor.add_index(model, index)
+    schema_editor.execute(
+        f"CREATE INDEX {TABLE_NAME}_device_id_idx ON {TABLE_NAME} (device_id)"
+    )
+
+
+def create_constraints(schema_editor, primary_key: str):
+    schema_editor.execute(
+        f"ALTER TABLE {TABLE_NAME} ADD CONSTRAINT {TABLE_NAME}_pkey PRIMARY KEY ({primary_key})"
+    )
+    schema_editor.execute(
+        f"""
+        ALTER TABLE {TABLE_NAME}
+          ADD CONSTRAINT {TABLE_NAME}_device_id_fkey
+          FOREIGN KEY (device_id) REFERENCES notification_device(id) ON DELETE CASCADE
+        """
+    )
+
+
+def rename_constraints_and_indexes(cursor, table_name: str, suffix: str):
+    """Free the constraint and index names of a table, so they can be used again"""
+    cursor.execute(
+        """
+        SELECT conname FROM pg_constraint
+        WHERE conrelid = %s::regclass AND contype IN ('p', 'u')
+        """,
+        [table_name],
+    )
+    for (constraint_name,) in cursor.fetchall():
+        cursor.execute(
+            f'ALTER TABLE {table_name} RENAME CONSTRAINT "{constraint_name}" '
+            f'TO "{constraint_name[: 63 - len(suffix)]}{suffix}"'
+        )
+    cursor.execute(
+        """
+        SELECT indexname FROM pg_indexes
+        WHERE schemaname = current_schema() AND tablename = %s
+        """,
+        [table_name],
+    )
+    for (index_name,) in cursor.fetchall():
+        if index_name.endswith(suffix):
+            continue  # already renamed together with its constraint
+        cursor.execute(
+            f'ALTER INDEX "{index_name}" RENAME TO "{index_name[: 63 - len(suffix)]}{suffix}"'
+        )
+
+
+def add_legacy_check(apps, schema_editor):
+    """
+    Add the partition constraint of the legacy partition as a NOT VALID check,
+    which only locks the table briefly. It is validated in a separate transaction.
+
+    The bound has a day of margin, so rows created before the table is partitioned
+    still fit when the migration runs past midnight.
+    """
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(f"SELECT max(created_at) FROM {TABLE_NAME}")
+        (latest_created_at,) = cursor.fetchone()
+        latest_day = timezone.localdate(
+            max(latest_created_at or timezone.now(), timezone.now())
+        )
+        legacy_until = timezone.make_aware(
+            datetime.datetime.combine(
+                latest_day + datetime.timedelta(days=2), datetime.time.min
+            )
+        )
+        cursor.execute(
+            f"ALTER TABLE {TABLE_NAME} ADD CONSTRAINT {LEGACY_CHECK_NAME} "
+            "CHECK (created_at IS NOT NULL AND created_at < %s) NOT VALID",
+            [legacy_until],
+        )
+
+
+def drop_legacy_check(apps, schema_editor):
+    schema_editor.execute(
+        f"ALTER TABLE {TABLE_NAME} DROP CONSTRAINT IF EXISTS {LEGACY_CHECK_NAME}"
+    )
+
+
+def partition_notification_table(apps, schema_editor):
+    """
+    Replace notification_notification by a table that is partitioned by created_at.
+
+    The existing table is attached as a single partition for all rows up to the bound
+    of its validated check, so no data is copied and the table is not scanned again.
+    It is dropped by updatenotificationpartitions once all its rows expired.
+    Rows that do not fall in any partition end up in the default partition.
+    """
+    Notification = apps.get_model("notification", "Notification")
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(f"ALTER TABLE {TABLE_NAME} RENAME TO {LEGACY_TABLE_NAME}")
+        rename_constraints_and_indexes(cursor, LEGACY_TABLE_NAME, "_legacy")
+
+        cursor.execute(
+            f"""
+            CREATE TABLE {TABLE_NAME} (LIKE {LEGACY_TABLE_NAME} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)
+            PARTITION BY RANGE (created_at)
+            """
+        )
+        # The check is copied by LIKE, it only applies to the legacy partition
+        cursor.execute(f"ALTER TABLE {TABLE_NAME} DROP CONSTRAINT {LEGACY_CHECK_NAME}")
+        create_constraints(schema_editor, primary_key="id, created_at")
+        create_indexes(Notification, schema_editor)
+
+        cursor.execute(
+            r"""
+            SELECT (regexp_match(pg_get_constraintdef(oid), '< ''([^'']+)'''))[1]::timestamptz
+            FROM pg_constraint
+            WHERE conrelid = %s::regclass AND conname = %s
+            """,
+            [LEGACY_TABLE_NAME, LEGACY_CHECK_NAME],
+        )
+        (legacy_until,) = cursor.fetchone()
+        cursor.execute(
+            f"ALTER TABLE {TABLE_NAME} ATTACH PARTITION {LEGACY_TABLE_NAME} "
+            "FOR VALUES FROM (MINVALUE) TO (%s)",
+            [legacy_until],
+        )
+        # Redundant with the partition constraint
+        cursor.execute(
+            f"ALTER TABLE {LEGACY_TABLE_NAME} DROP CONSTRAINT {LEGACY_CHECK_NAME}"
+        )
+        cursor.execute(
+            f"CREATE TABLE {DEFAULT_PARTITION_NAME} PARTITION OF {TABLE_NAME} DEFAULT"
+        )
+
+
+def unpartition_notification_table(apps, schema_editor):
+    Notification = apps.get_model("notification", "Notification")
+    unpartitioned_table_name = f"{TABLE_NAME}_unpartitioned"
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(
+            f"""
+            CREATE TABLE {unpartitioned_table_name}
+            (LIKE {TABLE_NAME} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)
+            """
+        )
+        cursor.execute(
+            f"INSERT INTO {unpartitioned_table_name} SELECT * FROM {TABLE_NAME}"
+        )
+        cursor.execute(f"DROP TABLE {TABLE_NAME}")
+        cursor.execute(f"ALTER TABLE {unpartitioned_table_name} RENAME TO {TABLE_NAME}")
+        create_constraints(schema_editor, primary_key="id")
+        create_indexes(Notification, schema_editor)
+
+
+class Migration(migrations.Migration):
+    # The check is validated outside of a transaction, without blocking writes
+    atomic = False
+
+    dependencies = [
+        ("notification", "0036_boatchargingsession_deleted"),
+    ]
+
+    operations = [
+        migrations.RunPython(add_legacy_check, reverse_code=drop_legacy_check),
+        migrations.RunSQL(
+            f"ALTER TABLE {TABLE_NAME} VALIDATE CONSTRAINT {LEGACY_CHECK_NAME}",
+            reverse_sql=migrations.RunSQL.noop,
+        ),
+        # Swapping the tables is atomic, a failed statement must not leave the table renamed
+        migrations.RunPython(
+            partition_notification_table,
+            reverse_code=unpartition_notification_table,
+            atomic=True,
+        ),
+    ]
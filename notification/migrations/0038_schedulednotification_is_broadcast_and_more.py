@@ -0,0 +1,88 @@
+import uuid
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+import core.validators
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("notification", "0037_partition_notification"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="schedulednotification",
+            name="is_broadcast",
+            field=models.BooleanField(default=False),
+        ),
+        migrations.CreateModel(
+            name="BroadcastNotification",
+            fields=[
+                (
+                    "id",
+                    models.UUIDField(
+                        default=uuid.uuid4,
+                        editable=False,
+                        primary_key=True,
+                        serialize=False,
+                    ),
+                ),
+                ("title", models.CharField(max_length=1000)),
+                ("body", models.CharField(max_length=1000)),
+                ("module_slug", models.CharField()),
+                (
+                    "context",
+                    models.JSONField(validators=[core.validators.context_validator]),
+                ),
+                ("notification_type", models.CharField()),
+                (
+                    "image",
+                    models.IntegerField(blank=True, default=None, null=True),
+                ),
+                ("created_at", models.DateTimeField()),
+                ("pushed_at", models.DateTimeField(blank=True, null=True)),
+                ("is_visible", models.BooleanField(default=True)),
+            ],
+            options={
+                "indexes": [
+                    models.Index(
+                        fields=["created_at"], name="notificatio_created_8742fe_idx"
+                    )
+                ],
+            },
+        ),
+        migrations.CreateModel(
+            name="BroadcastNotificationRead",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("read_at", models.DateTimeField(auto_now_add=True)),
+                (
+                    "broadcast",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        to="notification.broadcastnotification",
+                    ),
+                ),
+                (
+                    "device",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        to="notification.device",
+                    ),
+                ),
+            ],
+            options={
+                "unique_together": {("broadcast", "device")},
+            },
+        ),
+    ]
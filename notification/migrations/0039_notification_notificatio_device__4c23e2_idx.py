@@ -0,0 +1,17 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("notification", "0038_schedulednotification_is_broadcast_and_more"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="notification",
+            index=models.Index(
+                fields=["device_external_id", "is_visible", "-created_at"],
+                name="notificatio_device__4c23e2_idx",
+            ),
+        ),
+    ]
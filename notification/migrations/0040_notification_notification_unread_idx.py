@@ -0,0 +1,18 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("notification", "0039_notification_notificatio_device__4c23e2_idx"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="notification",
+            index=models.Index(
+                condition=models.Q(("is_read", False), ("is_visible", True)),
+                fields=["device_external_id"],
+                name="notification_unread_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,24 @@
+import django.db.models.functions.datetime
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("notification", "0040_notification_notification_unread_idx"),
+    ]
+
+    operations = [
+        # The registration time of existing devices is unknown, they keep receiving all broadcasts
+        migrations.AddField(
+            model_name="device",
+            name="created_at",
+            field=models.DateTimeField(null=True),
+        ),
+        migrations.AlterField(
+            model_name="device",
+            name="created_at",
+            field=models.DateTimeField(
+                db_default=django.db.models.functions.datetime.Now(), null=True
+            ),
+        ),
+    ]
@@ -3,6 +3,7 @@ import uuid
 from django.core.exceptions import ValidationError
 from django.db import models
 from django.db.models import F, Q
+from django.db.models.functions import Now
 
 from core.validators import context_validator
 
@@ -13,12 +14,16 @@ class Device(models.Model):
     - external_id: provided by the device, e.g. a (hashed) device id
     - os: operating system of the device, e.g. 'android', 'ios'
     - firebase_token: provided by the device, after requested directly from Firebase
+    - created_at: registration time, devices only receive broadcasts created after it.
+      Unknown for devices registered before it was stored.
     """
 
     external_id = models.CharField(max_length=1000, unique=True)
     os = models.CharField()
     firebase_token = models.CharField(max_length=1000, null=True)
     last_seen = models.DateTimeField(auto_now=True)
+    # A database default, because devices are also created with raw SQL
+    created_at = models.DateTimeField(db_default=Now(), null=True)
 
 
 class BaseNotification(models.Model):
@@ -45,14 +50,17 @@ class BaseNotification(models.Model):
     image = models.IntegerField(default=None, null=True, blank=True)
     created_at = models.DateTimeField()
 
-    def save(self, *args, **kwargs):
-        # note: save is not called when using bulk_create or bulk_update
+    def set_default_context(self):
         if not self.context:
             self.context = {
                 "type": self.notification_type,
                 "module_slug": self.module_slug,
             }
 
+    def save(self, *args, **kwargs):
+        # note: save is not called when using bulk_create or bulk_update
+        self.set_default_context()
+
         # make sure validation is actually triggered when saving a notification instance,
         self.full_clean()
         super().save(*args, **kwargs)
@@ -65,6 +73,8 @@ class ScheduledNotification(BaseNotification):
     - identifier: the unique identifier of the schedule starting with the module_slug
     - scheduled_for: the timestamp the notification was scheduled to be pushed
     - device_ids: m2m to Device.id
+    - is_broadcast: sent to all devices, stored as a single BroadcastNotification
+      instead of a device link and Notification per device
     """
 
     class Meta:
@@ -88,6 +98,7 @@ class ScheduledNotification(BaseNotification):
     expires_at = models.DateTimeField(default="3000-01-01")
     make_push = models.BooleanField(default=True)
     is_ready = models.BooleanField(default=False)
+    is_broadcast = models.BooleanField(default=False)
 
     def __str__(self):
         return f"[SCHEDULED] {self.module_slug} - {self.title}"
@@ -108,6 +119,12 @@ class Notification(BaseNotification):
             models.Index(fields=["notification_type"]),
             models.Index(fields=["created_at"]),
             models.Index(fields=["device_external_id"]),
+            models.Index(fields=["device_external_id", "is_visible", "-created_at"]),
+            models.Index(
+                fields=["device_external_id"],
+                condition=Q(is_read=False, is_visible=True),
+                name="notification_unread_idx",
+            ),
         ]
 
     device = models.ForeignKey(Device, on_delete=models.CASCADE)
@@ -124,6 +141,45 @@ class Notification(BaseNotification):
         super().save()
 
 
+class BroadcastNotification(BaseNotification):
+    """
+    Notification for all devices, stored once instead of once per device.
+    Notification history merges broadcasts with the notifications of a device.
+    - created_at: the timestamp on which the service created the push request
+    - pushed_at: set when the broadcast was pushed
+    - is_visible: determines if the notification should be visible in the notification history in the app
+    """
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["created_at"]),
+        ]
+
+    pushed_at = models.DateTimeField(null=True, blank=True)
+    is_visible = models.BooleanField(default=True)
+
+    def __str__(self):
+        return f"[BROADCAST] {self.module_slug} - {self.title}"
+
+
+class BroadcastNotificationRead(models.Model):
+    """
+    Read receipt of a broadcast notification for a device.
+    A broadcast without a read receipt for a device is unread.
+
+    - broadcast: fk to BroadcastNotification.id
+    - device: fk to Device.id
+    - read_at: the timestamp on which the device read the broadcast
+    """
+
+    class Meta:
+        unique_together = ("broadcast", "device")
+
+    broadcast = models.ForeignKey(BroadcastNotification, on_delete=models.CASCADE)
+    device = models.ForeignKey(Device, on_delete=models.CASCADE)
+    read_at = models.DateTimeField(auto_now_add=True)
+
+
 class NotificationPushTypeDisabled(models.Model):
     """
     Record that determines if push notifications are enabled for a device.
@@ -1,7 +1,8 @@
+from django.db.models import Manager
 from drf_spectacular.utils import extend_schema_field
 from rest_framework import serializers
 
-from core.services.image_set import ImageSetService
+from core.services.image_set import ImageSetResolver
 from notification.models.notification_models import (
     Notification,
     NotificationLast,
@@ -45,12 +46,28 @@ class NotificationContextSerializer(serializers.Serializer):
         return data
 
 
+class NotificationResultListSerializer(serializers.ListSerializer):
+    """Resolves the images of all notifications in the list up front"""
+
+    def to_representation(self, data):
+        notifications = list(data.all() if isinstance(data, Manager) else data)
+        self.child.image_resolver.prefetch(
+            notification.image for notification in notifications
+        )
+        return super().to_representation(notifications)
+
+
 class NotificationResultSerializer(serializers.ModelSerializer):
     image = serializers.SerializerMethodField()
     context = serializers.SerializerMethodField()
 
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.image_resolver = ImageSetResolver()
+
     class Meta:
         model = Notification
+        list_serializer_class = NotificationResultListSerializer
         fields = [
             "id",
             "title",
@@ -68,7 +85,7 @@ class NotificationResultSerializer(serializers.ModelSerializer):
         if obj.image is None:
             return None
 
-        image_set_data = ImageSetService().get(obj.image)
+        image_set_data = self.image_resolver.get(obj.image)
         return NotificationImageSerializer(image_set_data).data
 
     @extend_schema_field(NotificationContextSerializer)
@@ -0,0 +1,126 @@
+from django.db.models import Exists, F, OuterRef, Q, QuerySet, Subquery
+
+from notification.models.notification_models import (
+    BroadcastNotification,
+    BroadcastNotificationRead,
+    Device,
+    Notification,
+)
+
+# Fields of the notification history, is_read is last because it is an annotation for broadcasts
+HISTORY_FIELDS = [
+    "id",
+    "title",
+    "body",
+    "module_slug",
+    "context",
+    "notification_type",
+    "image",
+    "created_at",
+    "pushed_at",
+    "is_read",
+]
+
+
+def get_internal_device_id(external_id: str) -> int | None:
+    return (
+        Device.objects.filter(external_id=external_id)
+        .values_list("id", flat=True)
+        .first()
+    )
+
+
+def get_broadcasts(device_id: int) -> QuerySet:
+    """Broadcasts created since the device was registered, annotated with is_read for the device"""
+    return (
+        BroadcastNotification.objects.alias(
+            device_created_at=Subquery(
+                Device.objects.filter(id=device_id).values("created_at")
+            )
+        )
+        .filter(
+            Q(device_created_at__isnull=True)
+            | Q(created_at__gte=F("device_created_at"))
+        )
+        .annotate(
+            is_read=Exists(
+                BroadcastNotificationRead.objects.filter(
+                    broadcast=OuterRef("pk"), device_id=device_id
+                )
+            )
+        )
+    )
+
+
+def get_notification_history(
+    notifications: QuerySet, device_external_id: str, keyset_filter: Q | None = None
+) -> QuerySet:
+    """
+    Merge the visible broadcasts with the notifications of a device, newest first.
+
+    Args:
+        notifications (QuerySet): notifications of the device
+        device_external_id (str): external id of the device
+        keyset_filter (Q): applied to both notifications and broadcasts, see KeysetPagination
+
+    Returns:
+        QuerySet: dicts with HISTORY_FIELDS, see history_to_notifications()
+    """
+    if keyset_filter is not None:
+        notifications = notifications.filter(keyset_filter)
+    notifications = notifications.values(*HISTORY_FIELDS)
+    device_id = get_internal_device_id(device_external_id)
+    if device_id is not None:
+        broadcasts = get_broadcasts(device_id).filter(is_visible=True)
+        if keyset_filter is not None:
+            broadcasts = broadcasts.filter(keyset_filter)
+        notifications = notifications.union(
+            broadcasts.values(*HISTORY_FIELDS), all=True
+        )
+    return notifications.order_by("-created_at", "-id")
+
+
+def history_to_notifications(rows) -> list[Notification]:
+    """Unsaved Notification objects, so broadcasts and notifications serialize the same way"""
+    return [Notification(**row) for row in rows]
+
+
+def broadcast_to_notification(broadcast: BroadcastNotification) -> Notification:
+    """Unsaved Notification object of a broadcast annotated with is_read"""
+    return Notification(
+        **{field: getattr(broadcast, field) for field in HISTORY_FIELDS},
+        is_visible=broadcast.is_visible,
+    )
+
+
+def mark_broadcasts_read(device_id: int) -> int:
+    """
+    Add a read receipt for every visible broadcast the device has not read yet.
+
+    Returns:
+        int: number of broadcasts marked as read
+    """
+    unread_broadcast_ids = (
+        get_broadcasts(device_id)
+        .filter(is_visible=True, is_read=False)
+        .values_list("id", flat=True)
+    )
+    read_receipts = BroadcastNotificationRead.objects.bulk_create(
+        [
+            BroadcastNotificationRead(broadcast_id=broadcast_id, device_id=device_id)
+            for broadcast_id in unread_broadcast_ids
+        ],
+        ignore_conflicts=True,
+    )
+    return len(read_receipts)
+
+
+def set_broadcast_read(broadcast: BroadcastNotification, device_id: int, is_read: bool):
+    if is_read:
+        BroadcastNotificationRead.objects.get_or_create(
+            broadcast=broadcast, device_id=device_id
+        )
+    else:
+        BroadcastNotificationRead.objects.filter(
+            broadcast=broadcast, device_id=device_id
+        ).delete()
@@ -0,0 +1,93 @@
+import datetime
+import hashlib
+import logging
+
+from django.core.cache import cache
+from django.utils.dateparse import parse_datetime
+from django_redis import get_redis_connection
+
+logger = logging.getLogger(__name__)
+# Limits how long a registration is skipped when the device changed outside of the register view
+REGISTRATION_TIMEOUT = 60 * 60 * 24
+# Redis hash of device external_id mapped to the last time it registered
+LAST_SEEN_KEY = "notification:device_last_seen"
+
+
+def get_registration_key(device_external_id: str) -> str:
+    return f"notification:device_registration:{device_external_id}"
+
+
+def get_registration_fingerprint(firebase_token: str, os: str) -> str:
+    return hashlib.sha256(f"{firebase_token}|{os}".encode()).hexdigest()
+
+
+def get_registered_device_id(device_external_id: str, fingerprint: str) -> int | None:
+    """
+    Internal id of the device when it was registered with the same fingerprint before,
+    None when the registration has to be written to the database.
+    """
+    try:
+        registration = cache.get(get_registration_key(device_external_id))
+    except Exception:
+        logger.warning("Failed to get device registration from cache", exc_info=True)
+        return None
+    if registration is None or registration["fingerprint"] != fingerprint:
+        return None
+    return registration["id"]
+
+
+def remember_registration(device_external_id: str, device_id: int, fingerprint: str):
+    try:
+        cache.set(
+            get_registration_key(device_external_id),
+            {"id": device_id, "fingerprint": fingerprint},
+            timeout=REGISTRATION_TIMEOUT,
+        )
+    except Exception:
+        logger.warning("Failed to store device registration in cache", exc_info=True)
+
+
+def forget_registrations(device_external_ids: list[str]):
+    """Must be called when the token or os of a device changes outside of the register view"""
+    if not device_external_ids:
+        return
+    try:
+        cache.delete_many(
+            [get_registration_key(external_id) for external_id in device_external_ids]
+        )
+    except Exception:
+        logger.warning(
+            "Failed to remove device registrations from cache", exc_info=True
+        )
+
+
+def buffer_last_seen(device_external_id: str, last_seen: datetime.datetime) -> bool:
+    """
+    Buffer the last_seen of a device, see the flushdevicelastseen command.
+
+    Returns:
+        bool: False when the last_seen could not be buffered
+    """
+    try:
+        redis_connection = get_redis_connection("default")
+        redis_connection.hset(
+            cache.make_key(LAST_SEEN_KEY), device_external_id, last_seen.isoformat()
+        )
+    except Exception:
+        logger.warning("Failed to buffer device last_seen", exc_info=True)
+        return False
+    return True
+
+
+def pop_buffered_last_seen() -> dict[str, datetime.datetime]:
+    """Read and clear the buffered last_seen values in a single transaction"""
+    key = cache.make_key(LAST_SEEN_KEY)
+    redis_connection = get_redis_connection("default")
+    pipeline = redis_connection.pipeline(transaction=True)
+    pipeline.hgetall(key)
+    pipeline.delete(key)
+    buffered_last_seen, _ = pipeline.execute()
+    return {
+        external_id.decode(): parse_datetime(last_seen.decode())
+        for external_id, last_seen in buffered_last_seen.items()
+    }
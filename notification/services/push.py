@@ -1,76 +1,219 @@
 import logging
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import NamedTuple
 
 from django.conf import settings
-from firebase_admin import messaging
+from firebase_admin import exceptions, messaging
+from more_itertools import chunked
 
-from core.services.image_set import ImageSetService
-from notification.models.notification_models import Notification
+from core.metrics import firebase_tokens_removed_counter
+from core.services.image_set import ImageSetResolver, ImageSetService
+from notification.models.notification_models import Device, Notification
+from notification.services.device_registration import forget_registrations
 
 logger = logging.getLogger(__name__)
-thread_pool = ThreadPoolExecutor(max_workers=settings.MAX_FIREBASE_WORKERS)
+thread_pool = ThreadPoolExecutor(max_workers=settings.MAX_FIREBASE_BATCHES_IN_FLIGHT)
+
+# Firebase errors that tell us the token will never be deliverable again
+DEAD_TOKEN_ERRORS = (
+    messaging.UnregisteredError,
+    messaging.SenderIdMismatchError,
+    exceptions.InvalidArgumentError,
+)
+# Part of the error message of Firebase when the registration token itself is invalid
+INVALID_TOKEN_MESSAGE = "registration token"
+
+
+class BatchResult(NamedTuple):
+    """
+    - failed_tokens: tokens of all messages in the batch that could not be sent
+    - dead_tokens: tokens that Firebase will never accept again and should be removed
+    """
+
+    failed_tokens: list[str]
+    dead_tokens: set[str]
 
 
 class PushService:
+    def __init__(self):
+        self._payloads = {}
+        self.image_resolver = ImageSetResolver()
+        self.removed_token_count = 0
+
     def push(self, notifications: list[Notification]) -> int:
         """
         Forwards notification to Firebase, to be pushed to devices.
 
-        Processes notifications in batches of 5000 to avoid high memory usage.
-        Each batch is sent concurrently using a thread pool.
+        Notifications are sent in batches of FIREBASE_BATCH_SIZE. At most
+        MAX_FIREBASE_BATCHES_IN_FLIGHT batches are sent concurrently, the next batch is only
+        built once a slot is available. Every batch is sent with send_each calls of at most
+        FIREBASE_SEND_EACH_SIZE messages, because send_each starts a thread per message.
+
+        Tokens that Firebase reports as permanently invalid are removed from their devices
+        after each batch, see removed_token_count.
 
         Args:
-            notifications (list[Notification]): notifications used for Firebase message data
+            notifications (list[Notification]): notifications used for Firebase message data,
+                annotated with the firebase_token of their device
+
+        Returns:
+            int: number of notifications that could not be delivered to Firebase
         """
+        self._payloads = {}
+        self.removed_token_count = 0
+        self.image_resolver.prefetch(
+            {notification.image for notification in notifications}
+        )
         failed_token_count = 0
+        in_flight = set()
         for batch in self._batch_messages(notifications):
+            if len(in_flight) >= settings.MAX_FIREBASE_BATCHES_IN_FLIGHT:
+                done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                failed_token_count += self._handle_batch_results(done)
+
             firebase_messages = [
                 self._define_firebase_message(notification) for notification in batch
             ]
-            futures = []
-            for msg in firebase_messages:
-                futures.append(thread_pool.submit(self._send_message, msg))
-
-            for future in as_completed(futures):
-                result = future.result()
-                if result is False:
-                    failed_token_count += 1
+            in_flight.add(thread_pool.submit(self._send_batch, firebase_messages))
+
+        done, _ = wait(in_flight)
+        failed_token_count += self._handle_batch_results(done)
         return failed_token_count
 
-    def _send_message(self, message: messaging.Message) -> bool:
-        try:
-            messaging.send(message)
-            return True
-        except Exception:
-            logger.error(
-                "Failed to send notification to device",
-                extra={"firebase_token": getattr(message, "token", None)},
+    def _handle_batch_results(self, futures) -> int:
+        """
+        Collect the results of the finished batches and prune their dead tokens.
+        Database writes happen here, on the calling thread, and not in the thread pool.
+
+        Returns:
+            int: number of failed messages in the finished batches
+        """
+        failed_token_count = 0
+        for future in futures:
+            batch_result = future.result()
+            failed_token_count += len(batch_result.failed_tokens)
+            if batch_result.dead_tokens:
+                self._remove_dead_tokens(batch_result.dead_tokens)
+        return failed_token_count
+
+    def _send_batch(self, messages: list[messaging.Message]) -> BatchResult:
+        """
+        Send a batch of messages with send_each calls of at most FIREBASE_SEND_EACH_SIZE messages.
+        """
+        failed_tokens, failures = [], []
+        for chunk in chunked(messages, settings.FIREBASE_SEND_EACH_SIZE):
+            try:
+                batch_response = messaging.send_each(chunk)
+            except Exception:
+                logger.error(
+                    "Failed to send batch of notifications",
+                    exc_info=True,
+                    extra={"batch_size": len(chunk)},
+                )
+                failed_tokens += [message.token for message in chunk]
+                continue
+
+            for message, response in zip(chunk, batch_response.responses, strict=True):
+                if response.success:
+                    continue
+                failures.append((message.token, response.exception))
+                logger.error(
+                    "Failed to send notification to device",
+                    extra={
+                        "firebase_token": message.token,
+                        "error": str(response.exception),
+                    },
+                )
+        return BatchResult(
+            failed_tokens=failed_tokens + [token for token, _ in failures],
+            dead_tokens=self._get_dead_tokens(
+                failures, batch_size=len(messages) - len(failed_tokens)
+            ),
+        )
+
+    def _get_dead_tokens(
+        self, failures: list[tuple[str, Exception]], batch_size: int
+    ) -> set[str]:
+        """
+        Select the tokens that failed because the token itself is no longer valid.
+
+        An invalid argument can also be caused by the message payload. Firebase names the
+        registration token in the error when the token is invalid. Otherwise, since all
+        messages in a push share the same payload, the token is only considered invalid
+        when other messages in the same batch were accepted or failed for another reason.
+        """
+        payload_rejected = batch_size == 1 or batch_size == sum(
+            isinstance(error, exceptions.InvalidArgumentError) for _, error in failures
+        )
+        return {
+            token
+            for token, error in failures
+            if isinstance(error, DEAD_TOKEN_ERRORS)
+            and not (
+                isinstance(error, exceptions.InvalidArgumentError)
+                and payload_rejected
+                and INVALID_TOKEN_MESSAGE not in str(error).lower()
             )
-            return False
+        }
+
+    def _remove_dead_tokens(self, dead_tokens: set[str]):
+        devices = Device.objects.filter(firebase_token__in=dead_tokens)
+        # A device registering the same token again has to be written to the database
+        forget_registrations(list(devices.values_list("external_id", flat=True)))
+        removed_count = devices.update(firebase_token=None)
+        self.removed_token_count += removed_count
+        firebase_tokens_removed_counter.add(removed_count)
+        logger.info(
+            "Removed invalid firebase tokens",
+            extra={"removed_token_count": removed_count},
+        )
 
     def _define_firebase_message(
         self, notification_obj: Notification
     ) -> messaging.Message:
-        complete_context = notification_obj.context
-        complete_context["notificationId"] = str(notification_obj.pk)
-
-        ios_image_config, android_image_config = None, None
-        if notification_obj.image:
-            image_set = ImageSetService()
-            image_set.get(notification_obj.image)
-            android_image_config, ios_image_config = self._get_image_config(image_set)
+        # The context can be shared between notifications, so it is not modified in place
+        complete_context = {
+            **notification_obj.context,
+            "notificationId": str(notification_obj.pk),
+        }
 
+        firebase_notification, android_image_config, ios_image_config = (
+            self._get_payload(notification_obj)
+        )
         firebase_message = messaging.Message(
             data=complete_context,
-            notification=messaging.Notification(
-                title=notification_obj.title, body=notification_obj.body
-            ),
-            token=notification_obj.device.firebase_token,
+            notification=firebase_notification,
+            token=notification_obj.firebase_token,
             android=android_image_config,
             apns=ios_image_config,
         )
         return firebase_message
 
+    def _get_payload(self, notification_obj: Notification) -> tuple:
+        """
+        Notifications with the same title, body and image share their Firebase payload objects.
+        """
+        payload_key = (
+            notification_obj.title,
+            notification_obj.body,
+            notification_obj.image,
+        )
+        if payload_key in self._payloads:
+            return self._payloads[payload_key]
+
+        ios_image_config, android_image_config = None, None
+        if notification_obj.image:
+            image_set = ImageSetService()
+            image_set.data = self.image_resolver.get(notification_obj.image)
+            android_image_config, ios_image_config = self._get_image_config(image_set)
+
+        firebase_notification = messaging.Notification(
+            title=notification_obj.title, body=notification_obj.body
+        )
+        payload = (firebase_notification, android_image_config, ios_image_config)
+        self._payloads[payload_key] = payload
+        return payload
+
     def _get_image_config(self, image_set: ImageSetService):
         """
         Image requirements:
@@ -90,15 +233,10 @@ class PushService:
         )
         return android_image_config, ios_image_config
 
-    def _batch_messages(
-        self, notifications: list[Notification]
-    ) -> list[list[Notification]]:
+    def _batch_messages(self, notifications: list[Notification]):
         """
-        Split the device list into batches to prevent memory overflow.
+        Split the notifications into batches that fit in a single send_each call.
         """
-        max_devices = 5000
-        batches = [
-            notifications[i : i + max_devices]
-            for i in range(0, len(notifications), max_devices)
-        ]
-        return batches
+        batch_size = settings.FIREBASE_BATCH_SIZE
+        for i in range(0, len(notifications), batch_size):
+            yield notifications[i : i + batch_size]
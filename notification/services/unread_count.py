@@ -0,0 +1,79 @@
+import logging
+
+from django.core.cache import cache
+from django_redis import get_redis_connection
+
+from notification.models.notification_models import Notification
+from notification.services.broadcast import get_broadcasts, get_internal_device_id
+
+logger = logging.getLogger(__name__)
+# Counters drift when an increment is skipped during a rebuild, the timeout limits that
+UNREAD_COUNT_TIMEOUT = 60 * 60 * 24
+# Only increment counters that exist, a missing counter is rebuilt from the database
+INCREMENT_EXISTING_SCRIPT = """
+for _, key in ipairs(KEYS) do
+    if redis.call('EXISTS', key) == 1 then
+        redis.call('INCRBY', key, ARGV[1])
+    end
+end
+"""
+
+
+def get_unread_count_key(device_external_id: str) -> str:
+    return f"notification:unread_count:{device_external_id}"
+
+
+def get_unread_count(device_external_id: str) -> int:
+    """
+    Number of unread visible notifications and broadcasts of a device.
+    The counter is rebuilt from the database when it is missing.
+    """
+    key = get_unread_count_key(device_external_id)
+    try:
+        unread_count = cache.get(key)
+    except Exception:
+        logger.warning("Failed to get unread count from cache", exc_info=True)
+        return count_unread(device_external_id)
+
+    if unread_count is None or unread_count < 0:
+        unread_count = count_unread(device_external_id)
+        try:
+            cache.set(key, unread_count, timeout=UNREAD_COUNT_TIMEOUT)
+        except Exception:
+            logger.warning("Failed to store unread count in cache", exc_info=True)
+    return unread_count
+
+
+def count_unread(device_external_id: str) -> int:
+    unread_count = Notification.objects.filter(
+        device_external_id=device_external_id, is_visible=True, is_read=False
+    ).count()
+    device_id = get_internal_device_id(device_external_id)
+    if device_id is not None:
+        unread_count += (
+            get_broadcasts(device_id).filter(is_visible=True, is_read=False).count()
+        )
+    return unread_count
+
+
+def increment_unread_counts(device_external_ids: list[str], amount: int = 1):
+    """Increment the existing counters of the devices in a single round trip"""
+    if not device_external_ids:
+        return
+    keys = [
+        cache.make_key(get_unread_count_key(external_id))
+        for external_id in device_external_ids
+    ]
+    try:
+        redis_connection = get_redis_connection("default")
+        redis_connection.eval(INCREMENT_EXISTING_SCRIPT, len(keys), *keys, amount)
+    except Exception:
+        logger.warning("Failed to increment unread counts", exc_info=True)
+
+
+def decrement_unread_count(device_external_id: str):
+    increment_unread_counts([device_external_id], amount=-1)
+
+
+def reset_unread_count(device_external_id: str):
+    cache.set(get_unread_count_key(device_external_id), 0, timeout=UNREAD_COUNT_TIMEOUT)
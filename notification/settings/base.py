@@ -42,8 +42,15 @@ DATABASE_ROUTERS = []
 
 APPEND_SLASH = True
 
-# Firebase will accept a maximum of 500 messages as the same time, but sends them all in parallel.
-# In order to prevent threadpool exhaustion we take a lower limit on concurrency
-MAX_FIREBASE_WORKERS = 10
+# Dead tokens are pruned and failures are counted per batch of FIREBASE_BATCH_SIZE messages.
+# send_each starts one thread and HTTP request per message, so a batch is sent with calls of at most
+# FIREBASE_SEND_EACH_SIZE messages. At most MAX_FIREBASE_BATCHES_IN_FLIGHT * FIREBASE_SEND_EACH_SIZE
+# messages are sent concurrently.
+FIREBASE_BATCH_SIZE = 500
+FIREBASE_SEND_EACH_SIZE = 5
+MAX_FIREBASE_BATCHES_IN_FLIGHT = 2
+
+# Batches of at least this many notifications are inserted with COPY instead of INSERT
+NOTIFICATION_COPY_THRESHOLD = 1000
 
 STATIC_URL = "/notification/static/"
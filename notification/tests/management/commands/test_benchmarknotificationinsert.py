@@ -0,0 +1,17 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from notification.models.notification_models import Device, Notification
+
+
+class BenchmarkNotificationInsertTest(TestCase):
+    def test_benchmark_is_rolled_back(self):
+        out = StringIO()
+
+        call_command("benchmarknotificationinsert", "--sizes", "10", stdout=out)
+
+        self.assertIn("10 rows: bulk_create", out.getvalue())
+        self.assertEqual(Notification.objects.count(), 0)
+        self.assertEqual(Device.objects.count(), 0)
@@ -0,0 +1,40 @@
+import datetime
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+from model_bakery import baker
+
+from notification.models.notification_models import Device
+from notification.services.device_registration import (
+    buffer_last_seen,
+    pop_buffered_last_seen,
+)
+
+
+class FlushDeviceLastSeenTest(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_buffered_last_seen_is_written(self):
+        old_last_seen = timezone.now() - datetime.timedelta(days=10)
+        device = baker.make(Device, external_id="device_1")
+        other_device = baker.make(Device, external_id="device_2")
+        Device.objects.update(last_seen=old_last_seen)
+
+        last_seen = timezone.now()
+        buffer_last_seen(device.external_id, last_seen)
+        buffer_last_seen("unknown_device", last_seen)
+
+        call_command("flushdevicelastseen")
+
+        device.refresh_from_db()
+        other_device.refresh_from_db()
+        self.assertEqual(device.last_seen, last_seen)
+        self.assertEqual(other_device.last_seen, old_last_seen)
+        self.assertEqual(pop_buffered_last_seen(), {})
+
+    def test_nothing_buffered(self):
+        call_command("flushdevicelastseen")
+        self.assertEqual(pop_buffered_last_seen(), {})
@@ -1,10 +1,21 @@
+import threading
 from datetime import datetime, timedelta
+from unittest.mock import patch
 
 from django.core.management import call_command
+from django.db import connection
 from django.test import TransactionTestCase, override_settings
+from django.utils import timezone
+from freezegun import freeze_time
 from model_bakery import baker
 
+from core.services.notification_service import SCHEDULED_NOTIFICATION_READY_CHANNEL
+from notification.management.commands.pushschedulednotifications import (
+    MAX_WAIT_SECONDS,
+    Command,
+)
 from notification.models.notification_models import (
+    BroadcastNotification,
     Device,
     Notification,
     ScheduledNotification,
@@ -123,3 +134,102 @@ class UpdateScheduledNotificationsTest(TransactionTestCase):
         self.assertEqual(Notification.objects.count(), nr_devices)
         for device in devices:
             self.assertEqual(Notification.objects.filter(device=device).count(), 1)
+
+    @override_settings(NOTIFICATION_DEVICE_BATCH_SIZE=2)
+    def test_push_broadcast(self):
+        baker.make(Device, firebase_token="abc_token", _quantity=5)
+        scheduled_notification = baker.make(
+            ScheduledNotification,
+            scheduled_for=datetime.now() - timedelta(minutes=1),
+            is_ready=True,
+            is_broadcast=True,
+        )
+
+        call_command("pushschedulednotifications", "--test-mode")
+
+        self.assertEqual(ScheduledNotification.objects.count(), 0)
+        self.assertEqual(Notification.objects.count(), 0)
+        broadcast = BroadcastNotification.objects.get()
+        self.assertEqual(broadcast.title, scheduled_notification.title)
+        self.assertIsNone(broadcast.pushed_at)  # test mode does not push
+
+    def test_push_scheduled_notifications_with_workers(self):
+        devices = baker.make(Device, _quantity=3)
+        baker.make(
+            ScheduledNotification,
+            scheduled_for=datetime.now() - timedelta(minutes=1),
+            devices=devices,
+            is_ready=True,
+            _quantity=5,
+        )
+
+        call_command("pushschedulednotifications", "--test-mode", "--workers", "3")
+
+        self.assertEqual(ScheduledNotification.objects.count(), 0)
+        self.assertEqual(Notification.objects.count(), 5 * len(devices))
+
+    def test_not_ready_scheduled_notification_is_skipped(self):
+        devices = baker.make(Device, _quantity=2)
+        baker.make(
+            ScheduledNotification,
+            scheduled_for=datetime.now() - timedelta(minutes=1),
+            devices=devices,
+            is_ready=False,
+        )
+
+        call_command("pushschedulednotifications", "--test-mode", "--workers", "2")
+
+        self.assertEqual(ScheduledNotification.objects.count(), 1)
+        self.assertEqual(Notification.objects.count(), 0)
+
+    @freeze_time("2026-02-01 10:00:00")
+    def test_wait_timeout_until_next_scheduled_notification(self):
+        baker.make(
+            ScheduledNotification,
+            scheduled_for=timezone.now() + timedelta(seconds=10),
+            is_ready=True,
+        )
+        baker.make(
+            ScheduledNotification,
+            scheduled_for=timezone.now() + timedelta(seconds=3),
+            is_ready=False,
+        )
+
+        self.assertEqual(Command().get_wait_timeout(), 10)
+
+    def test_wait_timeout_with_due_notification(self):
+        baker.make(
+            ScheduledNotification,
+            scheduled_for=timezone.now() - timedelta(seconds=10),
+            is_ready=True,
+        )
+
+        self.assertEqual(Command().get_wait_timeout(), 0)
+
+    def test_wait_returns_on_notify_during_timeout_query(self):
+        command = Command()
+        command.listening = threading.local()
+
+        def get_wait_timeout():
+            with connection.cursor() as cursor:
+                cursor.execute(f"NOTIFY {SCHEDULED_NOTIFICATION_READY_CHANNEL}")
+            return MAX_WAIT_SECONDS
+
+        with (
+            patch.object(command, "get_wait_timeout", side_effect=get_wait_timeout),
+            patch(
+                "notification.management.commands.pushschedulednotifications.select.select"
+            ) as mock_select,
+        ):
+            command.wait_for_ready_notifications()
+
+        mock_select.assert_not_called()
+
+    def test_wait_timeout_without_scheduled_notifications(self):
+        baker.make(
+            ScheduledNotification,
+            scheduled_for=timezone.now() + timedelta(days=1),
+            is_ready=True,
+        )
+
+        self.assertEqual(Command().get_wait_timeout(), MAX_WAIT_SECONDS)
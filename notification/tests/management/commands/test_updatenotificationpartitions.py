@@ -1,15 +1,53 @@
 import datetime
 
 from django.core.management import call_command
-from django.test import TransactionTestCase
+from django.db import connection
+from django.test import SimpleTestCase, TransactionTestCase
+from django.utils import timezone
 from freezegun import freeze_time
 from model_bakery import baker
 
-from notification.management.commands.updatenotificationpartitions import DAYS_TO_KEEP
-from notification.models.notification_models import Notification
+from notification.management.commands.updatenotificationpartitions import (
+    DAYS_AHEAD,
+    DAYS_TO_KEEP,
+    TABLE_NAME,
+    Command,
+    get_missing_ranges,
+    start_of_day,
+)
+from notification.models.notification_models import (
+    BroadcastNotification,
+    Notification,
+)
 
 
 class UpdatePartitionsTest(TransactionTestCase):
+    def setUp(self):
+        self.initial_partition_bounds = Command().get_partition_bounds()
+
+    def tearDown(self):
+        """Partition DDL is not rolled back, restore the partitions of the migration"""
+        partition_bounds = Command().get_partition_bounds()
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {TABLE_NAME}")
+            for partition_name in partition_bounds:
+                if partition_name not in self.initial_partition_bounds:
+                    cursor.execute(
+                        f"ALTER TABLE {TABLE_NAME} DETACH PARTITION {partition_name}"
+                    )
+                    cursor.execute(f"DROP TABLE {partition_name}")
+            for partition_name, bounds in self.initial_partition_bounds.items():
+                lower, upper = bounds
+                if partition_name in partition_bounds or upper is None:
+                    continue
+                cursor.execute(
+                    f"CREATE TABLE {partition_name} PARTITION OF {TABLE_NAME} "
+                    "FOR VALUES FROM ("
+                    + ("MINVALUE" if lower is None else "%s")
+                    + ") TO (%s)",
+                    [upper] if lower is None else [lower, upper],
+                )
+
     def test_old_notifications_are_deleted(self):
         initial_date = datetime.date.today()
         baker.make(
@@ -66,3 +104,81 @@ class UpdatePartitionsTest(TransactionTestCase):
 
         remaining_notifications = Notification.objects.all()
         self.assertEqual(remaining_notifications.count(), 5)
+
+    def test_future_partitions_are_created(self):
+        call_command("updatenotificationpartitions")
+
+        partitions = Command().get_partitions()
+        last_day = datetime.date.today() + datetime.timedelta(days=DAYS_AHEAD)
+        self.assertIn(f"{TABLE_NAME}_p{last_day:%Y%m%d}", partitions)
+
+        # Running the command again does not fail on existing partitions
+        call_command("updatenotificationpartitions")
+        self.assertEqual(Command().get_partitions(), partitions)
+
+    def test_rows_in_default_partition_are_moved(self):
+        future_date = datetime.date.today() + datetime.timedelta(days=DAYS_AHEAD + 5)
+        notifications = baker.make(
+            Notification,
+            _quantity=3,
+            created_at=future_date,
+        )
+
+        with freeze_time(future_date):
+            call_command("updatenotificationpartitions")
+
+        self.assertIn(f"{TABLE_NAME}_p{future_date:%Y%m%d}", Command().get_partitions())
+        self.assertEqual(
+            set(Notification.objects.values_list("id", flat=True)),
+            {n.id for n in notifications},
+        )
+
+    def test_old_broadcasts_are_deleted(self):
+        initial_date = datetime.date.today()
+        baker.make(BroadcastNotification, created_at=initial_date)
+
+        later_date = initial_date + datetime.timedelta(days=DAYS_TO_KEEP + 1)
+        with freeze_time(later_date):
+            baker.make(BroadcastNotification, created_at=later_date)
+            call_command("updatenotificationpartitions")
+
+        self.assertEqual(BroadcastNotification.objects.count(), 1)
+
+    def test_missing_days_are_created(self):
+        today = timezone.localdate()
+        command = Command()
+        command.create_partition(
+            f"{TABLE_NAME}_p_ahead",
+            start_of_day(today + datetime.timedelta(days=DAYS_AHEAD)),
+            start_of_day(today + datetime.timedelta(days=DAYS_AHEAD + 1)),
+        )
+
+        call_command("updatenotificationpartitions")
+
+        partitions = command.get_partitions()
+        for offset in range(1, DAYS_AHEAD):
+            day = today + datetime.timedelta(days=offset)
+            self.assertIn(f"{TABLE_NAME}_p{day:%Y%m%d}", partitions)
+
+
+class GetMissingRangesTest(SimpleTestCase):
+    def test_missing_ranges(self):
+        start = start_of_day(datetime.date(2024, 1, 1))
+        hour = datetime.timedelta(hours=1)
+        ranges = [
+            (None, start + hour),
+            (start + 3 * hour, start + 4 * hour),
+        ]
+
+        missing_ranges = get_missing_ranges(start, start + 6 * hour, ranges)
+
+        self.assertEqual(
+            missing_ranges,
+            [(start + hour, start + 3 * hour), (start + 4 * hour, start + 6 * hour)],
+        )
+
+    def test_no_missing_ranges(self):
+        start = start_of_day(datetime.date(2024, 1, 1))
+        end = start + datetime.timedelta(days=1)
+
+        self.assertEqual(get_missing_ranges(start, end, [(None, end)]), [])
@@ -1,6 +1,7 @@
 from unittest.mock import patch
 
-from django.test import TestCase
+from django.test import TestCase, override_settings
+from firebase_admin import exceptions, messaging
 from model_bakery import baker
 
 from notification.models.notification_models import Device, Notification
@@ -8,6 +9,18 @@ from notification.services.push import PushService
 from notification.utils.patch_utils import apply_init_firebase_patches
 
 
+def mock_batch_response(messages, failed_tokens=(), error=None):
+    responses = []
+    for message in messages:
+        if message.token in failed_tokens:
+            responses.append(
+                messaging.SendResponse(None, error or Exception("test error"))
+            )
+        else:
+            responses.append(messaging.SendResponse({"name": "message-id"}, None))
+    return messaging.BatchResponse(responses)
+
+
 class TestPushService(TestCase):
     @classmethod
     def setUpClass(cls):
@@ -17,34 +30,204 @@ class TestPushService(TestCase):
     def setUp(self):
         self.push_service = PushService()
 
-    @patch("firebase_admin.messaging.send")
-    def test_push_success(self, mock_send):
-        device = baker.make(Device, firebase_token="test_token")
-        notification = baker.make(Notification, device=device, image=None)
+    def make_notifications(self, amount, token_prefix="test_token"):
+        notifications = []
+        for i in range(amount):
+            device = baker.make(Device, firebase_token=f"{token_prefix}_{i}")
+            notification = baker.make(Notification, device=device, image=None)
+            notification.firebase_token = device.firebase_token
+            notifications.append(notification)
+        return notifications
+
+    @patch("firebase_admin.messaging.send_each", side_effect=mock_batch_response)
+    def test_push_success(self, mock_send_each):
+        notifications = self.make_notifications(1)
 
-        self.push_service.push([notification])
-        mock_send.assert_called_once()
+        failed_token_count = self.push_service.push(notifications)
 
-    @patch("firebase_admin.messaging.send")
-    def test_push_success_batches(self, mock_send):
-        device = baker.make(Device, firebase_token="test_token")
-        notification = baker.make(Notification, device=device, image=None)
-        notifications = [notification] * 8
+        mock_send_each.assert_called_once()
+        self.assertEqual(failed_token_count, 0)
 
-        self.push_service.push(notifications)
+    @override_settings(FIREBASE_BATCH_SIZE=3)
+    @patch("firebase_admin.messaging.send_each", side_effect=mock_batch_response)
+    def test_push_success_batches(self, mock_send_each):
+        notifications = self.make_notifications(8)
 
-        self.assertEqual(mock_send.call_count, 8)
+        self.push_service.push(notifications)
 
-    @patch("firebase_admin.messaging.send")
-    def test_push_failed_tokens(self, mock_send):
-        device = baker.make(Device, firebase_token="test_token")
-        notification = baker.make(Notification, device=device, image=None)
-        notifications = [notification] * 8
-        mock_send.side_effect = 3 * [Exception("test error")] + 5 * [
-            "foobar-notification"
+        self.assertEqual(mock_send_each.call_count, 3)
+        sent_tokens = [
+            message.token
+            for call in mock_send_each.call_args_list
+            for message in call.args[0]
         ]
+        self.assertCountEqual(
+            sent_tokens, [n.device.firebase_token for n in notifications]
+        )
+
+    @override_settings(FIREBASE_BATCH_SIZE=5, FIREBASE_SEND_EACH_SIZE=2)
+    @patch("firebase_admin.messaging.send_each", side_effect=mock_batch_response)
+    def test_push_limits_messages_per_send_each(self, mock_send_each):
+        notifications = self.make_notifications(8)
+
+        self.push_service.push(notifications)
+
+        self.assertCountEqual(
+            [len(call.args[0]) for call in mock_send_each.call_args_list],
+            [2, 2, 1, 2, 1],
+        )
+
+    @override_settings(FIREBASE_BATCH_SIZE=3)
+    @patch("firebase_admin.messaging.send_each")
+    def test_push_failed_tokens(self, mock_send_each):
+        notifications = self.make_notifications(8)
+        failed_tokens = {n.device.firebase_token for n in notifications[2:5]}
+        mock_send_each.side_effect = lambda messages: mock_batch_response(
+            messages, failed_tokens
+        )
 
         failed_token_count = self.push_service.push(notifications)
 
-        self.assertEqual(mock_send.call_count, 8)
+        self.assertEqual(mock_send_each.call_count, 3)
         self.assertEqual(failed_token_count, 3)
+
+    @override_settings(FIREBASE_BATCH_SIZE=3)
+    @patch("firebase_admin.messaging.send_each")
+    def test_push_failed_batch(self, mock_send_each):
+        notifications = self.make_notifications(8)
+        failing_token = notifications[0].device.firebase_token
+
+        def send_each_side_effect(messages):
+            if any(message.token == failing_token for message in messages):
+                raise Exception("test error")
+            return mock_batch_response(messages)
+
+        mock_send_each.side_effect = send_each_side_effect
+
+        failed_token_count = self.push_service.push(notifications)
+
+        self.assertEqual(failed_token_count, 3)
+
+    @patch("notification.services.push.ImageSetResolver")
+    @patch("firebase_admin.messaging.send_each", side_effect=mock_batch_response)
+    def test_push_shares_payload(self, mock_send_each, mock_image_resolver):
+        mock_image_resolver.return_value.get.return_value = {
+            "variants": [
+                {"image": "https://image.url/small"},
+                {"image": "https://image.url/medium"},
+                {"image": "https://image.url/large"},
+            ]
+        }
+        notifications = self.make_notifications(4)
+        for notification in notifications:
+            notification.image = 1
+
+        PushService().push(notifications)
+
+        mock_image_resolver.return_value.prefetch.assert_called_once_with({1})
+        mock_image_resolver.return_value.get.assert_called_once_with(1)
+        messages = mock_send_each.call_args.args[0]
+        self.assertEqual(
+            messages[0].android.notification.image, "https://image.url/medium"
+        )
+        self.assertEqual(len({id(m.notification) for m in messages}), 1)
+        self.assertEqual(len({m.data["notificationId"] for m in messages}), 4)
+
+    @patch("firebase_admin.messaging.send_each")
+    def test_push_removes_dead_tokens(self, mock_send_each):
+        notifications = self.make_notifications(6)
+        unregistered = notifications[0].device.firebase_token
+        sender_mismatch = notifications[1].device.firebase_token
+        unavailable = notifications[2].device.firebase_token
+
+        def send_each_side_effect(messages):
+            errors = {
+                unregistered: messaging.UnregisteredError("unregistered"),
+                sender_mismatch: messaging.SenderIdMismatchError("mismatch"),
+                unavailable: exceptions.UnavailableError("unavailable"),
+            }
+            return messaging.BatchResponse(
+                [
+                    messaging.SendResponse(None, errors[message.token])
+                    if message.token in errors
+                    else messaging.SendResponse({"name": "message-id"}, None)
+                    for message in messages
+                ]
+            )
+
+        mock_send_each.side_effect = send_each_side_effect
+
+        failed_token_count = self.push_service.push(notifications)
+
+        self.assertEqual(failed_token_count, 3)
+        self.assertEqual(self.push_service.removed_token_count, 2)
+        self.assertFalse(Device.objects.filter(firebase_token=unregistered).exists())
+        self.assertFalse(Device.objects.filter(firebase_token=sender_mismatch).exists())
+        self.assertTrue(Device.objects.filter(firebase_token=unavailable).exists())
+
+    @patch("firebase_admin.messaging.send_each")
+    def test_push_removes_invalid_argument_tokens(self, mock_send_each):
+        notifications = self.make_notifications(3)
+        invalid_token = notifications[0].device.firebase_token
+        mock_send_each.side_effect = lambda messages: mock_batch_response(
+            messages,
+            failed_tokens={invalid_token},
+            error=exceptions.InvalidArgumentError("invalid token"),
+        )
+
+        self.push_service.push(notifications)
+
+        self.assertEqual(self.push_service.removed_token_count, 1)
+        self.assertFalse(Device.objects.filter(firebase_token=invalid_token).exists())
+
+    @patch("firebase_admin.messaging.send_each")
+    def test_push_keeps_tokens_on_rejected_payload(self, mock_send_each):
+        notifications = self.make_notifications(3)
+        tokens = {n.device.firebase_token for n in notifications}
+        mock_send_each.side_effect = lambda messages: mock_batch_response(
+            messages,
+            failed_tokens=tokens,
+            error=exceptions.InvalidArgumentError("invalid payload"),
+        )
+
+        failed_token_count = self.push_service.push(notifications)
+
+        self.assertEqual(failed_token_count, 3)
+        self.assertEqual(self.push_service.removed_token_count, 0)
+        self.assertEqual(Device.objects.filter(firebase_token__in=tokens).count(), 3)
+
+    @patch("firebase_admin.messaging.send_each")
+    def test_push_removes_invalid_registration_token_of_single_device(
+        self, mock_send_each
+    ):
+        notifications = self.make_notifications(1)
+        invalid_token = notifications[0].device.firebase_token
+        mock_send_each.side_effect = lambda messages: mock_batch_response(
+            messages,
+            failed_tokens={invalid_token},
+            error=exceptions.InvalidArgumentError(
+                "The registration token is not a valid FCM registration token"
+            ),
+        )
+
+        self.push_service.push(notifications)
+
+        self.assertEqual(self.push_service.removed_token_count, 1)
+        self.assertFalse(Device.objects.filter(firebase_token=invalid_token).exists())
+
+    @patch("firebase_admin.messaging.send_each")
+    def test_push_keeps_token_of_single_device_on_rejected_payload(
+        self, mock_send_each
+    ):
+        notifications = self.make_notifications(1)
+        token = notifications[0].device.firebase_token
+        mock_send_each.side_effect = lambda messages: mock_batch_response(
+            messages,
+            failed_tokens={token},
+            error=exceptions.InvalidArgumentError("invalid payload"),
+        )
+
+        self.push_service.push(notifications)
+
+        self.assertEqual(self.push_service.removed_token_count, 0)
+        self.assertTrue(Device.objects.filter(firebase_token=token).exists())
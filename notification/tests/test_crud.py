@@ -1,16 +1,22 @@
 import logging
 from unittest.mock import patch
 
+from django.core.cache import cache
 from django.test import TestCase, override_settings
 from firebase_admin import messaging
 from model_bakery import baker
 
-from notification.crud import NotificationCRUD
+from notification.crud import DeviceRow, NotificationCRUD
 from notification.models.notification_models import (
     Device,
     Notification,
     NotificationPushModuleDisabled,
     NotificationPushTypeDisabled,
+    ScheduledNotification,
+)
+from notification.services.unread_count import (
+    get_unread_count_key,
+    reset_unread_count,
 )
 from notification.utils.patch_utils import apply_init_firebase_patches
 
@@ -61,10 +67,23 @@ class TestNotificationCRUD(TestCase):
             messages.append(firebase_message)
         return messages
 
-    @patch("notification.services.push.messaging.send")
+    def mock_send_each(self, messages, failed_token=None):
+        responses = []
+        for message in messages:
+            if message.token == failed_token:
+                responses.append(
+                    messaging.SendResponse(None, Exception("Simulated failure"))
+                )
+            else:
+                responses.append(
+                    messaging.SendResponse({"name": "mock_message_id"}, None)
+                )
+        return messaging.BatchResponse(responses)
+
+    @patch("notification.services.push.messaging.send_each")
     def test_push_success(self, send_firebase_mock):
         device = baker.make(Device, firebase_token="abc_token")
-        send_firebase_mock.return_value = "mock_message_id"
+        send_firebase_mock.side_effect = self.mock_send_each
 
         notification_crud = NotificationCRUD(self.notification)
         notification_crud.create(Device.objects.all())
@@ -75,25 +94,28 @@ class TestNotificationCRUD(TestCase):
         self.assertIsNotNone(notification.pushed_at)
         self.assertEqual(notification.device_external_id, device.external_id)
 
-    @patch("notification.services.push.messaging.send")
+    @patch("notification.services.push.messaging.send_each")
     def test_push_notification_ids_are_unique(self, send_firebase_mock):
         devices = self.create_devices(3, with_token=True)
-        send_firebase_mock.return_value = "mock_message_id"
+        send_firebase_mock.side_effect = self.mock_send_each
 
         notification_crud = NotificationCRUD(self.notification)
         notification_crud.create(Device.objects.all())
 
         sent_notification_ids = []
         for call in send_firebase_mock.call_args_list:
-            msg = call.args[0]  # The first positional argument to messaging.send
-            sent_notification_ids.append(msg.data.get("notificationId"))
+            messages = call.args[
+                0
+            ]  # The first positional argument to messaging.send_each
+            for msg in messages:
+                sent_notification_ids.append(msg.data.get("notificationId"))
 
         # One push message per device with token
         self.assertEqual(len(sent_notification_ids), len(devices))
         self.assertTrue(all(sent_notification_ids))
         self.assertEqual(len(set(sent_notification_ids)), len(sent_notification_ids))
 
-    @patch("notification.services.push.messaging.send")
+    @patch("notification.services.push.messaging.send_each")
     def test_push_missing_token(self, _):
         device = baker.make(Device)
         notification_crud = NotificationCRUD(self.notification)
@@ -106,7 +128,7 @@ class TestNotificationCRUD(TestCase):
         self.assertIsNone(notification.pushed_at)
         self.assertEqual(notification.device_external_id, device.external_id)
 
-    @patch("notification.services.push.messaging.send")
+    @patch("notification.services.push.messaging.send_each")
     def test_push_disabled(self, _):
         device = baker.make(Device, firebase_token="abc_token")
         notification_crud = NotificationCRUD(self.notification, push_enabled=False)
@@ -119,19 +141,22 @@ class TestNotificationCRUD(TestCase):
         self.assertIsNone(notification.pushed_at)
         self.assertEqual(notification.device_external_id, device.external_id)
 
-    @patch("notification.services.push.messaging.send")
+    @patch("notification.services.push.messaging.send_each")
     def test_push_with_some_failed_tokens(self, send_firebase_mock):
         device_count = 5
         self.create_devices(device_count)
 
-        # Simulate failures for the first calls
-        send_firebase_mock.side_effect = [
-            Exception("Simulated failure"),
-            Exception("Simulated failure"),
-            "mock_message_id",
-            "mock_message_id",
-            "mock_message_id",
-        ]
+        # Simulate failures for the first messages
+        send_firebase_mock.side_effect = lambda messages: messaging.BatchResponse(
+            [
+                messaging.SendResponse(None, Exception("Simulated failure")),
+                messaging.SendResponse(None, Exception("Simulated failure")),
+            ]
+            + [
+                messaging.SendResponse({"name": "mock_message_id"}, None)
+                for _ in messages[2:]
+            ]
+        )
         notification_crud = NotificationCRUD(self.notification)
 
         logger = logging.getLogger("notification.services.push")
@@ -193,6 +218,7 @@ class TestNotificationCRUD(TestCase):
                 "total_token_count": 0,
                 "total_enabled_count": 0,
                 "failed_token_count": 0,
+                "removed_token_count": 0,
             },
         )
 
@@ -214,6 +240,7 @@ class TestNotificationCRUD(TestCase):
                 "total_token_count": 1,
                 "total_enabled_count": 0,
                 "failed_token_count": 0,
+                "removed_token_count": 0,
             },
         )
 
@@ -237,10 +264,11 @@ class TestNotificationCRUD(TestCase):
                 "total_token_count": 1,
                 "total_enabled_count": 0,
                 "failed_token_count": 0,
+                "removed_token_count": 0,
             },
         )
 
-    @patch("notification.services.push.messaging.send")
+    @patch("notification.services.push.messaging.send_each")
     def test_response_data_counts_for_devices(self, send_firebase_mock):
         devices_with_token = self.create_devices(3, with_token=True)
         devices_without_token = self.create_devices(
@@ -249,12 +277,9 @@ class TestNotificationCRUD(TestCase):
         known_devices = devices_with_token + devices_without_token
 
         # Simulate failures for devices with token
-        def send_side_effect(msg):
-            if msg.token == devices_with_token[0].firebase_token:
-                raise Exception("Simulated failure")
-            return "mock_message_id"
-
-        send_firebase_mock.side_effect = send_side_effect
+        send_firebase_mock.side_effect = lambda messages: self.mock_send_each(
+            messages, failed_token=devices_with_token[0].firebase_token
+        )
 
         baker.make(
             NotificationPushTypeDisabled,
@@ -283,6 +308,7 @@ class TestNotificationCRUD(TestCase):
                 "total_token_count": len(devices_with_token),
                 "total_enabled_count": len(devices_with_token) - 1,
                 "failed_token_count": 2,
+                "removed_token_count": 0,
             },
         )
 
@@ -290,10 +316,11 @@ class TestNotificationCRUD(TestCase):
         device = baker.make(Device, firebase_token="abc_token")
         notification_crud = NotificationCRUD(self.notification)
 
-        device_list = notification_crud._collect_and_annotate_devices(
-            Device.objects.all()
-        )
-        notifications_with_push = notification_crud._create_notifications(device_list)
+        device_rows = [
+            DeviceRow(*row)
+            for row in notification_crud.device_rows_queryset(Device.objects.all())
+        ]
+        notifications_with_push = notification_crud._create_notifications(device_rows)
 
         self.assertEqual(len(notifications_with_push), 1)
         self.assertEqual(
@@ -311,10 +338,11 @@ class TestNotificationCRUD(TestCase):
             self.notification.notification_type
         ]
 
-        device_list = notification_crud._collect_and_annotate_devices(
-            Device.objects.all()
-        )
-        notifications_with_push = notification_crud._create_notifications(device_list)
+        device_rows = [
+            DeviceRow(*row)
+            for row in notification_crud.device_rows_queryset(Device.objects.all())
+        ]
+        notifications_with_push = notification_crud._create_notifications(device_rows)
 
         self.assertEqual(len(notifications_with_push), 1)
         self.assertEqual(
@@ -325,3 +353,103 @@ class TestNotificationCRUD(TestCase):
         )
         self.assertEqual(notifications.count(), 1)
         self.assertFalse(notifications[0].is_visible)
+
+    @override_settings(NOTIFICATION_COPY_THRESHOLD=1)
+    @patch("notification.services.push.messaging.send_each")
+    def test_create_notifications_with_copy(self, send_firebase_mock):
+        send_firebase_mock.side_effect = self.mock_send_each
+        devices_with_token = self.create_devices(3, with_token=True)
+        devices_without_token = self.create_devices(2, with_token=False, start_id=3)
+        self.notification.context = {"type": "foobar-type", "text": "tab\tline\n"}
+
+        notification_crud = NotificationCRUD(self.notification)
+        notification_crud.create(Device.objects.all())
+
+        self.assertEqual(Notification.objects.count(), 5)
+        for device in devices_with_token + devices_without_token:
+            notification = Notification.objects.get(device=device)
+            self.assertEqual(notification.device_external_id, device.external_id)
+            self.assertEqual(notification.title, self.notification.title)
+            self.assertEqual(notification.context, self.notification.context)
+            self.assertEqual(
+                notification.pushed_at is not None, device in devices_with_token
+            )
+        sent_notification_ids = {
+            message.data["notificationId"]
+            for message in send_firebase_mock.call_args.args[0]
+        }
+        self.assertEqual(
+            sent_notification_ids,
+            {
+                str(notification_id)
+                for notification_id in Notification.objects.filter(
+                    pushed_at__isnull=False
+                ).values_list("id", flat=True)
+            },
+        )
+
+    @override_settings(NOTIFICATION_COPY_THRESHOLD=1_000_000)
+    @patch("notification.crud.increment_unread_counts")
+    @patch("notification.crud.Notification.objects.bulk_create")
+    def test_create_notifications_in_bulk(self, bulk_create_mock, _):
+        """One bulk_create per push group, without a query per device"""
+        bulk_create_mock.side_effect = lambda notifications: notifications
+        notification_crud = NotificationCRUD(self.notification)
+        device_rows = [
+            DeviceRow(i + 1, f"abc_{i}", "t", push_allowed=i % 2 == 0)
+            for i in range(10_000)
+        ]
+
+        with self.assertNumQueries(0):
+            notifications_with_push = notification_crud._create_notifications(
+                device_rows
+            )
+
+        self.assertEqual(len(notifications_with_push), 5_000)
+        self.assertEqual(
+            [len(call.args[0]) for call in bulk_create_mock.call_args_list],
+            [5_000, 5_000],
+        )
+
+    def test_device_rows_queryset_through_relation(self):
+        scheduled_notification = baker.make(ScheduledNotification)
+        devices = baker.make(Device, firebase_token="abc_token", _quantity=2)
+        device_without_token = baker.make(Device, firebase_token=None)
+        scheduled_notification.devices.add(*devices, device_without_token)
+        baker.make(
+            NotificationPushModuleDisabled,
+            device=devices[1],
+            module_slug=self.notification.module_slug,
+        )
+        notification_crud = NotificationCRUD(self.notification)
+
+        Through = ScheduledNotification.devices.through
+        device_rows = notification_crud.device_rows_queryset(
+            Through.objects.filter(schedulednotification=scheduled_notification),
+            device_prefix="device__",
+        ).order_by("device_id")
+
+        self.assertEqual(
+            list(device_rows),
+            [
+                (devices[0].id, devices[0].external_id, "abc_token", True),
+                (devices[1].id, devices[1].external_id, "abc_token", False),
+                (
+                    device_without_token.id,
+                    device_without_token.external_id,
+                    None,
+                    False,
+                ),
+            ],
+        )
+
+    def test_create_increments_existing_unread_counts(self):
+        cache.clear()
+        devices = self.create_devices(2, with_token=False)
+        reset_unread_count(devices[0].external_id)
+
+        NotificationCRUD(self.notification).create(Device.objects.all())
+
+        self.assertEqual(cache.get(get_unread_count_key(devices[0].external_id)), 1)
+        # Missing counters are not created, they are rebuilt when requested
+        self.assertIsNone(cache.get(get_unread_count_key(devices[1].external_id)))
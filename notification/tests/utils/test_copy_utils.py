@@ -0,0 +1,24 @@
+from django.test import SimpleTestCase
+
+from notification.utils.copy_utils import escape_copy_value
+
+
+class TestEscapeCopyValue(SimpleTestCase):
+    def test_null(self):
+        self.assertEqual(escape_copy_value(None), r"\N")
+
+    def test_bool(self):
+        self.assertEqual(escape_copy_value(True), "t")
+        self.assertEqual(escape_copy_value(False), "f")
+
+    def test_special_characters(self):
+        self.assertEqual(
+            escape_copy_value("back\\slash\ttab\nnew\rreturn"),
+            "back\\\\slash\\ttab\\nnew\\rreturn",
+        )
+
+    def test_dict_is_serialized_as_json(self):
+        self.assertEqual(
+            escape_copy_value({"type": "a\tb"}),
+            '{"type": "a\\\\tb"}',
+        )
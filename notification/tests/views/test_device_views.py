@@ -26,6 +26,7 @@ from notification.models.notification_models import (
     ScheduledNotification,
 )
 from notification.models.waste_guide_models import WasteDevice
+from notification.services.device_registration import pop_buffered_last_seen
 
 
 @freezegun.freeze_time("2026-02-25T12:00:00Z")
@@ -87,6 +88,53 @@ class TestDeviceRegisterView(AuthenticatedAPITestCase):
         self.assertEqual(response.data["os"], new_data["os"])
         self.assertEqual(parse_datetime(response.data["last_seen"]), timezone.now())
 
+    def test_unchanged_registration_is_not_written(self):
+        """Test that an unchanged registration only buffers last_seen"""
+        data = {"firebase_token": "foobar_token", "os": "ios"}
+        self.client.post(self.url, data, headers=self.headers_with_device_id)
+        first_last_seen = Device.objects.get(external_id=self.device_id).last_seen
+
+        with freezegun.freeze_time("2026-02-26T12:00:00Z"):
+            with patch(
+                "notification.views.device_views.Device.objects.update_or_create"
+            ) as mock_update_or_create:
+                response = self.client.post(
+                    self.url, data, headers=self.headers_with_device_id
+                )
+            mock_update_or_create.assert_not_called()
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertEqual(parse_datetime(response.data["last_seen"]), timezone.now())
+            self.assertEqual(pop_buffered_last_seen(), {self.device_id: timezone.now()})
+
+        device = Device.objects.get(external_id=self.device_id)
+        self.assertEqual(device.last_seen, first_last_seen)
+
+    def test_changed_registration_is_written(self):
+        """Test that a new token is written even when the device registered before"""
+        self.client.post(
+            self.url,
+            {"firebase_token": "foobar_token", "os": "ios"},
+            headers=self.headers_with_device_id,
+        )
+        response = self.client.post(
+            self.url,
+            {"firebase_token": "foobar_token2", "os": "ios"},
+            headers=self.headers_with_device_id,
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        device = Device.objects.get(external_id=self.device_id)
+        self.assertEqual(device.firebase_token, "foobar_token2")
+
+    def test_register_after_delete_registration(self):
+        """Test that registering again after unregistering restores the token"""
+        data = {"firebase_token": "foobar_token", "os": "ios"}
+        self.client.post(self.url, data, headers=self.headers_with_device_id)
+        self.client.delete(self.url, headers=self.headers_with_device_id)
+
+        self.client.post(self.url, data, headers=self.headers_with_device_id)
+        device = Device.objects.get(external_id=self.device_id)
+        self.assertEqual(device.firebase_token, data["firebase_token"])
+
     def test_delete_registration(self):
         """Test removing a device registration"""
         device_id = "foobar_device"
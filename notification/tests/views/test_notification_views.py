@@ -1,3 +1,5 @@
+import base64
+import uuid
 from datetime import timedelta
 from unittest.mock import patch
 
@@ -9,7 +11,12 @@ from rest_framework import status
 from rest_framework.test import APIClient
 
 from core.tests.test_authentication import BasicAPITestCase
-from notification.models.notification_models import Device, Notification
+from notification.models.notification_models import (
+    BroadcastNotification,
+    BroadcastNotificationRead,
+    Device,
+    Notification,
+)
 
 
 class BaseNotificationViewTestCase(BasicAPITestCase):
@@ -23,11 +30,11 @@ class BaseNotificationViewTestCase(BasicAPITestCase):
 class BaseNotificationViewGetTestCase(BaseNotificationViewTestCase):
     def setUp(self):
         super().setUp()
-        self.image_set_service_patcher = patch(
-            "notification.serializers.notification_serializers.ImageSetService"
+        self.image_resolver_patcher = patch(
+            "notification.serializers.notification_serializers.ImageSetResolver"
         )
-        self.mock_image_set_service = self.image_set_service_patcher.start()
-        self.mock_image_set_service.return_value.json.return_value = {
+        self.mock_image_resolver = self.image_resolver_patcher.start()
+        self.mock_image_resolver.return_value.get.return_value = {
             "id": "123",
             "variants": [
                 {"image": "https://example.com/image.jpg", "width": 100, "height": 100}
@@ -36,7 +43,7 @@ class BaseNotificationViewGetTestCase(BaseNotificationViewTestCase):
 
     def tearDown(self):
         super().tearDown()
-        self.image_set_service_patcher.stop()
+        self.image_resolver_patcher.stop()
 
 
 class NotificationListViewTests(BaseNotificationViewGetTestCase):
@@ -122,11 +129,11 @@ class NotificationListViewTests(BaseNotificationViewGetTestCase):
             "ProjectWarningCreatedByProjectManager",
         )
 
-    @patch("notification.serializers.notification_serializers.ImageSetService")
-    def test_list_notifications_with_and_without_image(self, mock_image_set_service):
+    @patch("notification.serializers.notification_serializers.ImageSetResolver")
+    def test_list_notifications_with_and_without_image(self, mock_image_resolver):
         image_id = 123
-        mock_service_instance = mock_image_set_service.return_value
-        mock_service_instance.get.return_value = {
+        mock_resolver_instance = mock_image_resolver.return_value
+        mock_resolver_instance.get.return_value = {
             "id": image_id,
             "variants": [
                 {"image": "https://example.com/image.jpg", "width": 100, "height": 100}
@@ -153,6 +160,9 @@ class NotificationListViewTests(BaseNotificationViewGetTestCase):
             else:
                 self.assertIsNone(notification["image"])
 
+        # Images are resolved once for the whole list
+        mock_resolver_instance.prefetch.assert_called_once()
+
     def test_list_notifications_missing_device_id(self):
         response = self.client.get(self.url, headers=self.api_headers)
         self.assertContains(
@@ -200,6 +210,113 @@ class NotificationListViewTests(BaseNotificationViewGetTestCase):
             len(response.data), 1
         )  # Only notifications with is_visible=True should be returned
 
+    def test_list_notifications_with_broadcasts(self):
+        device_1 = baker.make(
+            Device,
+            external_id=self.device_id,
+            created_at=timezone.now() - timedelta(days=10),
+        )
+        notification = baker.make(
+            Notification,
+            device=device_1,
+            created_at=timezone.now() - timedelta(days=2),
+        )
+        read_broadcast = baker.make(
+            BroadcastNotification, created_at=timezone.now() - timedelta(days=3)
+        )
+        unread_broadcast = baker.make(
+            BroadcastNotification, created_at=timezone.now() - timedelta(days=1)
+        )
+        baker.make(BroadcastNotification, is_visible=False)
+        baker.make(BroadcastNotificationRead, broadcast=read_broadcast, device=device_1)
+        baker.make(
+            BroadcastNotificationRead,
+            broadcast=unread_broadcast,
+            device=baker.make(Device),
+        )
+
+        response = self.client.get(self.url, headers=self.headers_with_device_id)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [(n["id"], n["is_read"]) for n in response.data],
+            [
+                (str(unread_broadcast.id), False),
+                (str(notification.id), notification.is_read),
+                (str(read_broadcast.id), True),
+            ],
+        )
+
+    def test_list_notifications_broadcasts_before_registration(self):
+        registered_at = timezone.now() - timedelta(days=2)
+        baker.make(Device, external_id=self.device_id, created_at=registered_at)
+        baker.make(BroadcastNotification, created_at=registered_at - timedelta(days=1))
+        broadcast = baker.make(
+            BroadcastNotification, created_at=registered_at + timedelta(days=1)
+        )
+
+        response = self.client.get(self.url, headers=self.headers_with_device_id)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([n["id"] for n in response.data], [str(broadcast.id)])
+
+    def test_list_notifications_keyset_pagination(self):
+        device_1 = baker.make(
+            Device,
+            external_id=self.device_id,
+            created_at=timezone.now() - timedelta(days=10),
+        )
+        created_at = timezone.now()
+        notifications = [
+            baker.make(
+                Notification,
+                device=device_1,
+                created_at=created_at - timedelta(days=i // 2),
+            )
+            for i in range(4)
+        ]
+        broadcast = baker.make(
+            BroadcastNotification, created_at=created_at - timedelta(days=5)
+        )
+        expected_ids = [
+            str(n.id)
+            for n in sorted(
+                notifications, key=lambda n: (n.created_at, str(n.id)), reverse=True
+            )
+        ] + [str(broadcast.id)]
+
+        ids, url = [], f"{self.url}?page_size=2"
+        while url:
+            response = self.client.get(url, headers=self.headers_with_device_id)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertNotIn("totalElements", response.data["page"])
+            ids += [n["id"] for n in response.data["result"]]
+            url = response.data["_links"].get("next", {}).get("href")
+
+        self.assertEqual(ids, expected_ids)
+
+    def test_list_notifications_invalid_cursor(self):
+        response = self.client.get(
+            f"{self.url}?cursor=invalid", headers=self.headers_with_device_id
+        )
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_list_notifications_malformed_cursor(self):
+        for position in [
+            "2024-13-45T00:00:00|" + str(uuid.uuid4()),
+            "2024-01-01T00:00:00|1",
+        ]:
+            cursor = base64.urlsafe_b64encode(position.encode()).decode()
+            response = self.client.get(
+                f"{self.url}?cursor={cursor}", headers=self.headers_with_device_id
+            )
+            self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_list_notifications_broadcasts_unknown_device(self):
+        baker.make(BroadcastNotification)
+
+        response = self.client.get(self.url, headers=self.headers_with_device_id)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data), 0)
+
 
 class NotificationReadViewTests(BaseNotificationViewTestCase):
     def setUp(self):
@@ -274,6 +391,129 @@ class NotificationReadViewTests(BaseNotificationViewTestCase):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertIn("1 notifications marked as read.", response.data["detail"])
 
+    def test_mark_all_as_read_broadcasts(self):
+        baker.make(Notification, device=self.test_device, is_read=False)
+        read_broadcast = baker.make(BroadcastNotification)
+        baker.make(BroadcastNotification, _quantity=2)
+        baker.make(BroadcastNotification, is_visible=False)
+        baker.make(
+            BroadcastNotificationRead, broadcast=read_broadcast, device=self.test_device
+        )
+
+        response = self.client.post(self.url, headers=self.headers_with_device_id)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn("3 notifications marked as read.", response.data["detail"])
+        self.assertEqual(
+            BroadcastNotificationRead.objects.filter(device=self.test_device).count(),
+            3,
+        )
+
+    def test_mark_all_as_read_ignores_broadcasts_before_registration(self):
+        self.test_device.refresh_from_db()
+        baker.make(
+            BroadcastNotification,
+            created_at=self.test_device.created_at - timedelta(days=1),
+        )
+
+        response = self.client.post(self.url, headers=self.headers_with_device_id)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertFalse(
+            BroadcastNotificationRead.objects.filter(device=self.test_device).exists()
+        )
+
+
+class NotificationUnreadCountViewTests(BaseNotificationViewTestCase):
+    def setUp(self):
+        super().setUp()
+        self.test_device = baker.make(Device, external_id=self.device_id)
+        self.url = reverse("notification-unread-count")
+
+    def get_unread_count(self):
+        response = self.client.get(self.url, headers=self.headers_with_device_id)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.data["unread_count"]
+
+    def test_unread_count(self):
+        baker.make(Notification, device=self.test_device, is_read=False, _quantity=3)
+        baker.make(Notification, device=self.test_device, is_read=True)
+        baker.make(
+            Notification, device=self.test_device, is_read=False, is_visible=False
+        )
+        baker.make(Notification, device=baker.make(Device), is_read=False)
+        baker.make(BroadcastNotification)
+
+        self.assertEqual(self.get_unread_count(), 4)
+
+    def test_unread_count_ignores_broadcasts_before_registration(self):
+        self.test_device.refresh_from_db()
+        baker.make(
+            BroadcastNotification,
+            created_at=self.test_device.created_at - timedelta(days=1),
+        )
+        baker.make(BroadcastNotification)
+
+        self.assertEqual(self.get_unread_count(), 1)
+
+    def test_unread_count_is_cached(self):
+        baker.make(Notification, device=self.test_device, is_read=False)
+        self.assertEqual(self.get_unread_count(), 1)
+
+        # Notifications are counted by NotificationCRUD, not by a direct insert
+        baker.make(Notification, device=self.test_device, is_read=False)
+        self.assertEqual(self.get_unread_count(), 1)
+
+    @patch("notification.services.unread_count.cache.set")
+    def test_unread_count_cache_unavailable(self, mock_cache_set):
+        mock_cache_set.side_effect = ConnectionError("Redis is down")
+        baker.make(Notification, device=self.test_device, is_read=False)
+
+        with self.assertLogs("notification.services.unread_count", level="WARNING"):
+            self.assertEqual(self.get_unread_count(), 1)
+
+    def test_unread_count_after_mark_all_read(self):
+        baker.make(Notification, device=self.test_device, is_read=False, _quantity=2)
+        self.assertEqual(self.get_unread_count(), 2)
+
+        self.client.post(
+            reverse("notification-read-notifications"),
+            headers=self.headers_with_device_id,
+        )
+
+        self.assertEqual(self.get_unread_count(), 0)
+
+    def test_unread_count_after_patch(self):
+        notification = baker.make(Notification, device=self.test_device, is_read=False)
+        baker.make(Notification, device=self.test_device, is_read=False)
+        self.assertEqual(self.get_unread_count(), 2)
+        url = reverse(
+            "notification-detail-notification",
+            kwargs={"notification_id": notification.id},
+        )
+
+        self.client.patch(
+            url,
+            data={"is_read": True},
+            format="json",
+            headers=self.headers_with_device_id,
+        )
+        self.assertEqual(self.get_unread_count(), 1)
+
+        self.client.patch(
+            url,
+            data={"is_read": False},
+            format="json",
+            headers=self.headers_with_device_id,
+        )
+        self.assertEqual(self.get_unread_count(), 2)
+
+    def test_unread_count_missing_device_id(self):
+        response = self.client.get(self.url, headers=self.api_headers)
+        self.assertContains(
+            response,
+            "Missing header: DeviceId",
+            status_code=status.HTTP_400_BAD_REQUEST,
+        )
+
 
 class NotificationDetailViewTests(BaseNotificationViewGetTestCase):
     def setUp(self):
@@ -378,3 +618,45 @@ class NotificationDetailViewTests(BaseNotificationViewGetTestCase):
         self.assertEqual(
             self.notification.is_read, False
         )  # Status should not be updated since notification is invisible
+
+    def test_get_broadcast_detail(self):
+        broadcast = baker.make(BroadcastNotification)
+        url = reverse(
+            "notification-detail-notification",
+            kwargs={"notification_id": broadcast.id},
+        )
+
+        response = self.client.get(url, headers=self.headers_with_device_id)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["id"], str(broadcast.id))
+        self.assertFalse(response.data["is_read"])
+
+    def test_update_broadcast_status(self):
+        broadcast = baker.make(BroadcastNotification)
+        url = reverse(
+            "notification-detail-notification",
+            kwargs={"notification_id": broadcast.id},
+        )
+
+        response = self.client.patch(
+            url,
+            data={"is_read": True},
+            format="json",
+            headers=self.headers_with_device_id,
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.data["is_read"])
+        self.assertTrue(
+            BroadcastNotificationRead.objects.filter(
+                broadcast=broadcast, device__external_id=self.device_id
+            ).exists()
+        )
+
+        response = self.client.patch(
+            url,
+            data={"is_read": False},
+            format="json",
+            headers=self.headers_with_device_id,
+        )
+        self.assertFalse(response.data["is_read"])
+        self.assertFalse(BroadcastNotificationRead.objects.exists())
@@ -70,6 +70,11 @@ urlpatterns = [
         notification_views.NotificationMarkAllReadView.as_view(),
         name="notification-read-notifications",
     ),
+    path(
+        BASE_PATH + "/notifications/unread_count",
+        notification_views.NotificationUnreadCountView.as_view(),
+        name="notification-unread-count",
+    ),
     path(
         BASE_PATH + "/modules",
         notification_views.NotificationModulesView.as_view(),
@@ -0,0 +1,96 @@
+import io
+import json
+import uuid
+from collections.abc import Iterable
+
+from django.db import connections, router
+
+from notification.models.notification_models import Notification
+
+# Columns that differ per device, written for every row
+ROW_COLUMNS = ["id", "device_id", "device_external_id", "pushed_at", "is_read"]
+# Columns that are equal for all notifications created from the same source notification
+SHARED_COLUMNS = [
+    "title",
+    "body",
+    "module_slug",
+    "context",
+    "notification_type",
+    "image",
+    "created_at",
+    "is_visible",
+]
+COPY_BATCH_SIZE = 10000
+COPY_NULL = r"\N"
+
+
+def escape_copy_value(value) -> str:
+    """Format a value for the PostgreSQL COPY text format"""
+    if value is None:
+        return COPY_NULL
+    if isinstance(value, bool):
+        return "t" if value else "f"
+    if isinstance(value, dict):
+        value = json.dumps(value)
+    return (
+        str(value)
+        .replace("\\", "\\\\")
+        .replace("\t", "\\t")
+        .replace("\n", "\\n")
+        .replace("\r", "\\r")
+    )
+
+
+def copy_notifications(
+    source_notification: Notification, notifications: Iterable[Notification]
+) -> list[Notification]:
+    """
+    Insert notifications with COPY FROM STDIN instead of INSERT statements.
+
+    All notifications must be copies of the source notification. Its shared columns,
+    including the context, are serialized once and appended to every row.
+    Notifications without a primary key get a new UUID, like bulk_create would.
+
+    Args:
+        source_notification (Notification): notification the rows were copied from
+        notifications (Iterable[Notification]): notifications with device and pushed_at set
+
+    Returns:
+        list[Notification]: the inserted notifications
+    """
+    shared_values = "\t".join(
+        escape_copy_value(getattr(source_notification, column))
+        for column in SHARED_COLUMNS
+    )
+    sql = "COPY {table} ({columns}) FROM STDIN".format(
+        table=Notification._meta.db_table,
+        columns=", ".join(ROW_COLUMNS + SHARED_COLUMNS),
+    )
+
+    inserted, buffer = [], io.StringIO()
+    db_connection = connections[router.db_for_write(Notification)]
+    with db_connection.cursor() as cursor:
+        for notification in notifications:
+            if notification.pk is None:
+                notification.pk = uuid.uuid4()
+            buffer.write(
+                "\t".join(
+                    escape_copy_value(getattr(notification, column))
+                    for column in ROW_COLUMNS
+                )
+            )
+            buffer.write(f"\t{shared_values}\n")
+            inserted.append(notification)
+
+            if len(inserted) % COPY_BATCH_SIZE == 0:
+                _copy_buffer(cursor, sql, buffer)
+                buffer = io.StringIO()
+
+        if buffer.tell():
+            _copy_buffer(cursor, sql, buffer)
+    return inserted
+
+
+def _copy_buffer(cursor, sql: str, buffer: io.StringIO):
+    buffer.seek(0)
+    cursor.copy_expert(sql, buffer)
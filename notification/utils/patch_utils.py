@@ -35,10 +35,11 @@ class MockFirebaseError(Exception):
 
 
 class MockFirebaseSendResponse:
-    """Mock response for the `send` function from the `firebase_admin.messaging` module."""
+    """Mock response for a single message sent with the `firebase_admin.messaging` module."""
 
     def __init__(self, message, success=True):
         self.success = success
+        self.exception = None
 
         log_message = (
             "Mocked outgoing Firebase message!\n"
@@ -56,11 +57,21 @@ class MockFirebaseSendResponse:
         logger.info(log_message)
 
 
+class MockFirebaseBatchResponse:
+    """Mock response for the `send_each` function from the `firebase_admin.messaging` module."""
+
+    def __init__(self, messages, dry_run=False, app=None):
+        self.responses = [MockFirebaseSendResponse(message) for message in messages]
+        self.success_count = len(self.responses)
+        self.failure_count = 0
+
+
 def setup_local_development_patches():  # pragma: no cover
     """Set up patches for local development to mock Firebase interactions."""
     cert_patcher, init_patcher, app_patcher = apply_init_firebase_patches()
     send_patcher = patch(
-        "notification.services.push.messaging.send", new=MockFirebaseSendResponse
+        "notification.services.push.messaging.send_each",
+        new=MockFirebaseBatchResponse,
     )
     send_patcher.start()
 
@@ -1,5 +1,6 @@
 from django.db import transaction
 from django.db.models import Count
+from django.utils import timezone
 from drf_spectacular.utils import OpenApiExample
 from rest_framework import generics, status
 from rest_framework.exceptions import NotFound, ValidationError
@@ -29,6 +30,13 @@ from notification.serializers.notification_config_serializers import (
     NotificationPushTypeDisabledListSerializer,
     NotificationPushTypeDisabledSerializer,
 )
+from notification.services.device_registration import (
+    buffer_last_seen,
+    forget_registrations,
+    get_registered_device_id,
+    get_registration_fingerprint,
+    remember_registration,
+)
 from notification.views.service_device_abstract_view import ServiceDeviceView
 
 
@@ -49,9 +57,26 @@ class DeviceRegisterView(DeviceIdMixin, generics.GenericAPIView):
         """
         serializer = DeviceRegisterRequestSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
-        device, _ = Device.objects.update_or_create(
-            external_id=self.device_id, defaults=serializer.validated_data
+        fingerprint = get_registration_fingerprint(
+            serializer.validated_data["firebase_token"],
+            serializer.validated_data["os"],
         )
+        device_id = get_registered_device_id(self.device_id, fingerprint)
+        if device_id is None:
+            device, _ = Device.objects.update_or_create(
+                external_id=self.device_id, defaults=serializer.validated_data
+            )
+            remember_registration(self.device_id, device.id, fingerprint)
+        else:
+            # Unchanged registration, only last_seen is bumped in bulk later on
+            device = Device(
+                id=device_id,
+                external_id=self.device_id,
+                last_seen=timezone.now(),
+                **serializer.validated_data,
+            )
+            if not buffer_last_seen(self.device_id, device.last_seen):
+                Device.objects.filter(id=device_id).update(last_seen=device.last_seen)
         return Response(
             DeviceRegisterResponseSerializer(device).data, status=status.HTTP_200_OK
         )
@@ -74,6 +99,7 @@ class DeviceRegisterView(DeviceIdMixin, generics.GenericAPIView):
         # Remove the Firebase token
         device.firebase_token = None
         device.save()
+        forget_registrations([self.device_id])
 
         return Response("Registration removed", status=status.HTTP_200_OK)
 
@@ -112,6 +138,7 @@ class DeviceDeleteView(DeviceIdMixin, generics.GenericAPIView):
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR,
             )
 
+        forget_registrations([self.device_id])
         return Response(status=status.HTTP_204_NO_CONTENT)
 
 
@@ -3,20 +3,39 @@ import logging
 from drf_spectacular.utils import inline_serializer
 from rest_framework import generics, status
 from rest_framework.exceptions import ValidationError
-from rest_framework.fields import CharField
+from rest_framework.fields import CharField, IntegerField
 from rest_framework.response import Response
 
 from core.enums import NotificationType
+from core.pagination import KeysetPagination
 from core.utils.openapi_utils import (
     extend_schema_for_device_id,
 )
 from core.views.mixins import DeviceIdMixin
-from notification.models.notification_models import Notification
+from notification.models.notification_models import (
+    BroadcastNotification,
+    Notification,
+)
 from notification.serializers.notification_serializers import (
     ModuleNotificationTypeSerializer,
     NotificationResultSerializer,
     NotificationUpdateSerializer,
 )
+from notification.services.broadcast import (
+    broadcast_to_notification,
+    get_broadcasts,
+    get_internal_device_id,
+    get_notification_history,
+    history_to_notifications,
+    mark_broadcasts_read,
+    set_broadcast_read,
+)
+from notification.services.unread_count import (
+    decrement_unread_count,
+    get_unread_count,
+    increment_unread_counts,
+    reset_unread_count,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -25,15 +44,28 @@ class NotificationListView(DeviceIdMixin, generics.ListAPIView):
     """List all notifications for a device_id."""
 
     serializer_class = NotificationResultSerializer
+    pagination_class = KeysetPagination
 
     def get_queryset(self):
-        return (
-            Notification.objects.select_related("device")
-            .filter(device__external_id=self.device_id)
-            .filter(is_visible=True)
-            .order_by("-created_at")
+        # Broadcasts are stored once for all devices and merged into the history
+        return get_notification_history(
+            Notification.objects.filter(device_external_id=self.device_id).filter(
+                is_visible=True
+            ),
+            device_external_id=self.device_id,
+            keyset_filter=self.paginator.get_keyset_filter(self.request),
         )
 
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            serializer = self.get_serializer(history_to_notifications(page), many=True)
+            return self.get_paginated_response(serializer.data)
+
+        serializer = self.get_serializer(history_to_notifications(queryset), many=True)
+        return Response(serializer.data)
+
     @extend_schema_for_device_id(
         success_response=NotificationResultSerializer,
     )
@@ -58,6 +90,10 @@ class NotificationMarkAllReadView(DeviceIdMixin, generics.UpdateAPIView):
             .filter(device_external_id=self.device_id, is_read=False, is_visible=True)
             .update(is_read=True)
         )
+        device_id = get_internal_device_id(self.device_id)
+        if device_id is not None:
+            updated_count += mark_broadcasts_read(device_id)
+        reset_unread_count(self.device_id)
         return Response({"detail": f"{updated_count} notifications marked as read."})
 
 
@@ -73,6 +109,17 @@ class NotificationDetailView(DeviceIdMixin, generics.RetrieveUpdateAPIView):
             device__external_id=self.device_id
         )
 
+    def get_broadcast(self) -> BroadcastNotification | None:
+        """Broadcast with the requested id, annotated with is_read for the device"""
+        device_id = get_internal_device_id(self.device_id)
+        if device_id is None:
+            return None
+        return (
+            get_broadcasts(device_id)
+            .filter(id=self.kwargs[self.lookup_url_kwarg])
+            .first()
+        )
+
     @extend_schema_for_device_id(
         success_response=NotificationResultSerializer,
         additional_responses={
@@ -81,7 +128,10 @@ class NotificationDetailView(DeviceIdMixin, generics.RetrieveUpdateAPIView):
     )
     def get(self, request, *args, **kwargs):
         """Retrieve a single notification."""
-        instance = self.get_object()
+        broadcast = self.get_broadcast()
+        instance = (
+            broadcast_to_notification(broadcast) if broadcast else self.get_object()
+        )
         if not instance.is_visible:
             return Response(
                 status=status.HTTP_204_NO_CONTENT,
@@ -99,16 +149,60 @@ class NotificationDetailView(DeviceIdMixin, generics.RetrieveUpdateAPIView):
     )
     def patch(self, request, *args, **kwargs):
         """Update a single notification to status "is_read" = true."""
+        broadcast = self.get_broadcast()
+        if broadcast:
+            return self.patch_broadcast(broadcast)
+
         instance = self.get_object()
         if not instance.is_visible:
             return Response(
                 status=status.HTTP_204_NO_CONTENT,
             )
+        was_read = instance.is_read
         serializer = NotificationUpdateSerializer(instance, data=request.data)
         serializer.is_valid(raise_exception=True)
         serializer.save()
+        self.update_unread_count(was_read, instance.is_read)
         return Response(serializer.data)
 
+    def update_unread_count(self, was_read: bool, is_read: bool):
+        if is_read and not was_read:
+            decrement_unread_count(self.device_id)
+        elif was_read and not is_read:
+            increment_unread_counts([self.device_id])
+
+    def patch_broadcast(self, broadcast: BroadcastNotification):
+        """The read status of a broadcast is stored as a read receipt of the device"""
+        if not broadcast.is_visible:
+            return Response(
+                status=status.HTTP_204_NO_CONTENT,
+            )
+        serializer = NotificationUpdateSerializer(data=self.request.data)
+        serializer.is_valid(raise_exception=True)
+        was_read = broadcast.is_read
+        broadcast.is_read = serializer.validated_data.get("is_read", broadcast.is_read)
+        set_broadcast_read(
+            broadcast,
+            device_id=get_internal_device_id(self.device_id),
+            is_read=broadcast.is_read,
+        )
+        self.update_unread_count(was_read, broadcast.is_read)
+        return Response(
+            NotificationResultSerializer(broadcast_to_notification(broadcast)).data
+        )
+
+
+class NotificationUnreadCountView(DeviceIdMixin, generics.GenericAPIView):
+    """Number of unread notifications for a device_id, e.g. for the app badge."""
+
+    @extend_schema_for_device_id(
+        success_response=inline_serializer(
+            name="UnreadCountResponse", fields={"unread_count": IntegerField()}
+        )
+    )
+    def get(self, request, *args, **kwargs):
+        return Response({"unread_count": get_unread_count(self.device_id)})
+
 
 class NotificationModulesView(generics.ListAPIView):
     """
@@ -40,6 +40,8 @@ class NotificationService(AbstractNotificationService):
             notification=notification,
             scheduled_for=notification_datetime or self.notification_datetime,
             identifier=self._create_identifier(waste_type=waste_type),
+            # The identifier is reused every collection day, for the current audience only
+            remove_stale_devices=True,
         )
 
     def _create_identifier(self, waste_type: str) -> str: